@@ -46,11 +46,14 @@ classes = [
     # Operators
     SPARROW_OT_ExportSelectedScenes,
     SPARROW_OT_ExportCurrentScene,
+    SPARROW_OT_DedupGeometry,
     SPARROW_OT_EditCollectionInstance,
     SPARROW_OT_ExitCollectionInstance,
     SPARROW_OT_OpenAssetsFolderBrowser,
     SPARROW_OT_OpenRegistryFileBrowser,
     SPARROW_OT_LoadRegistry,
+    SPARROW_OT_ValidateComponents,
+    SPARROW_OT_SelectValidationItem,
     SPARROW_OT_AddComponent,    
     SPARROW_OT_PasteComponent,
     SPARROW_OT_CopyComponent,
@@ -75,6 +78,7 @@ classes = [
     # Global Properties
     SPARROW_PG_SceneProps,
     SPARROW_PG_Component,    
+    SPARROW_PG_ValidationIssue,
     SPARROW_PG_ComponentDropdown,
     SPARROW_PG_Settings,
 
@@ -87,9 +91,9 @@ classes = [
     SPARROW_OT_RemoveDisabled, SPARROW_OT_RemoveDuplicates, SPARROW_OT_RemoveAll, SPARROW_OT_EnableAll, SPARROW_OT_DisableAll, SPARROW_OT_InvertAll, SPARROW_OT_MoveTop, SPARROW_OT_MoveBottom, SPARROW_PG_UDIMTile, 
     SPARROW_OT_RemoveDisabled_UDIM, SPARROW_OT_RemoveDuplicates_UDIM, SPARROW_OT_RemoveAll_UDIM, SPARROW_OT_EnableAll_UDIM, SPARROW_OT_DisableAll_UDIM, SPARROW_OT_InvertAll_UDIM, SPARROW_OT_Sort_UDIM, SPARROW_OT_ImportTiles_UDIM,
     SPARROW_OT_ToggleQueueItem, SPARROW_OT_ToggleObjectQueueItem, SPARROW_OT_BakeConfirm, SPARROW_OT_NextObject, SPARROW_OT_ExportTextures, SPARROW_OT_Sort, SPARROW_OT_NameStructure, SPARROW_OT_FolderExplorer,
-    SPARROW_OT_SelectFromList, SPARROW_OT_LoadFromSelected,
+    SPARROW_OT_SelectFromList, SPARROW_OT_LoadFromSelected, SPARROW_OT_AtlasCollection,
     # UIList
-    SPARROW_UL_Bake, SPARROW_UL_BakeQueue, SPARROW_UL_UDIMTile, SPARROW_UL_UDIMType, SPARROW_UL_SourceObjects, SPARROW_UL_ImageExport, SPARROW_UL_ObjectQueue,
+    SPARROW_UL_Bake, SPARROW_UL_BakeQueue, SPARROW_UL_UDIMTile, SPARROW_UL_UDIMType, SPARROW_UL_SourceObjects, SPARROW_UL_ImageExport, SPARROW_UL_ObjectQueue, SPARROW_UL_ValidationIssues,
     # Menu
     SPARROW_MT_BakeList, SPARROW_MT_UDIMList, SPARROW_MT_ItemEdit, SPARROW_MT_ItemEdit_UDIM, SPARROW_MT_Confirms, SPARROW_MT_Alerts, SPARROW_MT_ColorSpace, SPARROW_MT_StartPopupSettings,SPARROW_MT_Reports,
 
@@ -109,6 +113,7 @@ def post_load(file_name):
     settings = bpy.context.window_manager.sparrow_settings # type: SPARROW_PG_Settings    
     settings.load_settings()
     settings.load_registry()
+    claim_entity_ids(bpy.data.objects)
 
 def register():
     for cls in classes:
@@ -160,6 +165,10 @@ def register():
 
 def unregister():    
 
+    # bake workers would keep running without the operator that merges their results
+    stop_bake_workers(worker_processes)
+    worker_processes.clear()
+
     if bpy.app.timers.is_registered(watch_registry):
         bpy.app.timers.unregister(watch_registry)
 
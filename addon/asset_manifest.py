@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import re
+from typing import Any, Dict, List
+
+from .glb_optimizer import read_glb
+from .gn_instances import GN_INSTANCES_COMPONENT
+from .utils import SCENE_FOLDER, BLUEPRINT_FOLDER
+
+# Asset manifest: every exported scene, cell and blueprint with a content hash, its size in bytes
+# and the blueprints it needs, direct and transitive, so the runtime can start all loads of a level at once.
+# Dependencies are read back from the exported files, the `Blueprint` extras written by replace_collection_instances
+# and the blueprints of the `GnInstances` lists written by add_gn_instance_lists.
+
+MANIFEST_NAME = "manifest.json"
+
+GLTF_EXTENSIONS = ('.glb', '.gltf')
+
+BLUEPRINT_EXTRA = re.compile(r'^\("(.*)"\)$')
+GN_INSTANCES_BLUEPRINT = re.compile(r'blueprint:\s*"([^"]*)"')
+
+
+def read_gltf_json(path: str) -> Dict[str, Any]:
+    if path.endswith('.glb'):
+        return read_glb(path)[0] or {}
+    with open(path) as f:
+        return json.load(f)
+
+
+# files a gltf is made of: the file itself and, for separate gltf, its external buffers and images
+def gltf_files(path: str, gltf: Dict[str, Any]) -> List[str]:
+    files = [path]
+    for item in gltf.get("buffers", []) + gltf.get("images", []):
+        uri = item.get("uri")
+        if uri is not None and not uri.startswith("data:"):
+            files.append(os.path.join(os.path.dirname(path), uri))
+    return files
+
+
+# ron value of the GnInstances component of a node, from the split components or a bevy_components string
+def gn_instances_value(extras: Dict[str, Any]) -> str:
+    components = extras.get("sparrow_components")
+    if isinstance(components, dict):
+        components = list(components.values())
+    if isinstance(components, list):
+        for component in components:
+            if isinstance(component, dict) and component.get("type") == GN_INSTANCES_COMPONENT and isinstance(component.get("value"), str):
+                return component["value"]
+    bevy_components = extras.get("bevy_components")
+    if isinstance(bevy_components, str):
+        try:
+            value = json.loads(bevy_components).get(GN_INSTANCES_COMPONENT)
+        except (ValueError, AttributeError):
+            return None
+        if isinstance(value, str):
+            return value
+    return None
+
+
+def blueprint_references(gltf: Dict[str, Any]) -> List[str]:
+    references = set()
+    for node in gltf.get("nodes", []):
+        extras = node.get("extras", {})
+        value = extras.get("Blueprint")
+        if isinstance(value, str):
+            match = BLUEPRINT_EXTRA.match(value)
+            if match:
+                references.add(match.group(1).replace('\\', '/'))
+        value = gn_instances_value(extras)
+        if value is not None:
+            references.update(path.replace('\\', '/') for path in GN_INSTANCES_BLUEPRINT.findall(value))
+    return sorted(references)
+
+
+def asset_entry(path: str) -> Dict[str, Any]:
+    gltf = read_gltf_json(path)
+    digest = hashlib.blake2b(digest_size=16)
+    size = 0
+    for file_path in gltf_files(path, gltf):
+        if os.path.exists(file_path):
+            with open(file_path, "rb") as f:
+                data = f.read()
+            digest.update(data)
+            size += len(data)
+    return {
+        "hash": digest.hexdigest(),
+        "size": size,
+        "blueprints": blueprint_references(gltf),
+    }
+
+
+# asset paths of the exported gltf files in a folder, relative to the assets folder with forward slashes like bevy
+def exported_files(assets_path: str, folder: str, recursive: bool = False) -> List[str]:
+    root = os.path.join(assets_path, folder)
+    if not os.path.isdir(root):
+        return []
+    paths = []
+    for directory, directories, files in os.walk(root):
+        paths.extend(os.path.relpath(os.path.join(directory, file_name), assets_path).replace('\\', '/') for file_name in files if file_name.endswith(GLTF_EXTENSIONS))
+        if not recursive:
+            break
+    return sorted(paths)
+
+
+# all blueprints reachable from `blueprints`, missing blueprints are kept so the runtime reports them
+def transitive_blueprints(blueprints: List[str], entries: Dict[str, Dict[str, Any]]) -> List[str]:
+    seen = set()
+    stack = list(blueprints)
+    while stack:
+        path = stack.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        stack.extend(entries.get(path, {}).get("blueprints", []))
+    return sorted(seen)
+
+
+## Write the manifest for everything currently in the scenes and blueprints folders
+# returns the manifest path
+def write_asset_manifest(assets_path: str) -> str:
+    blueprints = {path: asset_entry(os.path.join(assets_path, path)) for path in exported_files(assets_path, BLUEPRINT_FOLDER)}
+    # scene folders hold the world partition cells
+    scenes = {path: asset_entry(os.path.join(assets_path, path)) for path in exported_files(assets_path, SCENE_FOLDER, recursive=True)}
+
+    for entries in [blueprints, scenes]:
+        for entry in entries.values():
+            entry["dependencies"] = transitive_blueprints(entry["blueprints"], blueprints)
+
+    manifest_path = os.path.join(assets_path, MANIFEST_NAME)
+    # write then rename, a hot reloading runtime never reads a half written manifest
+    with open(f"{manifest_path}.tmp", "w") as f:
+        json.dump({"version": 1, "scenes": scenes, "blueprints": blueprints}, f, indent=2)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+    return manifest_path
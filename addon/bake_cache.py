@@ -0,0 +1,210 @@
+import hashlib
+import os
+import tempfile
+
+import bpy
+import numpy as np
+
+# Disk cache for baked images, keyed on what the bake result depends on:
+# the evaluated mesh, the material node graphs and the bake / sampling settings,
+# and for light transport bakes also the lights, the world and every other renderable object.
+# Pixels are stored raw as .npy so a cache hit is lossless and needs no image decode.
+
+# autobake properties that do not change the baked pixels
+CACHE_IGNORED_SETTINGS = ['report', 'confirm', 'popup', 'filepath', 'export', 'subfolder', 'name_structure', 'prefix', 'suffix', 'bridge', 'move_finished', 'auto_confirm', 'final_', 'apply_textures', 'remove_imagetextures', 'bake_cache', 'bake_workers', 'pack_texture', 'list_item_count']
+
+
+def bake_cache_dir(path: str) -> str:
+    path = bpy.path.abspath(path) if path != '' else os.path.join(tempfile.gettempdir(), "sparrow_bake_cache")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def hash_array(digest, collection, attribute: str, dtype, width: int = 1):
+    values = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(attribute, values)
+    digest.update(values.tobytes())
+
+
+def hash_rna(digest, struct, skip=()):
+    for prop in struct.bl_rna.properties:
+        if prop.identifier in skip or prop.identifier == 'rna_type' or prop.type in ['POINTER', 'COLLECTION']:
+            continue
+        value = getattr(struct, prop.identifier, None)
+        if hasattr(value, '__len__') and not isinstance(value, str):
+            value = tuple(value)
+        digest.update(f"{prop.identifier}={value};".encode())
+
+
+def hash_value(digest, name: str, value):
+    digest.update(f"{name}={tuple(value) if hasattr(value, '__len__') and not isinstance(value, str) else value};".encode())
+
+
+# color ramp stops and curve points are collections, hash_rna skips them
+def hash_curves(digest, node):
+    color_ramp = getattr(node, 'color_ramp', None)
+    if color_ramp is not None:
+        hash_rna(digest, color_ramp)
+        for element in color_ramp.elements:
+            hash_value(digest, "stop", (element.position, *element.color))
+    mapping = getattr(node, 'mapping', None)
+    if mapping is not None and hasattr(mapping, 'curves'):
+        hash_rna(digest, mapping)
+        for curve in mapping.curves:
+            for point in curve.points:
+                hash_value(digest, "point", (*point.location, point.handle_type))
+
+
+# packed, generated and edited images are hashed by their pixels, images on disk by their file
+def hash_image(digest, image):
+    digest.update(f"image:{image.name}:{image.filepath}:{image.source}:{tuple(image.size)}:{image.colorspace_settings.name}:{image.is_dirty};".encode())
+    path = bpy.path.abspath(image.filepath, library=image.library) if image.filepath != '' else ''
+    if image.is_dirty or image.packed_file is not None or image.source == 'GENERATED' or not os.path.isfile(path):
+        pixels = np.empty(len(image.pixels), dtype=np.float32)
+        image.pixels.foreach_get(pixels)
+        digest.update(pixels.tobytes())
+    else:
+        stat = os.stat(path)
+        digest.update(f"file:{stat.st_mtime_ns}:{stat.st_size};".encode())
+
+
+def hash_node_tree(digest, node_tree, seen: set):
+    if node_tree is None or node_tree.name in seen:
+        return
+    seen.add(node_tree.name)
+
+    for node in sorted(node_tree.nodes, key=lambda node: node.name):
+        digest.update(f"{node.bl_idname}:{node.name}:{node.mute};".encode())
+        hash_rna(digest, node, skip=('location', 'width', 'height', 'select', 'show_options', 'show_preview', 'hide', 'label', 'color', 'use_custom_color', 'dimensions', 'width_hidden'))
+        for socket in node.inputs:
+            if hasattr(socket, 'default_value') and not socket.is_linked:
+                hash_value(digest, socket.identifier, socket.default_value)
+        # value and rgb nodes keep their value on the output socket
+        for socket in node.outputs:
+            if hasattr(socket, 'default_value'):
+                hash_value(digest, f"out:{socket.identifier}", socket.default_value)
+        hash_curves(digest, node)
+        image = getattr(node, 'image', None)
+        if image is not None and f"image:{image.name}" not in seen:
+            seen.add(f"image:{image.name}")
+            hash_image(digest, image)
+        if node.type == 'GROUP':
+            hash_node_tree(digest, node.node_tree, seen)
+
+    for link in sorted(node_tree.links, key=lambda link: (link.to_node.name, link.to_socket.identifier)):
+        digest.update(f"{link.from_node.name}.{link.from_socket.identifier}>{link.to_node.name}.{link.to_socket.identifier};".encode())
+
+
+# fingerprint of the evaluated mesh, uvs, transform and materials of an object, computed once per bake session
+def object_fingerprint(obj, depsgraph) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+
+    obj_eval = obj.evaluated_get(depsgraph)
+    mesh = obj_eval.to_mesh()
+    try:
+        hash_array(digest, mesh.vertices, 'co', np.float32, 3)
+        hash_array(digest, mesh.loops, 'vertex_index', np.int32)
+        hash_array(digest, mesh.polygons, 'loop_start', np.int32)
+        hash_array(digest, mesh.polygons, 'material_index', np.int32)
+        hash_array(digest, mesh.polygons, 'use_smooth', bool)
+        for uv_layer in mesh.uv_layers:
+            digest.update(f"uv:{uv_layer.name}:{uv_layer.active_render};".encode())
+            hash_array(digest, uv_layer.data, 'uv', np.float32, 2)
+        for attribute in mesh.color_attributes:
+            digest.update(f"color:{attribute.name};".encode())
+            hash_array(digest, attribute.data, 'color', np.float32, 4)
+    finally:
+        obj_eval.to_mesh_clear()
+
+    digest.update(np.array(obj.matrix_world, dtype=np.float32).tobytes())
+
+    seen = set()
+    for slot in obj.material_slots:
+        material = slot.material
+        digest.update(f"material:{material.name if material else None};".encode())
+        if material is not None and material.use_nodes:
+            hash_node_tree(digest, material.node_tree, seen)
+
+    return digest.hexdigest()
+
+
+# cycles passes tracing light through the scene, and the labels of socket bakes doing the same (the ambient occlusion node)
+LIGHT_TRANSPORT_PASSES = ['COMBINED', 'AO', 'SHADOW', 'DIFFUSE', 'GLOSSY', 'TRANSMISSION', 'ENVIRONMENT']
+LIGHT_TRANSPORT_LABELS = ['Ambient Occlusion']
+
+SCENE_GEOMETRY_TYPES = ['MESH', 'CURVE', 'SURFACE', 'FONT', 'META']
+
+
+def is_light_transport_bake(bake_pass: str, label: str) -> bool:
+    return bake_pass in LIGHT_TRANSPORT_PASSES or label in LIGHT_TRANSPORT_LABELS
+
+
+# fingerprint of the world, the lights and all renderable objects, computed once per bake session before any bake node is added
+def scene_fingerprint(scene, depsgraph) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+
+    world = scene.world
+    digest.update(f"world:{world.name if world else None};".encode())
+    if world is not None:
+        hash_rna(digest, world)
+        if world.use_nodes:
+            hash_node_tree(digest, world.node_tree, set())
+
+    for obj in sorted(scene.objects, key=lambda obj: obj.name):
+        if obj.hide_render:
+            continue
+        if obj.type in SCENE_GEOMETRY_TYPES:
+            digest.update(f"object:{obj.name}:{object_fingerprint(obj, depsgraph)};".encode())
+        elif obj.type == 'LIGHT':
+            digest.update(f"light:{obj.name};".encode())
+            digest.update(np.array(obj.matrix_world, dtype=np.float32).tobytes())
+            hash_rna(digest, obj.data)
+            if obj.data.use_nodes:
+                hash_node_tree(digest, obj.data.node_tree, set())
+        elif obj.instance_type == 'COLLECTION' and obj.instance_collection is not None:
+            digest.update(f"instance:{obj.name}:{obj.instance_collection.name};".encode())
+            digest.update(np.array(obj.matrix_world, dtype=np.float32).tobytes())
+
+    return digest.hexdigest()
+
+
+# fingerprint of everything else that changes the pixels of one bake, `scene_fingerprint` is given for light transport bakes
+def bake_fingerprint(object_fingerprint: str, bake_type: str, img, scene, scene_fingerprint: str = None) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{object_fingerprint};{bake_type};{tuple(img.size)};{img.is_float};{img.colorspace_settings.name};".encode())
+    if scene_fingerprint is not None:
+        digest.update(f"scene:{scene_fingerprint};".encode())
+
+    abp = scene.autobake_properties
+    for prop in abp.bl_rna.properties:
+        if prop.identifier.startswith('ab_') and not any(ignored in prop.identifier for ignored in CACHE_IGNORED_SETTINGS):
+            value = getattr(abp, prop.identifier)
+            if prop.type not in ['POINTER', 'COLLECTION']:
+                digest.update(f"{prop.identifier}={tuple(value) if hasattr(value, '__len__') and not isinstance(value, str) else value};".encode())
+
+    hash_rna(digest, scene.render.bake, skip=('filepath',))
+    for attribute in ['samples', 'use_adaptive_sampling', 'adaptive_threshold', 'adaptive_min_samples', 'time_limit', 'use_denoising', 'denoiser', 'denoising_input_passes', 'denoising_prefilter', 'seed']:
+        digest.update(f"{attribute}={getattr(scene.cycles, attribute, None)};".encode())
+
+    return digest.hexdigest()
+
+
+def load_cached_bake(cache_dir: str, key: str, img) -> bool:
+    path = os.path.join(cache_dir, f"{key}.npy")
+    if not os.path.exists(path):
+        return False
+    pixels = np.load(path)
+    if len(pixels) != len(img.pixels):
+        return False
+    img.pixels.foreach_set(pixels)
+    img.update()
+    return True
+
+
+def store_cached_bake(cache_dir: str, key: str, img):
+    pixels = np.empty(len(img.pixels), dtype=np.float32)
+    img.pixels.foreach_get(pixels)
+    # write then rename, so an interrupted write never leaves a truncated entry behind
+    path = os.path.join(cache_dir, f"{key}.npy")
+    np.save(f"{path}.tmp.npy", pixels)
+    os.replace(f"{path}.tmp.npy", path)
@@ -0,0 +1,193 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List
+
+import bpy
+
+# Distributed baking: the object queue is split into job files, each baked by a `blender --background` process.
+# Jobs are started as workers free up, so a paused run starts no new job and a cancelled one stops its workers.
+# This file is also the worker entry point, it is passed to the workers with `--python` (see run_worker below).
+
+# bake labels (see SPARROW_OT_BakeStart.bake_type_info) a worker can bake with a plain cycles pass,
+# socket bakes need the node rerouting of the interactive session and stay there
+WORKER_LABELS = ['Standard', 'Combined', 'AO', 'Glossy', 'Diffuse', 'Transmission', 'UV']
+
+BAKE_FILE_EXTENSIONS = {'BMP': 'bmp', 'PNG': 'png', 'JPEG': 'jpg', 'TARGA': 'tga', 'TARGA_RAW': 'tga', 'OPEN_EXR': 'exr', 'TIFF': 'tif'}
+
+
+# write one job file per object, returns the job file paths in queue order
+def write_bake_jobs(job_dir: str, objects: List[str], bakes: List[Dict[str, Any]], settings: Dict[str, Any]) -> List[str]:
+    os.makedirs(job_dir, exist_ok=True)
+
+    job_paths = []
+    for index, object_name in enumerate(objects):
+        job = {
+            "objects": [object_name],
+            "bakes": bakes,
+            "settings": settings,
+            "output": os.path.join(job_dir, f"job_{index}"),
+        }
+        job_path = os.path.join(job_dir, f"job_{index}.json")
+        with open(job_path, "w") as f:
+            json.dump(job, f, indent=2)
+        job_paths.append(job_path)
+
+    return job_paths
+
+
+# save a copy of the current file so the workers see unsaved changes, returns its path
+def save_bake_source(job_dir: str) -> str:
+    blend_path = os.path.join(job_dir, "bake_source.blend")
+    bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True)
+    return blend_path
+
+
+# cpu threads per worker, so the workers running at once share the cpu
+def worker_threads(workers: int) -> int:
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+# start a background blender for one job
+def start_bake_worker(blend_path: str, job_path: str, threads: int) -> subprocess.Popen:
+    command = [bpy.app.binary_path, "--background", blend_path, "--threads", str(threads), "--python", __file__, "--", job_path]
+    # the process keeps its own handle, the parent's copy is closed right away
+    with open(f"{job_path}.log", "w") as log:
+        return subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+
+
+# terminate running workers and wait for them, killing the ones that do not exit
+def stop_bake_workers(processes: List[subprocess.Popen]):
+    for process in processes:
+        if process.poll() is None:
+            process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def read_bake_results(job_paths: List[str]) -> List[Dict[str, Any]]:
+    results = []
+    for job_path in job_paths:
+        result_path = f"{job_path}.result.json"
+        if not os.path.exists(result_path):
+            with open(job_path) as f:
+                job = json.load(f)
+            # the worker died before writing anything, fail all its bakes
+            for object_name in job["objects"]:
+                for bake in job["bakes"]:
+                    results.append({"object": object_name, "type": bake["type"], "size": bake["size"], "path": "", "error": f"Worker failed, see {job_path}.log"})
+            continue
+        with open(result_path) as f:
+            results.extend(json.load(f))
+    return results
+
+
+def default_job_dir() -> str:
+    return tempfile.mkdtemp(prefix="sparrow_bake_")
+
+
+# the job files, the copy of the .blend and the baked images, once the results are merged or the run is cancelled
+def remove_job_dir(job_dir: str):
+    shutil.rmtree(job_dir, ignore_errors=True)
+
+
+###########
+# worker side, runs inside `blender --background`
+
+
+def bake_object(obj, bake: Dict[str, Any], settings: Dict[str, Any], output: str) -> Dict[str, Any]:
+    result = {"object": obj.name, "type": bake["type"], "size": bake["size"], "path": "", "error": ""}
+
+    # names are sent with a `{prefix}` placeholder, the prefix is the object name like in the interactive bake
+    name = re.sub('[{}]'.format(re.escape('<>:"/\\|?*')), '', bake["name"].replace("{prefix}", obj.name))
+    img = bpy.data.images.new(name=name, width=bake["size"], height=bake["size"], alpha=False, float_buffer=settings["float_buffer"])
+    img.colorspace_settings.name = bake["colorspace"]
+
+    if len(obj.material_slots) == 0:
+        obj.data.materials.append(bpy.data.materials.new(name=obj.name))
+
+    added_nodes = []
+    for slot in obj.material_slots:
+        material = slot.material
+        if material is None:
+            continue
+        material.use_nodes = True
+        node = material.node_tree.nodes.new('ShaderNodeTexImage')
+        node.image = img
+        material.node_tree.nodes.active = node
+        added_nodes.append((material.node_tree, node))
+
+    for other in bpy.context.view_layer.objects:
+        other.select_set(False)
+    obj.select_set(True)
+    bpy.context.view_layer.objects.active = obj
+
+    try:
+        bpy.ops.object.bake(
+            type=bake["pass"],
+            pass_filter=set(settings["pass_filter"]),
+            margin=settings["margin"],
+            margin_type=settings["margin_type"],
+            normal_space=settings["normal_space"],
+            normal_r=settings["normal_r"],
+            normal_g=settings["normal_g"],
+            normal_b=settings["normal_b"],
+            target="IMAGE_TEXTURES",
+            use_clear=True,
+            use_selected_to_active=False,
+            use_split_materials=False,
+            use_automatic_name=False,
+            uv_layer='')
+
+        extension = BAKE_FILE_EXTENSIONS.get(settings["file_format"], 'png')
+        result["path"] = os.path.join(output, f"{name}.{extension}")
+        img.filepath_raw = result["path"]
+        img.file_format = settings["file_format"] if settings["file_format"] in BAKE_FILE_EXTENSIONS else 'PNG'
+        img.save()
+    except Exception as error:
+        result["error"] = str(error)
+
+    for node_tree, node in added_nodes:
+        node_tree.nodes.remove(node)
+    bpy.data.images.remove(img)
+
+    return result
+
+
+def run_worker(job_path: str):
+    with open(job_path) as f:
+        job = json.load(f)
+    settings = job["settings"]
+    os.makedirs(job["output"], exist_ok=True)
+
+    scene = bpy.context.scene
+    scene.render.engine = 'CYCLES'
+    scene.cycles.device = settings["device"]
+
+    results = []
+    for object_name in job["objects"]:
+        obj = bpy.data.objects.get(object_name)
+        for bake in job["bakes"]:
+            if obj is None or obj.type != 'MESH':
+                results.append({"object": object_name, "type": bake["type"], "size": bake["size"], "path": "", "error": "Object not found in worker"})
+                continue
+            scene.cycles.samples = bake["samples"]
+            scene.cycles.use_denoising = bake["denoise"]
+            result = bake_object(obj, bake, settings, job["output"])
+            print(f"Sparrow worker: {object_name} {bake['type']} {bake['size']} " + (result["error"] or "done"))
+            results.append(result)
+
+    with open(f"{job_path}.result.json", "w") as f:
+        json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    run_worker(sys.argv[sys.argv.index("--") + 1])
@@ -0,0 +1,50 @@
+from typing import Dict
+
+import numpy as np
+
+# Pixel level shortcuts for the bake queue: channel packing from maps already baked in the same queue,
+# instead of another cycles bake through a Combine Color chain, and constant maps filled without baking.
+
+CHANNEL_PACK_PROPS = ['ab_channel_pack_r', 'ab_channel_pack_g', 'ab_channel_pack_b']
+
+
+def snapshot_pixels(img) -> np.ndarray:
+    pixels = np.empty(len(img.pixels), dtype=np.float32)
+    img.pixels.foreach_get(pixels)
+    return pixels
+
+
+# write the red channel of each source into its channel of the packed image, the other channels are kept
+def pack_channels(img, sources: Dict[int, np.ndarray]):
+    pixels = snapshot_pixels(img).reshape(-1, 4)
+    for channel, source in sources.items():
+        pixels[:, channel] = source.reshape(-1, 4)[:, 0]
+    pixels[:, 3] = 1.0
+    img.pixels.foreach_set(pixels.ravel())
+    img.update()
+
+
+def linear_to_srgb(value: float) -> float:
+    return value * 12.92 if value <= 0.0031308 else 1.055 * value ** (1 / 2.4) - 0.055
+
+
+LINEAR_COLORSPACES = ['Non-Color', 'Linear', 'Linear Rec.709', 'Raw']
+
+
+# byte images in other color spaces would need blender's color transforms to store a constant
+def can_fill_constant(img) -> bool:
+    return img.is_float or img.colorspace_settings.name == 'sRGB' or img.colorspace_settings.name in LINEAR_COLORSPACES
+
+
+# fill the image with a constant the way an emission bake would store it, False when the image color space needs blender's transforms
+def fill_constant(img, value) -> bool:
+    if not can_fill_constant(img):
+        return False
+    color = list(value) + [value[0]] * (3 - len(value)) if len(value) < 3 else list(value[:3])
+    if not img.is_float and img.colorspace_settings.name == 'sRGB':
+        color = [linear_to_srgb(channel) for channel in color]
+
+    pixels = np.tile(np.array(color + [1.0], dtype=np.float32), img.size[0] * img.size[1])
+    img.pixels.foreach_set(pixels)
+    img.update()
+    return True
@@ -0,0 +1,136 @@
+from typing import Dict, List
+
+import bmesh
+import bpy
+import numpy as np
+
+from .utils import CONVERSION_TABLES, get_bevy_components, upsert_export_component
+
+# Collider and bounds precomputation: local bounds for every exported mesh object, and for objects marked
+# with a collider component a convex hull or simplified triangle mesh, computed once at export from the
+# evaluated mesh, so the runtime inserts them as they are instead of processing meshes on spawn, see src/colliders.rs.
+
+BOUNDS_COMPONENT = "sparrow::colliders::ExportedBounds"
+COLLIDER_COMPONENT = "sparrow::colliders::ExportedCollider"
+
+# objects with a component whose type name contains this get a collider shape, like a game's ColliderHelper
+COLLIDER_MARKER = "Collider"
+
+
+def wants_collider(obj: bpy.types.Object) -> bool:
+    return any(COLLIDER_MARKER in long_name.split("::")[-1] for long_name in get_bevy_components(obj) if long_name != COLLIDER_COMPONENT)
+
+
+# evaluated local space vertices and triangles, converted to bevy y up
+def evaluated_geometry(obj: bpy.types.Object, depsgraph) -> tuple[np.ndarray, np.ndarray]:
+    obj_eval = obj.evaluated_get(depsgraph)
+    mesh = obj_eval.to_mesh()
+    try:
+        mesh.calc_loop_triangles()
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get('co', co)
+        triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get('vertices', triangles)
+    finally:
+        obj_eval.to_mesh_clear()
+    co = co.reshape(-1, 3)
+    # a rotation, so triangle winding is kept
+    return np.stack([co[:, 0], co[:, 2], -co[:, 1]], axis=1), triangles.reshape(-1, 3)
+
+
+# ritter's bounding sphere, grown from the farthest pair until every point is inside
+def bounding_sphere(points: np.ndarray) -> tuple[np.ndarray, float]:
+    first = points[np.argmax(np.linalg.norm(points - points[0], axis=1))]
+    second = points[np.argmax(np.linalg.norm(points - first, axis=1))]
+    center = (first + second) / 2
+    radius = np.linalg.norm(second - first) / 2
+    while True:
+        distances = np.linalg.norm(points - center, axis=1)
+        farthest = np.argmax(distances)
+        if distances[farthest] <= radius * (1 + 1e-6):
+            return center, float(radius)
+        new_radius = (radius + distances[farthest]) / 2
+        center = center + (points[farthest] - center) * ((new_radius - radius) / distances[farthest])
+        radius = new_radius
+
+
+# merge vertices on a grid of `cell` size, triangles collapsed by the merge are dropped
+def cluster_vertices(points: np.ndarray, triangles: np.ndarray, cell: float) -> tuple[np.ndarray, np.ndarray]:
+    if cell <= 0:
+        return points, triangles
+    keys = np.floor(points / cell).astype(np.int64)
+    _, cluster, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    cluster = cluster.reshape(-1)
+    clustered = np.zeros((len(counts), 3), dtype=np.float64)
+    np.add.at(clustered, cluster, points)
+    clustered /= counts[:, None]
+
+    triangles = cluster[triangles]
+    triangles = triangles[(triangles[:, 0] != triangles[:, 1]) & (triangles[:, 1] != triangles[:, 2]) & (triangles[:, 0] != triangles[:, 2])]
+    # the same triangle from different source faces, keep one
+    _, unique = np.unique(np.sort(triangles, axis=1), axis=0, return_index=True)
+    return clustered.astype(np.float32), triangles[np.sort(unique)]
+
+
+# vertices of the convex hull, from blender's hull operator
+def convex_hull_points(points: np.ndarray) -> np.ndarray:
+    if len(points) < 4:
+        return points
+    bm = bmesh.new()
+    try:
+        for point in points:
+            bm.verts.new(point.tolist())
+        result = bmesh.ops.convex_hull(bm, input=bm.verts)
+        hull = [tuple(element.co) for element in result['geom'] if isinstance(element, bmesh.types.BMVert)]
+    finally:
+        bm.free()
+    return np.array(hull, dtype=np.float32) if len(hull) >= 4 else points
+
+
+def vec3(value) -> str:
+    return CONVERSION_TABLES['glam::Vec3']([round(float(v), 6) for v in value])
+
+
+def floats(values: np.ndarray) -> str:
+    return "[" + ", ".join(repr(round(float(v), 6)) for v in values.reshape(-1)) + "]"
+
+
+def bounds_ron(points: np.ndarray) -> str:
+    center, radius = bounding_sphere(points.astype(np.float64))
+    return f"(min: {vec3(points.min(axis=0))}, max: {vec3(points.max(axis=0))}, sphere_center: {vec3(center)}, sphere_radius: {round(radius, 6)!r})"
+
+
+def collider_ron(shape: str, points: np.ndarray, triangles: np.ndarray, detail: float) -> str:
+    extent = float(np.linalg.norm(points.max(axis=0) - points.min(axis=0)))
+    points, triangles = cluster_vertices(points, triangles, extent * detail)
+    if shape == 'CONVEX':
+        return f"ConvexHull(points: {floats(convex_hull_points(points))})"
+    return f"TriMesh(vertices: {floats(points)}, indices: [{', '.join(str(int(i)) for i in triangles.reshape(-1))}])"
+
+
+## Add the bounds and collider components to the mesh objects, before split_bevy_components
+# objects sharing a mesh without modifiers are computed once, original components are kept in `stored`
+def add_collider_components(settings, objects, depsgraph, stored: dict) -> int:
+    computed: Dict[tuple, List[str]] = {}
+    count = 0
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        collider = settings.precompute_colliders in ('CONVEX', 'TRIMESH') and wants_collider(obj)
+        key = (obj.data.as_pointer(), collider) if len(obj.modifiers) == 0 else None
+        values = computed.get(key) if key is not None else None
+        if values is None:
+            points, triangles = evaluated_geometry(obj, depsgraph)
+            if len(points) == 0:
+                continue
+            values = [bounds_ron(points)]
+            if collider:
+                values.append(collider_ron(settings.precompute_colliders, points, triangles, settings.collider_detail))
+            if key is not None:
+                computed[key] = values
+
+        upsert_export_component(obj, BOUNDS_COMPONENT, values[0], stored)
+        if len(values) > 1:
+            upsert_export_component(obj, COLLIDER_COMPONENT, values[1], stored)
+        count += 1
+    return count
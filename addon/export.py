@@ -1,12 +1,19 @@
 import bpy
+import json
+import math
 import os
 import time
 
 from .utils import *
-from .properties import SPARROW_PG_Settings
+from .properties import SPARROW_PG_Settings, SPARROW_PG_SceneProps
+from .glb_optimizer import optimize_glb
+from .ktx2_textures import convert_glb_textures
+from .gn_instances import add_gn_instance_lists
+from .collider_bake import add_collider_components
 
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from mathutils import Matrix, Vector
+from typing import Any, Dict, List
 
 @dataclass
 class BlueprintInstance:    
@@ -20,12 +27,15 @@ def sanitize_file_name(name: str) -> str:
     ]
     return ''.join(sanitized_parts)
 
-# go though scene and replace collection instances with blueprint name
+def is_blueprint_instance(obj: bpy.types.Object) -> bool:
+    return obj.instance_collection is not None and obj.instance_collection.asset_data is not None
+
+# go though scene, or only the given objects, and replace collection instances with blueprint name
 # returns a list of instances so they can be restored later
-def replace_collection_instances(settings: SPARROW_PG_Settings, scene: bpy.types.Scene) -> List[BlueprintInstance]:
+def replace_collection_instances(settings: SPARROW_PG_Settings, scene: bpy.types.Scene, objects = None) -> List[BlueprintInstance]:
     blueprints_instances: List[BlueprintInstance] = []        
-    for obj in bpy.data.objects:         
-        if scene.user_of_id(obj) == 0 or obj.instance_collection is None or obj.instance_collection.asset_data is None: 
+    for obj in (objects if objects is not None else bpy.data.objects):         
+        if (objects is None and scene.user_of_id(obj) == 0) or not is_blueprint_instance(obj): 
             continue
         # record the instance collection
         inst = BlueprintInstance(obj, obj.instance_collection)
@@ -41,6 +51,214 @@ def replace_collection_instances(settings: SPARROW_PG_Settings, scene: bpy.types
         blueprints_instances.append(inst)
     return blueprints_instances
 
+# extras key holding one {"type": long_name, "value": ron} entry per component, see ronstring_to_reflect_component.rs
+SPLIT_COMPONENTS = 'sparrow_components'
+
+# replace the bevy_components json string with one pre-normalized entry per component, so the bevy loader
+# can deserialize each component once instead of parsing, re-serializing and parsing the whole map again
+# returns the original values so they can be restored after export
+def split_bevy_components(items) -> list[tuple[Any, str]]:
+    stored = []
+    for item in items:
+        if 'bevy_components' not in item:
+            continue
+        bevy_components = item['bevy_components']
+        try:
+            components = json.loads(bevy_components)
+        except (TypeError, ValueError) as error:
+            # exported without components rather than failing the load in bevy, restored with the others
+            print(f"{item.name}: invalid bevy_components, exported without components !", error)
+            del item['bevy_components']
+            stored.append((item, bevy_components))
+            continue
+        if len(components) == 0:
+            continue # keep the empty '{}', so "GltfSceneExtras" is always added
+
+        # idproperty keys are limited to 63 characters, so type paths are stored as values
+        item[SPLIT_COMPONENTS] = [{"type": long_name, "value": str(value).strip()} for long_name, value in components.items()]
+        del item['bevy_components']
+        stored.append((item, bevy_components))
+    return stored
+
+def restore_bevy_components(stored: list[tuple[Any, str]]):
+    for (item, bevy_components) in stored:
+        item['bevy_components'] = bevy_components
+        if SPLIT_COMPONENTS in item:
+            del item[SPLIT_COMPONENTS]
+
+# components computed from the evaluated objects for this export only, removed again by restore_export_components
+# asset paths of blueprints instanced by geometry nodes are added to `gn_blueprints` when given
+def add_export_components(settings: SPARROW_PG_Settings, objects, scene: bpy.types.Scene, gn_blueprints: set = None) -> dict:
+    stored = {}
+    if not settings.gn_instance_lists and settings.precompute_colliders == 'OFF':
+        return stored
+    depsgraph = scene_depsgraph(scene)
+    if settings.gn_instance_lists:
+        blueprints = add_gn_instance_lists(settings, objects, depsgraph, stored)
+        if gn_blueprints is not None:
+            gn_blueprints.update(blueprints)
+    if settings.precompute_colliders != 'OFF':
+        add_collider_components(settings, objects, depsgraph, stored)
+    return stored
+
+GEOMETRY_TYPES = ['MESH', 'CURVE', 'SURFACE', 'META', 'FONT', 'CURVES', 'POINTCLOUD', 'VOLUME']
+
+@dataclass
+class SceneCell:
+    name: str
+    objects: List[bpy.types.Object] = field(default_factory=list) # root objects and all their children
+    min: List[float] = field(default_factory=lambda: [math.inf] * 3)
+    max: List[float] = field(default_factory=lambda: [-math.inf] * 3)
+    blueprints: set = field(default_factory=set)
+    gn_blueprints: set = field(default_factory=set) # asset paths, from the GnInstances lists at export
+
+# objects that belong to the whole level, they stay in the scene file
+def is_global_object(obj: bpy.types.Object) -> bool:
+    return obj.type == 'CAMERA' or (obj.type == 'LIGHT' and obj.data.type == 'SUN')
+
+# world space corners of an object, collection instances use the bounds of the instanced objects
+def world_corners(obj: bpy.types.Object) -> List[Vector]:
+    if obj.type in GEOMETRY_TYPES:
+        return [obj.matrix_world @ Vector(corner) for corner in obj.bound_box]
+    if obj.instance_type == 'COLLECTION' and obj.instance_collection is not None:
+        matrix = obj.matrix_world @ Matrix.Translation(-obj.instance_collection.instance_offset)
+        return [matrix @ child.matrix_world @ Vector(corner) for child in obj.instance_collection.all_objects if child.type in GEOMETRY_TYPES for corner in child.bound_box]
+    return [obj.matrix_world.translation.copy()]
+
+# objects the single file export would write: visible in the view layer, so not hidden or in an excluded collection,
+# and not part of a blueprint asset collection, those are exported as their own files
+def exportable_objects(scene: bpy.types.Scene) -> set:
+    view_layer = scene.view_layers['ViewLayer']
+    asset_collections = set()
+    for col in bpy.data.collections:
+        if col.asset_data is not None and scene.user_of_id(col) != 0:
+            asset_collections.add(col)
+            asset_collections.update(col.children_recursive)
+    return {obj for obj in scene.objects if obj.visible_get(view_layer=view_layer) and not any(col in asset_collections for col in obj.users_collection)}
+
+def parents(obj: bpy.types.Object):
+    while obj.parent is not None:
+        obj = obj.parent
+        yield obj
+
+# bucket the root objects of the scene with their children into grid cells by the center of their world bounds
+def partition_scene(scene: bpy.types.Scene, cell_size: float) -> Dict[tuple, SceneCell]:
+    cells: Dict[tuple, SceneCell] = {}
+    scene_objects = exportable_objects(scene)
+    for root in scene.objects:
+        if root not in scene_objects or any(parent in scene_objects for parent in parents(root)) or is_global_object(root):
+            continue
+        hierarchy = [root] + [child for child in root.children_recursive if child in scene_objects and not is_global_object(child)]
+        corners = [corner for obj in hierarchy for corner in world_corners(obj)] or [root.matrix_world.translation]
+        low = [min(corner[axis] for corner in corners) for axis in range(3)]
+        high = [max(corner[axis] for corner in corners) for axis in range(3)]
+
+        key = (math.floor((low[0] + high[0]) / 2 / cell_size), math.floor((low[1] + high[1]) / 2 / cell_size))
+        if key not in cells:
+            cells[key] = SceneCell(f"cell_{key[0]}_{key[1]}")
+        cell = cells[key]
+        cell.objects.extend(hierarchy)
+        cell.min = [min(cell.min[axis], low[axis]) for axis in range(3)]
+        cell.max = [max(cell.max[axis], high[axis]) for axis in range(3)]
+        cell.blueprints.update(obj.instance_collection for obj in hierarchy if obj.instance_collection is not None and obj.instance_collection.asset_data is not None)
+    return cells
+
+# blender z up bounds to bevy y up, matching export_yup
+def bevy_bounds(low: List[float], high: List[float]) -> tuple[List[float], List[float]]:
+    return [low[0], low[2], -high[1]], [high[0], high[2], -low[1]]
+
+## Export the scene objects as grid cells, one gltf file per cell and an index file with bounds and blueprints
+# returns the exported objects, so the scene file can leave them out, and the failed cells
+def export_scene_cells(settings: SPARROW_PG_Settings, area, region, scene) -> tuple[list[bpy.types.Object], list[str]]:
+    scene_props: SPARROW_PG_SceneProps = scene.sparrow_scene_props
+    path = settings.scene_cell_folder(scene)
+    os.makedirs(path, exist_ok=True)
+
+    dedupe_entity_ids(scene.objects)
+    cells = partition_scene(scene, scene_props.partition_cell_size)
+
+    exported = []
+    failure = []
+    index = []
+    for key, cell in sorted(cells.items()):
+        tmp_time = time.time()
+        gltf_path = settings.scene_cell_path(scene, cell.name)
+
+        temp_scene = bpy.data.scenes.new(name=f"{scene.name}_{cell.name}")
+        # need to add something even if it has no components, so "GltfSceneExtras" is always added
+        temp_scene['bevy_components'] = '{}'
+        split_bevy_components([temp_scene]) # temp scene is removed after export, nothing to restore
+
+        cell_collection = bpy.data.collections.new(cell.name)
+        for obj in cell.objects:
+            cell_collection.objects.link(obj)
+
+        blueprints_instances, export_components, split_components = [], {}, []
+        try:
+            # find collection instances to be replaced with 'empty' with blueprint name
+            blueprints_instances = replace_collection_instances(settings, scene, cell.objects)
+            export_components = add_export_components(settings, cell.objects, scene, cell.gn_blueprints)
+            split_components = split_bevy_components(cell.objects)
+
+            temp_root_collection = temp_scene.collection
+            bpy.context.window.scene = temp_scene
+
+            with bpy.context.temp_override(scene=temp_scene, area=area, region=region):
+                # detect scene mistmatch
+                scene_mismatch = bpy.context.scene.name != bpy.context.window.scene.name
+                if scene_mismatch:
+                    failure.append(cell.name)
+                    show_message_box("Error in Gltf Exporter", icon="ERROR", lines=[f"Context scene mismatch, aborting: {bpy.context.scene.name} vs {bpy.context.window.scene.name}"])
+                else:
+                    set_active_collection(bpy.context.scene, temp_root_collection.name)
+                    temp_root_collection.children.link(cell_collection)
+
+                    try:
+                        export_gltf(settings, gltf_path)
+                        optimize_export(settings, gltf_path)
+                        exported.extend(cell.objects)
+                    except Exception as error:
+                        failure.append(cell.name)
+                        print("failed to export cell gltf !", error)
+                        show_message_box("Error in Gltf Exporter", icon="ERROR", lines=exception_traceback(error))
+                    finally:
+                        bpy.data.scenes.remove(temp_scene, do_unlink=True)
+                        bpy.data.collections.remove(cell_collection)
+        finally:
+            # restore collection instances
+            for inst in blueprints_instances:
+                inst.object.instance_collection = inst.collection
+
+            restore_bevy_components(split_components)
+            restore_export_components(export_components)
+
+        if cell.name not in failure:
+            low, high = bevy_bounds(cell.min, cell.max)
+            index.append({
+                "name": cell.name,
+                "path": settings.scene_cell_asset_path(scene, cell.name),
+                "min": low,
+                "max": high,
+                "blueprints": sorted({settings.blueprint_asset_path(col) for col in cell.blueprints} | cell.gn_blueprints),
+            })
+            file_size = os.path.getsize(settings.scene_cell_path(scene, cell.name, True)) / (1024 * 1024)
+            print(f"{scene.name:30} {cell.name:20} {time.time() - tmp_time:6.2f}s {file_size:.2f}MB")
+
+    # cells left over from an earlier export would be streamed in by nothing, remove them
+    current = {os.path.basename(settings.scene_cell_path(scene, cell.name, True)) for cell in cells.values()}
+    for file_name in os.listdir(path):
+        if file_name.startswith("cell_") and file_name.endswith(('.glb', '.gltf')) and file_name not in current:
+            os.remove(os.path.join(path, file_name))
+
+    with open(settings.scene_cell_index_path(scene), "w") as f:
+        json.dump({
+            "scene": os.path.join(SCENE_FOLDER, os.path.basename(settings.scene_path(scene, True))),
+            "cell_size": scene_props.partition_cell_size,
+            "cells": index,
+        }, f, indent=2)
+
+    return exported, failure
+
 ## Export a scene as single gltf file for bevy
 def export_scene(settings: SPARROW_PG_Settings, area, region, scene) -> bool:
     success = False
@@ -56,37 +274,100 @@ def export_scene(settings: SPARROW_PG_Settings, area, region, scene) -> bool:
     
     tmp_time = time.time()
 
+    # world partition: the cells are exported first, the scene file keeps everything else
+    cell_objects, cell_failure = [], []
+    if scene.sparrow_scene_props.partition_export:
+        cell_objects, cell_failure = export_scene_cells(settings, area, region, scene)
+
     # we set our active scene to active
     bpy.context.window.scene = scene
 
+    # hide the objects exported to cells, the exporter only takes visible objects
+    view_layer = scene.view_layers['ViewLayer']
+    hidden_objects = [(obj, obj.hide_get(view_layer=view_layer)) for obj in cell_objects]
+    for obj, _ in hidden_objects:
+        obj.hide_set(True, view_layer=view_layer)
+
     layer_collection = scene.view_layers['ViewLayer'].layer_collection
     bpy.context.view_layer.active_layer_collection = recurLayerCollection(layer_collection, scene.collection.name)
         
-    # find collection instances to be replaced with 'empty' with blueprint name
-    blueprints_instances = replace_collection_instances(settings, scene)
-    
-    with bpy.context.temp_override(scene=scene, area=area, region=region):
+    dedupe_entity_ids(scene.objects)
+
+    blueprints_instances, export_components, split_components = [], {}, []
+    try:
+        # find collection instances to be replaced with 'empty' with blueprint name
+        blueprints_instances = replace_collection_instances(settings, scene)
+        export_components = add_export_components(settings, scene.objects, scene)
+        split_components = split_bevy_components([scene] + list(scene.objects))
+
+        with bpy.context.temp_override(scene=scene, area=area, region=region):
             # detect scene mistmatch
-        scene_mismatch = bpy.context.scene.name != bpy.context.window.scene.name
-        if scene_mismatch:
-            show_message_box("Error in Gltf Exporter", icon="ERROR", lines=[f"Context scene mismatch, aborting: {bpy.context.scene.name} vs {bpy.context.window.scene.name}"])
-        else:
-            try:
-                export_gltf(settings, gltf_path)
-                success = True
-            except Exception as error:
-                print("failed to export scene gltf !", error) 
-                show_message_box("Error in Gltf Exporter", icon="ERROR", lines=exception_traceback(error))
-            finally:
-                # restore collection instances
-                for inst in blueprints_instances:
-                    inst.object.instance_collection = inst.collection                    
+            scene_mismatch = bpy.context.scene.name != bpy.context.window.scene.name
+            if scene_mismatch:
+                show_message_box("Error in Gltf Exporter", icon="ERROR", lines=[f"Context scene mismatch, aborting: {bpy.context.scene.name} vs {bpy.context.window.scene.name}"])
+            else:
+                try:
+                    export_gltf(settings, gltf_path)
+                    optimize_export(settings, gltf_path)
+                    success = True
+                except Exception as error:
+                    print("failed to export scene gltf !", error) 
+                    show_message_box("Error in Gltf Exporter", icon="ERROR", lines=exception_traceback(error))
+    finally:
+        # restore collection instances
+        for inst in blueprints_instances:
+            inst.object.instance_collection = inst.collection
+
+        restore_bevy_components(split_components)
+        restore_export_components(export_components)
+
+        for obj, hidden in hidden_objects:
+            obj.hide_set(hidden, view_layer=view_layer)
 
     file_size = os.path.getsize(settings.scene_path(scene, True)) / (1024 * 1024)
     print(f"{scene.name:30}: {time.time() - tmp_time:6.2f}s {file_size:.2f}MB")
-    return success
+    if len(cell_failure) > 0:
+        print(f"{scene.name:30}: cells failed {cell_failure}")
+    return success and len(cell_failure) == 0
+
+# blueprints instanced anywhere inside a blueprint collection
+def blueprint_children(col: bpy.types.Collection) -> set[bpy.types.Collection]:
+    return {obj.instance_collection for obj in col.all_objects if is_blueprint_instance(obj)}
+
+# blueprints of the scene and every blueprint nested in them, children ordered before their parents
+# returns the export order and the blueprints that are part of, or depend on, a reference cycle
+def blueprint_export_order(roots) -> tuple[list[bpy.types.Collection], list[bpy.types.Collection]]:
+    children: Dict[bpy.types.Collection, set] = {}
+    stack = list(roots)
+    while stack:
+        col = stack.pop()
+        if col in children:
+            continue
+        children[col] = blueprint_children(col)
+        stack.extend(children[col])
+
+    # kahn's algorithm on child -> parent edges
+    parents: Dict[bpy.types.Collection, list] = {col: [] for col in children}
+    pending = {}
+    for col, col_children in children.items():
+        pending[col] = len(col_children)
+        for child in col_children:
+            parents[child].append(col)
+
+    ready = sorted((col for col, count in pending.items() if count == 0), key=lambda col: col.name)
+    order = []
+    while ready:
+        col = ready.pop(0)
+        order.append(col)
+        for parent in parents[col]:
+            pending[parent] -= 1
+            if pending[parent] == 0:
+                ready.append(parent)
 
-## Export all blueprints in a scene, doesnt support nested blueprints yet
+    cycles = sorted((col for col, count in pending.items() if count > 0), key=lambda col: col.name)
+    return order, cycles
+
+## Export all blueprints in a scene, blueprints nested in them are exported as references to their own file
 # returns success and failure lists of blueprints
 def export_scene_blueprints(settings: SPARROW_PG_Settings, area, region, scene) -> tuple[list[str], list[str]]:
     path = settings.blueprint_folder() 
@@ -95,12 +376,15 @@ def export_scene_blueprints(settings: SPARROW_PG_Settings, area, region, scene)
     success = []
     failure = []
     
-    # iterate over all collections
-    for col in bpy.data.collections:         
-        # filter collections that are not assets and not in the scene
-        if scene.user_of_id(col) == 0 or col.asset_data is None: 
-            continue
+    # filter collections that are not assets and not in the scene
+    order, cycles = blueprint_export_order(col for col in bpy.data.collections if scene.user_of_id(col) != 0 and col.asset_data is not None)
+    for col in cycles:
+        failure.append(col.name)
+        print(f"{scene.name:30} {col.name:20} skipped, blueprint references form a cycle: {sorted(child.name for child in blueprint_children(col))}")
+    if len(cycles) > 0:
+        show_message_box("Error in Blueprint Export", icon="ERROR", lines=[f"Blueprint references form a cycle: {', '.join(col.name for col in cycles)}"])
 
+    for col in order:
         tmp_time = time.time()
         
         gltf_path = settings.blueprint_path(col)
@@ -115,41 +399,73 @@ def export_scene_blueprints(settings: SPARROW_PG_Settings, area, region, scene)
             # need to add something even if it has no components, so "GltfSceneExtras" is always added, can be used to flatten
             temp_scene['bevy_components'] = '{}' 
 
-        # find collection instances to be replaced with 'empty' with blueprint name
-        blueprints_instances = replace_collection_instances(settings, scene)
-                    
-        temp_root_collection = temp_scene.collection
-        bpy.context.window.scene = temp_scene
+        dedupe_entity_ids(col.all_objects)
 
-        with bpy.context.temp_override(scene=temp_scene, area=area, region=region):
-            # detect scene mistmatch
-            scene_mismatch = bpy.context.scene.name != bpy.context.window.scene.name
-            if scene_mismatch:
-                show_message_box("Error in Gltf Exporter", icon="ERROR", lines=[f"Context scene mismatch, aborting: {bpy.context.scene.name} vs {bpy.context.window.scene.name}"])
-            else:
-                # link the collection to the scene
-                set_active_collection(bpy.context.scene, temp_root_collection.name)
-                temp_root_collection.children.link(col)
+        blueprints_instances, export_components, split_components = [], {}, []
+        try:
+            # find collection instances nested in the blueprint to be replaced with 'empty' with blueprint name
+            blueprints_instances = replace_collection_instances(settings, scene, col.all_objects)
 
-                try:
-                    export_gltf(settings, gltf_path)
-                    success.append(col.name)
-                except Exception as error:
-                    failure.append(col.name)
-                    print("failed to export blueprint gltf !", error) 
-                    show_message_box("Error in Gltf Exporter", icon="ERROR", lines=exception_traceback(error))
-                finally:
-                    # restore everything
-                    bpy.data.scenes.remove(temp_scene, do_unlink=True)
+            # link the collection to the temp scene, the blueprint may be excluded from the scene view layer and only evaluated here
+            temp_root_collection = temp_scene.collection
+            temp_root_collection.children.link(col)
+            export_components = add_export_components(settings, col.all_objects, temp_scene)
 
-        # restore collection instances
-        for inst in blueprints_instances:
-            inst.object.instance_collection = inst.collection                    
+            split_bevy_components([temp_scene]) # temp scene is removed after export, nothing to restore
+            split_components = split_bevy_components(col.all_objects)
+
+            bpy.context.window.scene = temp_scene
+
+            with bpy.context.temp_override(scene=temp_scene, area=area, region=region):
+                # detect scene mistmatch
+                scene_mismatch = bpy.context.scene.name != bpy.context.window.scene.name
+                if scene_mismatch:
+                    show_message_box("Error in Gltf Exporter", icon="ERROR", lines=[f"Context scene mismatch, aborting: {bpy.context.scene.name} vs {bpy.context.window.scene.name}"])
+                else:
+                    set_active_collection(bpy.context.scene, temp_root_collection.name)
+
+                    try:
+                        export_gltf(settings, gltf_path)
+                        optimize_export(settings, gltf_path)
+                        success.append(col.name)
+                    except Exception as error:
+                        failure.append(col.name)
+                        print("failed to export blueprint gltf !", error) 
+                        show_message_box("Error in Gltf Exporter", icon="ERROR", lines=exception_traceback(error))
+                    finally:
+                        # restore everything
+                        bpy.data.scenes.remove(temp_scene, do_unlink=True)
+        finally:
+            # restore collection instances
+            for inst in blueprints_instances:
+                inst.object.instance_collection = inst.collection
+
+            restore_bevy_components(split_components)
+            restore_export_components(export_components)
 
         file_size = os.path.getsize(settings.blueprint_path(col, True)) / (1024 * 1024)
         print(f"{scene.name:30} {col.name:20} {time.time() - tmp_time:6.2f}s {file_size:.2f}mb")
     return success, failure
 
+## Rewrite an exported glb with the optimizer and texture stage, a failure keeps the file as exported
+def optimize_export(settings: SPARROW_PG_Settings, gltf_path: str):
+    if settings.gltf_format != 'GLB':
+        return
+    if settings.optimize_glb or settings.animation_tolerance > 0:
+        try:
+            optimize = settings.optimize_glb
+            size_before, size_after = optimize_glb(gltf_path, settings.glb_quantization if optimize else 'NONE', prune=optimize, reorder=optimize, animation_tolerance=settings.animation_tolerance)
+            print(f"{os.path.basename(gltf_path):30}: optimized {size_before / 1024:.1f}KB -> {size_after / 1024:.1f}KB, saved {(size_before - size_after) / 1024:.1f}KB")
+        except Exception as error:
+            print("failed to optimize glb !", gltf_path, error)
+    if settings.ktx2_textures:
+        try:
+            converted = convert_glb_textures(gltf_path, settings.texture_max_size, settings.data_texture_max_size)
+            if converted > 0:
+                print(f"{os.path.basename(gltf_path):30}: {converted} textures to ktx2, {os.path.getsize(gltf_path) / 1024:.1f}KB")
+        except Exception as error:
+            print("failed to convert glb textures !", gltf_path, error)
+
 ## The call the gltf_scene_io, with our settings
 def export_gltf(settings: SPARROW_PG_Settings, gltf_path: str):
     bpy.ops.export_scene.gltf(
@@ -166,7 +482,8 @@ def export_gltf(settings: SPARROW_PG_Settings, gltf_path: str):
         export_extras=True, # For custom exported properties.
         export_animations=True,
         export_animation_mode='ACTIONS',
-        export_gn_mesh=True,                    
+        export_anim_single_armature=not settings.bound_actions_only, # otherwise every action an armature can play is exported
+        export_gn_mesh=not settings.gn_instance_lists, # instance lists carry the instances of blueprints instead
         export_normals=True,
         export_texcoords=True,
 
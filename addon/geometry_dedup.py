@@ -0,0 +1,154 @@
+import hashlib
+from collections import defaultdict
+from typing import Dict, List
+
+import bpy
+import numpy as np
+from mathutils import Matrix
+
+from .utils import recurLayerCollection
+
+# Geometry deduplication: objects are grouped by a hash of their evaluated mesh in one pass,
+# duplicates can then be turned into a single asset collection plus collection instances,
+# which replace_collection_instances exports as blueprints.
+
+# collection holding the generated blueprint collections, excluded from the view layer so they only show through their instances
+DEDUP_LIBRARY = "Blueprints"
+
+
+def hash_quantized(digest, collection, attribute: str, width: int, tolerance: float):
+    values = np.empty(len(collection) * width, dtype=np.float64)
+    collection.foreach_get(attribute, values)
+    # snap to the tolerance grid, +0.0 folds -0.0 into 0.0
+    digest.update((np.round(values / tolerance) + 0.0).astype(np.int64).tobytes())
+
+
+def hash_indices(digest, collection, attribute: str):
+    values = np.empty(len(collection), dtype=np.int32)
+    collection.foreach_get(attribute, values)
+    digest.update(values.tobytes())
+
+
+# hash of the evaluated local space geometry, uvs and materials of an object
+# positions and uvs are quantized to `tolerance`, so float noise from imports does not split identical parts
+def geometry_fingerprint(obj, depsgraph, tolerance: float) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+
+    obj_eval = obj.evaluated_get(depsgraph)
+    mesh = obj_eval.to_mesh()
+    try:
+        digest.update(f"{len(mesh.vertices)};{len(mesh.loops)};{len(mesh.polygons)};".encode())
+        hash_quantized(digest, mesh.vertices, 'co', 3, tolerance)
+        hash_indices(digest, mesh.loops, 'vertex_index')
+        hash_indices(digest, mesh.polygons, 'loop_start')
+        hash_indices(digest, mesh.polygons, 'material_index')
+        for uv_layer in mesh.uv_layers:
+            digest.update(f"uv:{uv_layer.name};".encode())
+            hash_quantized(digest, uv_layer.data, 'uv', 2, tolerance)
+    finally:
+        obj_eval.to_mesh_clear()
+
+    for slot in obj.material_slots:
+        digest.update(f"material:{slot.material.name if slot.material else None};".encode())
+
+    return digest.hexdigest()
+
+
+# group mesh objects with the same geometry, objects already sharing a mesh without modifiers are hashed once
+def find_duplicate_meshes(objects, depsgraph, tolerance: float) -> Dict[str, List[bpy.types.Object]]:
+    groups = defaultdict(list)
+    shared = {}
+    for obj in objects:
+        if obj.type != 'MESH':
+            continue
+        key = (obj.data.as_pointer(), tuple(slot.material.name if slot.material else None for slot in obj.material_slots)) if len(obj.modifiers) == 0 else None
+        fingerprint = shared.get(key) if key is not None else None
+        if fingerprint is None:
+            fingerprint = geometry_fingerprint(obj, depsgraph, tolerance)
+            if key is not None:
+                shared[key] = fingerprint
+        groups[fingerprint].append(obj)
+
+    return {fingerprint: group for fingerprint, group in groups.items() if len(group) > 1}
+
+
+# objects in the view layer outside the dedup library and other asset collections,
+# so a second run leaves the blueprint sources of the first one alone
+def dedup_candidates(scene, view_layer, objects) -> List[bpy.types.Object]:
+    skipped = set()
+    for collection in [scene.collection.children.get(DEDUP_LIBRARY)] + [col for col in bpy.data.collections if col.asset_data is not None]:
+        if collection is not None:
+            skipped.add(collection)
+            skipped.update(collection.children_recursive)
+    layer_objects = set(view_layer.objects)
+    return [obj for obj in objects if obj in layer_objects and not any(col in skipped for col in obj.users_collection)]
+
+
+def dedup_library(scene) -> bpy.types.Collection:
+    library = scene.collection.children.get(DEDUP_LIBRARY)
+    if library is None:
+        library = bpy.data.collections.new(DEDUP_LIBRARY)
+        scene.collection.children.link(library)
+    for view_layer in scene.view_layers:
+        layer_collection = recurLayerCollection(view_layer.layer_collection, library.name)
+        if layer_collection is not None:
+            layer_collection.exclude = True
+    return library
+
+
+# put an instance of `collection` where `obj` was: same collections, parent, transform, children and components
+def replace_with_instance(obj, collection: bpy.types.Collection) -> bpy.types.Object:
+    instance = bpy.data.objects.new(obj.name, None)
+    instance.instance_type = 'COLLECTION'
+    instance.instance_collection = collection
+    for user_collection in obj.users_collection:
+        user_collection.objects.link(instance)
+
+    instance.parent = obj.parent
+    instance.matrix_world = obj.matrix_world.copy()
+    for child in obj.children:
+        matrix = child.matrix_world.copy()
+        child.parent = instance
+        child.matrix_world = matrix
+
+    if 'bevy_components' in obj:
+        instance['bevy_components'] = obj['bevy_components']
+    return instance
+
+
+# turn each group into one asset collection holding the first object at the origin, every object of the group becomes an instance of it
+# returns the number of replaced objects
+def instance_duplicates(scene, groups: Dict[str, List[bpy.types.Object]]) -> int:
+    library = dedup_library(scene)
+
+    replaced = 0
+    for group in groups.values():
+        group = sorted(group, key=lambda obj: obj.name)
+        names = [obj.name for obj in group]
+        source = group[0]
+
+        collection = bpy.data.collections.new(source.name)
+        library.children.link(collection)
+        collection.asset_mark()
+
+        instances = [replace_with_instance(obj, collection) for obj in group]
+
+        # the source keeps its mesh and modifiers, moved into the blueprint with no transform
+        for user_collection in list(source.users_collection):
+            user_collection.objects.unlink(source)
+        collection.objects.link(source)
+        source.name = f"{names[0]}_Mesh"
+        source.parent = None
+        source.matrix_world = Matrix.Identity(4)
+        if 'bevy_components' in source:
+            del source['bevy_components']
+
+        for obj in group[1:]:
+            bpy.data.objects.remove(obj, do_unlink=True)
+
+        # the instances take over the original names
+        for instance, name in zip(instances, names):
+            instance.name = name
+        replaced += len(group) - 1
+
+    return replaced
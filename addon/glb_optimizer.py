@@ -0,0 +1,469 @@
+import json
+import os
+import struct
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Post export optimizer for .glb files written by io_scene_gltf2: the json and binary chunk are read back,
+# vertex attributes are quantized, attribute sets bevy never reads are dropped, triangles are reordered
+# for the post transform vertex cache and animation keys are reduced, then the binary chunk is rebuilt and the file rewritten in place.
+
+GLB_MAGIC = 0x46546C67
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+COMPONENT_DTYPES = {5120: np.int8, 5121: np.uint8, 5122: np.int16, 5123: np.uint16, 5125: np.uint32, 5126: np.float32}
+TYPE_SIZES = {'SCALAR': 1, 'VEC2': 2, 'VEC3': 3, 'VEC4': 4, 'MAT2': 4, 'MAT3': 9, 'MAT4': 16}
+
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+# files using these are left untouched, their mesh data is not stored in plain accessors
+SKIPPED_EXTENSIONS = ['KHR_draco_mesh_compression', 'EXT_meshopt_compression']
+
+# the bevy gltf loader only reads these sets, higher ones are dropped
+# TEXCOORD_1 is always kept, bevy reads lightmaps from it and they are assigned at runtime, not in the gltf material
+BEVY_TEXCOORDS = 2
+BEVY_COLORS = 1
+
+VERTEX_CACHE_SIZE = 16
+
+
+def read_glb(path: str) -> Tuple[Dict[str, Any], bytes]:
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, length = struct.unpack_from("<III", data, 0)
+    if magic != GLB_MAGIC or version != 2:
+        raise ValueError(f"{path} is not a glb 2.0 file")
+
+    gltf, binary = None, b""
+    offset = 12
+    while offset < length:
+        chunk_length, chunk_type = struct.unpack_from("<II", data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == CHUNK_JSON:
+            gltf = json.loads(chunk)
+        elif chunk_type == CHUNK_BIN:
+            binary = bytes(chunk)
+        offset += 8 + chunk_length
+    return gltf, binary
+
+
+def write_glb(path: str, gltf: Dict[str, Any], binary: bytes):
+    json_chunk = json.dumps(gltf, separators=(',', ':')).encode()
+    json_chunk += b" " * (-len(json_chunk) % 4)
+    binary += b"\x00" * (-len(binary) % 4)
+
+    length = 12 + 8 + len(json_chunk) + (8 + len(binary) if len(binary) > 0 else 0)
+    # write then rename, bevy's asset watcher never sees a half written file
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(struct.pack("<III", GLB_MAGIC, 2, length))
+        f.write(struct.pack("<II", len(json_chunk), CHUNK_JSON) + json_chunk)
+        if len(binary) > 0:
+            f.write(struct.pack("<II", len(binary), CHUNK_BIN) + binary)
+    os.replace(f"{path}.tmp", path)
+
+
+def read_accessor(gltf: Dict[str, Any], binary: bytes, index: int) -> np.ndarray:
+    accessor = gltf["accessors"][index]
+    dtype = np.dtype(COMPONENT_DTYPES[accessor["componentType"]])
+    width = TYPE_SIZES[accessor["type"]]
+    count = accessor["count"]
+
+    if "bufferView" not in accessor:
+        return np.zeros((count, width), dtype=dtype)
+
+    view = gltf["bufferViews"][accessor["bufferView"]]
+    offset = view.get("byteOffset", 0) + accessor.get("byteOffset", 0)
+    stride = view.get("byteStride", dtype.itemsize * width)
+    values = np.ndarray((count, width), dtype=dtype, buffer=binary, offset=offset, strides=(stride, dtype.itemsize))
+    return values.copy()
+
+
+# every place io_scene_gltf2 references an accessor from, as (container, key) pairs
+def accessor_references(gltf: Dict[str, Any]) -> List[Tuple[Any, Any]]:
+    references = []
+    for mesh in gltf.get("meshes", []):
+        for primitive in mesh["primitives"]:
+            references.extend((primitive["attributes"], name) for name in primitive["attributes"])
+            if "indices" in primitive:
+                references.append((primitive, "indices"))
+            for target in primitive.get("targets", []):
+                references.extend((target, name) for name in target)
+    for skin in gltf.get("skins", []):
+        if "inverseBindMatrices" in skin:
+            references.append((skin, "inverseBindMatrices"))
+    for animation in gltf.get("animations", []):
+        for sampler in animation["samplers"]:
+            references.extend([(sampler, "input"), (sampler, "output")])
+    for node in gltf.get("nodes", []):
+        instancing = node.get("extensions", {}).get("EXT_mesh_gpu_instancing")
+        if instancing is not None:
+            references.extend((instancing["attributes"], name) for name in instancing["attributes"])
+    return references
+
+
+def prune_attributes(primitive: Dict[str, Any]) -> int:
+    pruned = 0
+    for name in list(primitive["attributes"]):
+        prefix, _, set_index = name.partition('_')
+        if not set_index.isdigit():
+            continue
+        set_index = int(set_index)
+        if (prefix == 'TEXCOORD' and set_index >= BEVY_TEXCOORDS) or (prefix == 'COLOR' and set_index >= BEVY_COLORS):
+            del primitive["attributes"][name]
+            pruned += 1
+    return pruned
+
+
+def normalized(values: np.ndarray, dtype) -> np.ndarray:
+    info = np.iinfo(dtype)
+    if info.min < 0:
+        return np.round(np.clip(values, -1.0, 1.0) * info.max).astype(dtype)
+    return np.round(np.clip(values, 0.0, 1.0) * info.max).astype(dtype)
+
+
+# quantized (values, componentType) for an attribute, None when it stays float
+# only uvs and colors already in 0..1, both core gltf, hdr colors would be clipped; normals and tangents stay float,
+# bevy's gltf loader has no 8 bit 3 component vertex format and expects float tangents
+def quantize_attribute(name: str, values: np.ndarray, mode: str):
+    if values.dtype != np.float32 or len(values) == 0 or values.min() < 0.0 or values.max() > 1.0:
+        return None
+    if name.startswith('TEXCOORD_') or name.startswith('COLOR_'):
+        return normalized(values, np.uint16), 5123
+    return None
+
+
+# tipsify (Sander et al. 2007): greedy fan walk that keeps the next vertex inside the vertex cache, linear in the triangle count
+def reorder_triangles(indices: np.ndarray, vertex_count: int, cache_size: int = VERTEX_CACHE_SIZE) -> np.ndarray:
+    triangle_count = len(indices) // 3
+    if triangle_count < 2:
+        return indices
+
+    triangles = indices.reshape(-1, 3).tolist()
+    adjacency_order = np.argsort(indices, kind='stable') // 3
+    live = np.bincount(indices, minlength=vertex_count)
+    starts = np.concatenate(([0], np.cumsum(live))).tolist()
+    adjacency_order = adjacency_order.tolist()
+    live = live.tolist()
+
+    cache_time = [0] * vertex_count
+    emitted = [False] * triangle_count
+    dead_end = []
+    output = []
+    timestamp = cache_size + 1
+    cursor = 0
+    vertex = int(indices[0])
+
+    while vertex >= 0:
+        candidates = []
+        for triangle in adjacency_order[starts[vertex]:starts[vertex + 1]]:
+            if emitted[triangle]:
+                continue
+            emitted[triangle] = True
+            output.append(triangle)
+            for corner in triangles[triangle]:
+                dead_end.append(corner)
+                candidates.append(corner)
+                live[corner] -= 1
+                if timestamp - cache_time[corner] > cache_size:
+                    cache_time[corner] = timestamp
+                    timestamp += 1
+
+        # next fanning vertex: the candidate that stays longest in the cache, else a dead end or the next live vertex
+        vertex, best = -1, -1
+        for candidate in candidates:
+            if live[candidate] > 0:
+                priority = timestamp - cache_time[candidate] if timestamp - cache_time[candidate] + 2 * live[candidate] <= cache_size else 0
+                if priority > best:
+                    vertex, best = candidate, priority
+        if vertex == -1:
+            while dead_end:
+                candidate = dead_end.pop()
+                if live[candidate] > 0:
+                    vertex = candidate
+                    break
+        if vertex == -1:
+            while cursor < vertex_count:
+                if live[cursor] > 0:
+                    vertex = cursor
+                    break
+                cursor += 1
+
+    return indices.reshape(-1, 3)[output].ravel()
+
+
+# vertex order by first use in the index buffer, unused vertices go last
+def vertex_fetch_order(indices: np.ndarray, vertex_count: int) -> np.ndarray:
+    _, first = np.unique(indices, return_index=True)
+    order = indices[np.sort(first)]
+    unused = np.setdiff1d(np.arange(vertex_count), order, assume_unique=True)
+    return np.concatenate((order, unused)).astype(np.int64)
+
+
+# rest values of the node properties animation channels target
+NODE_DEFAULTS = {'translation': [0.0, 0.0, 0.0], 'rotation': [0.0, 0.0, 0.0, 1.0], 'scale': [1.0, 1.0, 1.0]}
+
+
+def interpolate(start: np.ndarray, end: np.ndarray, t: np.ndarray, rotation: bool) -> np.ndarray:
+    if rotation and np.dot(start, end) < 0:
+        end = -end
+    values = start + (end - start) * t[:, None]
+    if rotation:
+        # nlerp, close enough to slerp over the short spans between keys
+        values /= np.linalg.norm(values, axis=1, keepdims=True)
+    return values
+
+
+# indices of the keys to keep so linear interpolation between them stays within `tolerance` of every dropped key
+# greedy: a span grows until one of the keys inside it can not be interpolated anymore
+def simplify_keys(times: np.ndarray, values: np.ndarray, tolerance: float, rotation: bool) -> List[int]:
+    count = len(times)
+    if count <= 2:
+        return list(range(count))
+
+    keep = [0]
+    start = 0
+    for end in range(2, count):
+        span = times[end] - times[start]
+        t = (times[start + 1:end] - times[start]) / span if span > 0 else np.zeros(end - start - 1)
+        error = np.abs(interpolate(values[start], values[end], t, rotation) - values[start + 1:end]).max()
+        if error > tolerance:
+            keep.append(end - 1)
+            start = end - 1
+    keep.append(count - 1)
+    return keep
+
+
+# error bounded keyframe reduction of LINEAR and STEP samplers, constant tracks that match the node's rest value
+# and are not animated by another animation are removed, returns the number of removed keys
+def simplify_animations(gltf: Dict[str, Any], binary: bytes, replaced: Dict[int, tuple], tolerance: float) -> int:
+    accessors = gltf["accessors"]
+    nodes = gltf.get("nodes", [])
+
+    targets = {}
+    for animation in gltf.get("animations", []):
+        for channel in animation["channels"]:
+            key = (channel["target"].get("node"), channel["target"]["path"])
+            targets[key] = targets.get(key, 0) + 1
+
+    removed = 0
+    for animation in gltf.get("animations", []):
+        channels = []
+        for channel in animation["channels"]:
+            sampler = animation["samplers"][channel["sampler"]]
+            path = channel["target"]["path"]
+            if sampler.get("interpolation", 'LINEAR') == 'CUBICSPLINE' or path not in ['translation', 'rotation', 'scale', 'weights']:
+                channels.append(channel)
+                continue
+
+            times = read_accessor(gltf, binary, sampler["input"]).ravel().astype(np.float64)
+            output = read_accessor(gltf, binary, sampler["output"])
+            is_normalized = accessors[sampler["output"]].get("normalized", False)
+            # one row per key, morph weights store all targets of a key as scalars
+            values = output.astype(np.float64).reshape(len(times), -1)
+            if is_normalized:
+                values /= np.iinfo(output.dtype).max
+
+            node = nodes[channel["target"]["node"]] if "node" in channel["target"] else {}
+            constant = np.abs(values - values[0]).max() <= tolerance
+            if constant and path in NODE_DEFAULTS and "matrix" not in node and targets[(channel["target"].get("node"), path)] == 1 \
+                    and np.abs(values[0] - np.array(node.get(path, NODE_DEFAULTS[path]))).max() <= tolerance:
+                removed += len(times)
+                continue
+
+            if len(times) <= 2:
+                keep = list(range(len(times)))
+            elif constant:
+                keep = [0, len(times) - 1]
+            elif sampler.get("interpolation", 'LINEAR') == 'STEP':
+                changes = np.abs(np.diff(values, axis=0)).max(axis=1) > tolerance
+                keep = [0] + [index + 1 for index in np.nonzero(changes)[0]] + ([len(times) - 1] if not changes[-1] else [])
+            else:
+                keep = simplify_keys(times, values, tolerance, path == 'rotation')
+
+            channels.append(channel)
+            if len(keep) == len(times):
+                continue
+            removed += len(times) - len(keep)
+
+            # samplers often share their time accessor, the reduced keys get their own accessors
+            kept_times = times[keep].astype(np.float32).reshape(-1, 1)
+            kept_values = output.reshape(len(times), -1)[keep].reshape(-1, output.shape[1])
+
+            accessors.append({"componentType": 5126, "count": len(kept_times), "type": 'SCALAR', "min": [float(kept_times.min())], "max": [float(kept_times.max())]})
+            replaced[len(accessors) - 1] = (kept_times, 5126, False, None)
+            sampler["input"] = len(accessors) - 1
+
+            output_type = accessors[sampler["output"]]
+            accessors.append({"componentType": output_type["componentType"], "count": len(kept_values), "type": output_type["type"]})
+            replaced[len(accessors) - 1] = (kept_values, output_type["componentType"], is_normalized, None)
+            sampler["output"] = len(accessors) - 1
+
+        # drop samplers no channel uses anymore
+        used = sorted({channel["sampler"] for channel in channels})
+        sampler_remap = {old: new for new, old in enumerate(used)}
+        animation["samplers"] = [animation["samplers"][index] for index in used]
+        for channel in channels:
+            channel["sampler"] = sampler_remap[channel["sampler"]]
+        animation["channels"] = channels
+
+    gltf["animations"] = [animation for animation in gltf.get("animations", []) if len(animation["channels"]) > 0]
+    if len(gltf["animations"]) == 0:
+        del gltf["animations"]
+    return removed
+
+
+class BufferBuilder:
+    def __init__(self):
+        self.data = bytearray()
+        self.views = []
+
+    def add(self, raw: bytes, target=None, stride=None) -> int:
+        self.data += b"\x00" * (-len(self.data) % 4)
+        view = {"buffer": 0, "byteOffset": len(self.data), "byteLength": len(raw)}
+        if stride is not None:
+            view["byteStride"] = stride
+        if target is not None:
+            view["target"] = target
+        self.data += raw
+        self.views.append(view)
+        return len(self.views) - 1
+
+    # vertex attribute elements have to start on 4 byte boundaries, short vectors get padded
+    def add_attribute(self, values: np.ndarray) -> int:
+        element = values.dtype.itemsize * values.shape[1]
+        stride = element + (-element % 4)
+        if stride != element:
+            padded = np.zeros((len(values), stride), dtype=np.uint8)
+            padded[:, :element] = values.view(np.uint8).reshape(len(values), element)
+            return self.add(padded.tobytes(), ARRAY_BUFFER, stride)
+        return self.add(np.ascontiguousarray(values).tobytes(), ARRAY_BUFFER)
+
+
+# optimize a glb in place, returns (bytes before, bytes after)
+def optimize_glb(path: str, quantization: str = 'CORE', prune: bool = True, reorder: bool = True, animation_tolerance: float = 0.0) -> Tuple[int, int]:
+    size_before = os.path.getsize(path)
+    gltf, binary = read_glb(path)
+    if gltf is None or any(extension in gltf.get("extensionsUsed", []) for extension in SKIPPED_EXTENSIONS) or len(gltf.get("buffers", [])) != 1:
+        return size_before, size_before
+
+    accessors = gltf.get("accessors", [])
+    replaced = {} # accessor index -> (values, componentType, normalized, target)
+
+    primitives = [primitive for mesh in gltf.get("meshes", []) for primitive in mesh["primitives"]]
+
+    # Prune
+    if prune:
+        for primitive in primitives:
+            prune_attributes(primitive)
+
+    # Reorder, vertices are only remapped when the primitive owns its vertex accessors
+    if reorder:
+        users = {}
+        for container, key in accessor_references(gltf):
+            users[container[key]] = users.get(container[key], 0) + 1
+
+        for primitive in primitives:
+            if primitive.get("mode", 4) != 4 or "indices" not in primitive or "POSITION" not in primitive["attributes"] or primitive["indices"] in replaced:
+                continue
+            vertex_count = accessors[primitive["attributes"]["POSITION"]]["count"]
+            indices = read_accessor(gltf, binary, primitive["indices"]).ravel().astype(np.int64)
+            indices = reorder_triangles(indices, vertex_count)
+
+            vertex_accessors = list(primitive["attributes"].values()) + [index for target in primitive.get("targets", []) for index in target.values()]
+            if all(users[index] == 1 and "sparse" not in accessors[index] for index in vertex_accessors):
+                order = vertex_fetch_order(indices, vertex_count)
+                remap = np.empty(vertex_count, dtype=np.int64)
+                remap[order] = np.arange(vertex_count)
+                indices = remap[indices]
+                for index in vertex_accessors:
+                    values = read_accessor(gltf, binary, index)[order]
+                    replaced[index] = (values, accessors[index]["componentType"], accessors[index].get("normalized", False), ARRAY_BUFFER)
+
+            index_type = (np.uint16, 5123) if vertex_count <= 65535 else (np.uint32, 5125)
+            replaced[primitive["indices"]] = (indices.astype(index_type[0]).reshape(-1, 1), index_type[1], False, ELEMENT_ARRAY_BUFFER)
+
+    # Quantize
+    if quantization != 'NONE':
+        for primitive in primitives:
+            for name, index in primitive["attributes"].items():
+                if "sparse" in accessors[index]:
+                    continue
+                values = replaced[index][0] if index in replaced else read_accessor(gltf, binary, index)
+                result = quantize_attribute(name, values, quantization)
+                if result is not None:
+                    replaced[index] = (result[0], result[1], True, ARRAY_BUFFER)
+
+    # Animations
+    if animation_tolerance > 0 and "animations" in gltf:
+        simplify_animations(gltf, binary, replaced, animation_tolerance)
+
+    # Compact accessors, dropping the ones nothing references anymore
+    references = accessor_references(gltf)
+    kept = sorted({container[key] for container, key in references})
+    remap = {old: new for new, old in enumerate(kept)}
+    for container, key in references:
+        container[key] = remap[container[key]]
+
+    # Rebuild the buffer: untouched views are copied, replaced accessors get their own view
+    view_users = set()
+    for index in kept:
+        accessor = accessors[index]
+        if index not in replaced and "bufferView" in accessor:
+            view_users.add(accessor["bufferView"])
+        for part in ['indices', 'values']:
+            if part in accessor.get("sparse", {}):
+                view_users.add(accessor["sparse"][part]["bufferView"])
+    for image in gltf.get("images", []):
+        if "bufferView" in image:
+            view_users.add(image["bufferView"])
+
+    builder = BufferBuilder()
+    view_remap = {}
+    for index in sorted(view_users):
+        view = gltf["bufferViews"][index]
+        offset = view.get("byteOffset", 0)
+        new_index = builder.add(binary[offset:offset + view["byteLength"]], view.get("target"), view.get("byteStride"))
+        view_remap[index] = new_index
+
+    new_accessors = []
+    for index in kept:
+        accessor = dict(accessors[index])
+        if index in replaced:
+            values, component_type, is_normalized, target = replaced[index]
+            accessor["componentType"] = component_type
+            accessor["byteOffset"] = 0
+            accessor["bufferView"] = builder.add_attribute(values) if target == ARRAY_BUFFER else builder.add(values.tobytes(), target)
+            if is_normalized:
+                accessor["normalized"] = True
+            else:
+                accessor.pop("normalized", None)
+            # positions are never quantized and keep their min / max, elsewhere they are optional
+            if component_type != accessors[index]["componentType"] or target == ELEMENT_ARRAY_BUFFER:
+                accessor.pop("min", None)
+                accessor.pop("max", None)
+        else:
+            if "bufferView" in accessor:
+                accessor["bufferView"] = view_remap[accessor["bufferView"]]
+            for part in ['indices', 'values']:
+                if part in accessor.get("sparse", {}):
+                    accessor["sparse"] = dict(accessor["sparse"])
+                    accessor["sparse"][part] = dict(accessor["sparse"][part], bufferView=view_remap[accessor["sparse"][part]["bufferView"]])
+        new_accessors.append(accessor)
+
+    for image in gltf.get("images", []):
+        if "bufferView" in image:
+            image["bufferView"] = view_remap[image["bufferView"]]
+
+    gltf["accessors"] = new_accessors
+    gltf["bufferViews"] = builder.views
+    gltf["buffers"] = [{"byteLength": len(builder.data)}] if len(builder.data) > 0 else []
+    if len(gltf["bufferViews"]) == 0:
+        del gltf["bufferViews"]
+    if len(gltf["buffers"]) == 0:
+        del gltf["buffers"]
+
+    write_glb(path, gltf, bytes(builder.data))
+    return size_before, os.path.getsize(path)
@@ -0,0 +1,77 @@
+import importlib
+from contextlib import contextmanager
+
+# Shared data across all gltf exports of one export run.
+# io_scene_gltf2 gathers every file from scratch, its own caches are reset whenever the export settings change,
+# and they always do since the file path is part of them. Gathered gltf objects are only valid inside their own file,
+# but encoded image bytes are not, so the image encode is memoized for the run: a texture shared by many
+# blueprints is converted and compressed once.
+
+# where ExportImage lives, newest layout first
+EXPORT_IMAGE_MODULES = [
+    'io_scene_gltf2.blender.exp.material.encode_image',
+    'io_scene_gltf2.blender.exp.gltf2_blender_image',
+]
+
+
+def find_export_image():
+    for name in EXPORT_IMAGE_MODULES:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            continue
+        export_image = getattr(module, 'ExportImage', None)
+        if export_image is not None and hasattr(export_image, 'encode'):
+            return export_image
+    return None
+
+
+def fill_key(fill):
+    image = getattr(fill, 'image', None)
+    return (type(fill).__name__, image.name_full if image is not None else None, getattr(fill, 'src_chan', None), getattr(fill, 'value', None))
+
+
+# what an encode depends on, None when the image is computed and can not be keyed
+def encode_key(export_image, mime_type, export_settings):
+    if getattr(export_image, 'numpy_calc', None) is not None:
+        return None
+    original = getattr(export_image, 'original', None)
+    fills = tuple(sorted((str(channel), fill_key(fill)) for channel, fill in getattr(export_image, 'fills', {}).items()))
+    return (original.name_full if original is not None else None, fills, mime_type, export_settings.get('gltf_image_quality'), export_settings.get('gltf_image_format'))
+
+
+class ExportSession:
+    def __init__(self):
+        self.encoded = {}
+        self.hits = 0
+        self.misses = 0
+
+
+@contextmanager
+def gltf_export_session():
+    session = ExportSession()
+    export_image = find_export_image()
+    if export_image is None:
+        yield session
+        return
+
+    encode = export_image.encode
+
+    # older exporters call encode without the export settings
+    def cached_encode(self, mime_type, *args, **kwargs):
+        export_settings = args[0] if len(args) > 0 else kwargs.get('export_settings', {})
+        key = encode_key(self, mime_type, export_settings)
+        if key is None:
+            return encode(self, mime_type, *args, **kwargs)
+        if key in session.encoded:
+            session.hits += 1
+            return session.encoded[key]
+        session.misses += 1
+        session.encoded[key] = encode(self, mime_type, *args, **kwargs)
+        return session.encoded[key]
+
+    export_image.encode = cached_encode
+    try:
+        yield session
+    finally:
+        export_image.encode = encode
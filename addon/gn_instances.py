@@ -0,0 +1,81 @@
+from typing import Dict, List
+
+import bpy
+from mathutils import Matrix
+
+from .utils import show_message_box, upsert_export_component
+
+# Geometry nodes instances as instance lists: instead of letting the gltf exporter realize every scattered instance,
+# the instances of blueprint objects are gathered from the evaluated depsgraph and written to the instancing object
+# as a `GnInstances` component, one flat transform array per blueprint, see src/instances.rs.
+# Each instance is 10 floats: translation xyz, rotation xyzw, scale xyz.
+
+GN_INSTANCES_COMPONENT = "sparrow::instances::GnInstances"
+
+
+def has_geometry_nodes(obj: bpy.types.Object) -> bool:
+    return any(modifier.type == 'NODES' and modifier.show_viewport for modifier in obj.modifiers)
+
+
+# local blender z up matrix to a bevy y up transform, the same conversion the gltf exporter applies to nodes
+def bevy_transform(matrix: Matrix) -> List[float]:
+    translation, rotation, scale = matrix.decompose()
+    return [translation.x, translation.z, -translation.y, rotation.x, rotation.z, -rotation.y, rotation.w, scale.x, scale.z, scale.y]
+
+
+# instances of each geometry nodes object by blueprint asset path, and per object the number of instances with no blueprint to point to
+def gather_gn_instances(settings, objects, depsgraph) -> tuple[Dict[bpy.types.Object, Dict[str, List[float]]], Dict[str, int]]:
+    gn_objects = {obj for obj in objects if has_geometry_nodes(obj)}
+    if len(gn_objects) == 0:
+        return {}, {}
+
+    lists: Dict[bpy.types.Object, Dict[str, List[float]]] = {}
+    seen = set()
+    skipped: Dict[str, int] = {}
+    for instance in depsgraph.object_instances:
+        if not instance.is_instance or instance.parent is None or instance.parent.original not in gn_objects:
+            continue
+        parent = instance.parent.original
+        prototype = instance.object.original
+        blueprint = next((col for col in prototype.users_collection if col.asset_data is not None), None) if prototype != parent else None
+        if blueprint is None:
+            skipped[parent.name] = skipped.get(parent.name, 0) + 1
+            continue
+
+        # a collection instanced by geometry nodes shows up once per object, go back to the blueprint root
+        root = instance.matrix_world.copy() @ prototype.matrix_world.inverted() @ Matrix.Translation(blueprint.instance_offset)
+        local = parent.matrix_world.inverted() @ root
+        key = (parent.name, blueprint.name, tuple(round(value, 5) for row in local for value in row))
+        if key in seen:
+            continue
+        seen.add(key)
+
+        lists.setdefault(parent, {}).setdefault(settings.blueprint_asset_path(blueprint), []).extend(bevy_transform(local))
+    return lists, skipped
+
+
+def instances_ron(per_blueprint: Dict[str, List[float]]) -> str:
+    entries = []
+    for path, transforms in sorted(per_blueprint.items()):
+        values = ", ".join(repr(round(value, 6)) for value in transforms)
+        entries.append(f'(blueprint: "{path.replace(chr(92), "/")}", transforms: [{values}])')
+    return "([" + ", ".join(entries) + "])"
+
+
+# add the GnInstances component to the geometry nodes objects, before split_bevy_components
+# original components are kept in `stored`, see restore_export_components
+# returns the asset paths of the instanced blueprints, they are only referenced from the component
+def add_gn_instance_lists(settings, objects, depsgraph, stored: dict) -> set:
+    lists, skipped = gather_gn_instances(settings, objects, depsgraph)
+    if len(skipped) > 0:
+        # the exporter does not realize geometry nodes instances in this mode, so this geometry is missing from the file
+        lines = [f"{name}: {count} instances of objects outside a blueprint are not exported" for name, count in sorted(skipped.items())]
+        lines.append("Put the instanced objects in an asset collection, or turn off GN Instance Lists")
+        print("geometry nodes instances: " + "; ".join(lines))
+        show_message_box("Geometry Nodes Instances Dropped", icon="ERROR", lines=lines)
+
+    blueprints = set()
+    for obj, per_blueprint in lists.items():
+        upsert_export_component(obj, GN_INSTANCES_COMPONENT, instances_ron(per_blueprint), stored)
+        blueprints.update(per_blueprint.keys())
+    return blueprints
@@ -0,0 +1,234 @@
+import os
+import struct
+import tempfile
+import zlib
+from typing import Any, Dict, List
+
+import bpy
+import numpy as np
+
+from .glb_optimizer import BufferBuilder, read_glb, write_glb
+
+# Texture stage for exported .glb files: png / jpeg images are decoded once at export, capped to a size per use,
+# their full mip chain is computed here and they are stored as KTX2 with zlib supercompressed rgba8 levels,
+# so bevy uploads them as they are instead of decoding and generating mips at load.
+# Bevy needs its ktx2 and zlib features for these, see the `ktx2` feature in Cargo.toml.
+
+KTX2_IDENTIFIER = b"\xABKTX 20\xBB\r\n\x1A\n"
+KTX2_MIME_TYPE = "image/ktx2"
+
+VK_FORMAT_R8G8B8A8_UNORM = 37
+VK_FORMAT_R8G8B8A8_SRGB = 43
+
+SUPERCOMPRESSION_NONE = 0
+SUPERCOMPRESSION_ZLIB = 3
+
+SOURCE_MIME_TYPES = {"image/png": ".png", "image/jpeg": ".jpg"}
+
+# material texture slots holding srgb colors, normal maps are renormalized per level, every other slot is linear data
+COLOR_TEXTURES = ['baseColorTexture', 'emissiveTexture', 'diffuseTexture', 'specularGlossinessTexture', 'sheenColorTexture', 'specularColorTexture']
+NORMAL_TEXTURES = ['normalTexture', 'clearcoatNormalTexture']
+
+USAGE_PRIORITY = ['COLOR', 'NORMAL', 'DATA']
+
+
+def find_texture_slots(value, slots: List[tuple]):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key.endswith('Texture') and isinstance(item, dict) and "index" in item:
+                slots.append((key, item["index"]))
+            find_texture_slots(item, slots)
+    elif isinstance(value, list):
+        for item in value:
+            find_texture_slots(item, slots)
+
+
+# image index -> COLOR, NORMAL or DATA, an image used both ways is treated as color
+def image_usages(gltf: Dict[str, Any]) -> Dict[int, str]:
+    usages = {}
+    textures = gltf.get("textures", [])
+    for material in gltf.get("materials", []):
+        slots = []
+        find_texture_slots(material, slots)
+        for key, texture_index in slots:
+            source = textures[texture_index].get("source") if texture_index < len(textures) else None
+            if source is None:
+                continue
+            usage = 'COLOR' if key in COLOR_TEXTURES else 'NORMAL' if key in NORMAL_TEXTURES else 'DATA'
+            if source not in usages or USAGE_PRIORITY.index(usage) < USAGE_PRIORITY.index(usages[source]):
+                usages[source] = usage
+    return usages
+
+
+# decode with blender, raw channel values top row first
+def decode_image(data: bytes, mime_type: str) -> np.ndarray:
+    with tempfile.NamedTemporaryFile(suffix=SOURCE_MIME_TYPES[mime_type], delete=False) as f:
+        f.write(data)
+    img = bpy.data.images.load(f.name)
+    try:
+        # keeps 16 bit images from being converted to linear on load
+        img.colorspace_settings.name = 'Non-Color'
+        width, height = img.size
+        pixels = np.empty(width * height * 4, dtype=np.float32)
+        img.pixels.foreach_get(pixels)
+    finally:
+        bpy.data.images.remove(img)
+        os.remove(f.name)
+    return pixels.reshape(height, width, 4)[::-1]
+
+
+def srgb_to_linear(values: np.ndarray) -> np.ndarray:
+    return np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(values: np.ndarray) -> np.ndarray:
+    values = np.clip(values, 0.0, 1.0)
+    return np.where(values <= 0.0031308, values * 12.92, 1.055 * values ** (1 / 2.4) - 0.055)
+
+
+# 2x2 box filter to floor(size / 2), an odd last row or column is dropped
+def downsample(pixels: np.ndarray) -> np.ndarray:
+    height, width = pixels.shape[:2]
+    if height > 1:
+        half = height // 2
+        pixels = (pixels[0:2 * half:2] + pixels[1:2 * half:2]) / 2
+    if width > 1:
+        half = width // 2
+        pixels = (pixels[:, 0:2 * half:2] + pixels[:, 1:2 * half:2]) / 2
+    return pixels
+
+
+# filtered values back to stored bytes
+def encode_level(pixels: np.ndarray, usage: str) -> np.ndarray:
+    pixels = pixels.copy()
+    if usage == 'COLOR':
+        pixels[..., :3] = linear_to_srgb(pixels[..., :3])
+    elif usage == 'NORMAL':
+        normals = pixels[..., :3]
+        length = np.linalg.norm(normals, axis=-1, keepdims=True)
+        pixels[..., :3] = np.divide(normals, length, out=np.zeros_like(normals), where=length > 0) * 0.5 + 0.5
+    return np.round(np.clip(pixels, 0.0, 1.0) * 255).astype(np.uint8)
+
+
+## Full mip chain, largest level first, levels larger than `max_size` are only used to filter the smaller ones
+# filtering is done on linear colors and unpacked normals
+def mip_chain(pixels: np.ndarray, usage: str, max_size: int = 0) -> List[np.ndarray]:
+    work = pixels.astype(np.float32)
+    if usage == 'COLOR':
+        work[..., :3] = srgb_to_linear(work[..., :3])
+    elif usage == 'NORMAL':
+        work[..., :3] = work[..., :3] * 2 - 1
+
+    levels = []
+    while True:
+        height, width = work.shape[:2]
+        if max_size <= 0 or max(width, height) <= max_size:
+            levels.append(encode_level(work, usage))
+        if width == 1 and height == 1:
+            return levels
+        work = downsample(work)
+
+
+# basic data format descriptor for rgba8, srgb alpha is still linear
+def data_format_descriptor(srgb: bool) -> bytes:
+    block_size = 24 + 16 * 4
+    words = [
+        0, # vendor id and descriptor type
+        2 | (block_size << 16), # version and block size
+        1 | (1 << 8) | ((2 if srgb else 1) << 16), # rgbsda color model, bt709 primaries, transfer function, straight alpha
+        0, # 1x1x1x1 texel block
+        4, # bytes per plane
+        0,
+    ]
+    for bit_offset, channel in [(0, 0), (8, 1), (16, 2), (24, 15)]:
+        qualifiers = 0x10 if srgb and channel == 15 else 0 # alpha is linear
+        words += [bit_offset | (7 << 16) | ((channel | qualifiers) << 24), 0, 0, 255]
+    return struct.pack("<I", 4 + block_size) + struct.pack(f"<{len(words)}I", *words)
+
+
+# the spec requires the pairs sorted by key
+def key_value_data(pairs: Dict[str, str]) -> bytes:
+    data = b""
+    for key, value in sorted(pairs.items()):
+        entry = key.encode() + b"\x00" + value.encode() + b"\x00"
+        data += struct.pack("<I", len(entry)) + entry
+        data += b"\x00" * (-len(data) % 4)
+    return data
+
+
+## KTX2 file with rgba8 levels, largest level first
+def write_ktx2(levels: List[np.ndarray], srgb: bool, compression_level: int = 6) -> bytes:
+    height, width = levels[0].shape[:2]
+    supercompression = SUPERCOMPRESSION_ZLIB if compression_level > 0 else SUPERCOMPRESSION_NONE
+
+    header_size = 80
+    index_size = 24 * len(levels)
+    dfd = data_format_descriptor(srgb)
+    kvd = key_value_data({"KTXwriter": "sparrow", "KTXorientation": "rd"})
+    dfd_offset = header_size + index_size
+    kvd_offset = dfd_offset + len(dfd)
+    data_offset = kvd_offset + len(kvd)
+
+    # level data is stored smallest first
+    payload = bytearray()
+    level_index = [None] * len(levels)
+    for level in reversed(range(len(levels))):
+        raw = np.ascontiguousarray(levels[level]).tobytes()
+        stored = zlib.compress(raw, compression_level) if supercompression == SUPERCOMPRESSION_ZLIB else raw
+        # uncompressed levels are aligned to the 4 byte texel block
+        if supercompression == SUPERCOMPRESSION_NONE:
+            payload += b"\x00" * (-(data_offset + len(payload)) % 4)
+        level_index[level] = (data_offset + len(payload), len(stored), len(raw))
+        payload += stored
+
+    header = KTX2_IDENTIFIER + struct.pack(
+        "<9I",
+        VK_FORMAT_R8G8B8A8_SRGB if srgb else VK_FORMAT_R8G8B8A8_UNORM,
+        1, # type size
+        width,
+        height,
+        0, # depth
+        0, # layers
+        1, # faces
+        len(levels),
+        supercompression,
+    )
+    header += struct.pack("<4I2Q", dfd_offset, len(dfd), kvd_offset, len(kvd), 0, 0)
+    index = b"".join(struct.pack("<3Q", *entry) for entry in level_index)
+    return header + index + dfd + kvd + bytes(payload)
+
+
+## Replace the png / jpeg images of a glb in place, returns the number of converted images
+def convert_glb_textures(path: str, color_max_size: int = 0, data_max_size: int = 0, compression_level: int = 6) -> int:
+    gltf, binary = read_glb(path)
+    if gltf is None or len(gltf.get("buffers", [])) != 1:
+        return 0
+
+    views = gltf.get("bufferViews", [])
+    converted = {}
+    for image_index, usage in image_usages(gltf).items():
+        image = gltf["images"][image_index]
+        if image.get("mimeType") not in SOURCE_MIME_TYPES or "bufferView" not in image or image["bufferView"] in converted:
+            continue
+        view = views[image["bufferView"]]
+        offset = view.get("byteOffset", 0)
+        pixels = decode_image(binary[offset:offset + view["byteLength"]], image["mimeType"])
+        levels = mip_chain(pixels, usage, color_max_size if usage == 'COLOR' else data_max_size)
+        converted[image["bufferView"]] = write_ktx2(levels, usage == 'COLOR', compression_level)
+
+    if len(converted) == 0:
+        return 0
+
+    # every view keeps its index, only the image data changes
+    builder = BufferBuilder()
+    for index, view in enumerate(views):
+        offset = view.get("byteOffset", 0)
+        builder.add(converted.get(index, binary[offset:offset + view["byteLength"]]), view.get("target"), view.get("byteStride"))
+    gltf["bufferViews"] = builder.views
+    gltf["buffers"][0]["byteLength"] = len(builder.data)
+    for image in gltf["images"]:
+        if image.get("bufferView") in converted:
+            image["mimeType"] = KTX2_MIME_TYPE
+
+    write_glb(path, gltf, bytes(builder.data))
+    return len(converted)
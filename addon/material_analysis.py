@@ -0,0 +1,132 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+# Material node graph analysis shared by Load by Linked and the bake setup.
+# One walk per material finds the shader nodes reachable from the active output, following node groups,
+# visited nodes and trees are tracked in sets so large procedural graphs stay linear.
+
+SHADER_NODE_TYPES = frozenset(['BSDF_PRINCIPLED', 'EMISSION', 'BSDF_TRANSLUCENT', 'BSDF_TRANSPARENT', 'BSDF_REFRACTION', 'BSDF_DIFFUSE', 'BSDF_GLASS', 'BSDF_SHEEN', 'BSDF_HAIR', 'BSDF_TOON', 'BSDF_GLOSSY', 'VOLUME_ABSORPTION', 'VOLUME_SCATTER', 'SUBSURFACE_SCATTERING', 'PRINCIPLED_VOLUME', 'BSDF_HAIR_PRINCIPLED', 'BSDF_VELVET', 'BSDF_ANISOTROPIC', 'EEVEE_SPECULAR'])
+
+
+DISPLACEMENT_NODE_TYPES = frozenset(['DISPLACEMENT', 'VECTOR_DISPLACEMENT'])
+
+
+@dataclass
+class MaterialAnalysis:
+    output_node: object = None # active Material Output of the material's own tree
+    shader_nodes: List[Tuple[object, object]] = field(default_factory=list) # (shader node, node tree) reached from the surface, in discovery order
+    displacement_nodes: List[Tuple[object, object]] = field(default_factory=list) # (displacement node, node tree) reached from the displacement
+    linked_inputs: Set[str] = field(default_factory=set) # names of the linked inputs of the shader nodes
+    node_trees: Set[str] = field(default_factory=set) # the material tree and all group trees it reaches
+    node_types: Set[str] = field(default_factory=set) # types of all nodes in those trees
+
+
+def active_output(tree):
+    for node in tree.nodes:
+        if node.type in ['OUTPUT_MATERIAL', 'GROUP_OUTPUT'] and node.is_active_output:
+            return node
+    return None
+
+
+# walk upstream from the material output input at `output_input`, returns the (node, tree) pairs matching `match_types`
+# group nodes are entered through their group output, walking stops at a match
+def find_upstream(node_tree, output_input: int, match_types, analysis: MaterialAnalysis) -> List[Tuple[object, object]]:
+    matches = []
+
+    trees = [node_tree]
+    seen_trees = {node_tree.as_pointer()}
+    while trees:
+        tree = trees.pop(0)
+        if tree.name not in analysis.node_trees:
+            analysis.node_trees.add(tree.name)
+            analysis.node_types.update(node.type for node in tree.nodes)
+
+        output = active_output(tree)
+        if output is None:
+            continue
+
+        # material output only follows the requested input, group outputs follow every input
+        inputs = [output.inputs[output_input]] if output.type == 'OUTPUT_MATERIAL' else output.inputs
+        branches = [input.links[0].from_node for input in inputs if input.is_linked]
+        seen_nodes = {branch.as_pointer() for branch in branches}
+
+        index = 0
+        while index < len(branches):
+            branch = branches[index]
+            index += 1
+
+            if branch.type in match_types:
+                matches.append((branch, tree))
+                continue
+
+            if branch.type == 'GROUP' and branch.node_tree is not None and branch.node_tree.as_pointer() not in seen_trees:
+                seen_trees.add(branch.node_tree.as_pointer())
+                trees.append(branch.node_tree)
+
+            for input in branch.inputs:
+                if input.is_linked:
+                    from_node = input.links[0].from_node
+                    if from_node.as_pointer() not in seen_nodes:
+                        seen_nodes.add(from_node.as_pointer())
+                        branches.append(from_node)
+
+    return matches
+
+
+def analyze_node_tree(node_tree) -> MaterialAnalysis:
+    analysis = MaterialAnalysis()
+
+    output = active_output(node_tree)
+    if output is not None and output.type == 'OUTPUT_MATERIAL':
+        analysis.output_node = output
+
+    analysis.shader_nodes = find_upstream(node_tree, 0, SHADER_NODE_TYPES, analysis)
+    analysis.displacement_nodes = find_upstream(node_tree, 2, DISPLACEMENT_NODE_TYPES, analysis)
+    for shader_node, _ in analysis.shader_nodes:
+        analysis.linked_inputs.update(input.name for input in shader_node.inputs if input.is_linked)
+
+    return analysis
+
+
+# memoized per run: the caller owns the cache, so an analysis never outlives the graph it was made from
+def analyze_material(material, cache: Dict[int, MaterialAnalysis]) -> MaterialAnalysis:
+    key = material.node_tree.as_pointer()
+    if key not in cache:
+        cache[key] = analyze_node_tree(material.node_tree)
+    return cache[key]
+
+
+# nodes whose first output is a constant set on the node itself
+CONSTANT_NODE_TYPES = frozenset(['VALUE', 'RGB'])
+
+
+def socket_constant(socket) -> Optional[Tuple[float, ...]]:
+    if not socket.is_linked:
+        value = socket.default_value
+    else:
+        from_socket = socket.links[0].from_socket
+        if from_socket.node.type not in CONSTANT_NODE_TYPES:
+            return None
+        value = from_socket.default_value
+    return tuple(value) if hasattr(value, '__len__') else (value,)
+
+
+# the single value a socket bake would produce over the whole surface, or None when it varies
+# every shader of every material has to feed the same constant into the socket
+def constant_bake_value(materials, aliases: List[str], cache: Dict[int, MaterialAnalysis]) -> Optional[Tuple[float, ...]]:
+    constant = None
+    for material in materials:
+        if material is None or not material.use_nodes:
+            return None
+        shader_nodes = analyze_material(material, cache).shader_nodes
+        if len(shader_nodes) == 0:
+            return None
+        for shader_node, _ in shader_nodes:
+            socket = next((input for input in shader_node.inputs if input.name in aliases), None)
+            if socket is None:
+                return None
+            value = socket_constant(socket)
+            if value is None or (constant is not None and value != constant):
+                return None
+            constant = value
+    return constant
@@ -3,6 +3,14 @@ import time
 from typing import Any, Dict
 
 from .export import export_scene, export_scene_blueprints
+from .asset_manifest import write_asset_manifest
+from .gltf_session import gltf_export_session
+from .geometry_dedup import dedup_candidates, find_duplicate_meshes, instance_duplicates
+from .bake_workers import WORKER_LABELS, write_bake_jobs, save_bake_source, worker_threads, start_bake_worker, stop_bake_workers, read_bake_results, default_job_dir, remove_job_dir
+from .bake_cache import bake_cache_dir, object_fingerprint, scene_fingerprint, is_light_transport_bake, bake_fingerprint, load_cached_bake, store_cached_bake
+from .channel_packing import CHANNEL_PACK_PROPS, snapshot_pixels, pack_channels, can_fill_constant, fill_constant
+from .material_analysis import analyze_material, constant_bake_value
+from .sampling_planner import plan_bake_sampling
 from .utils import *
 from .properties import *
 
@@ -117,9 +125,12 @@ class SPARROW_OT_ExportCurrentScene(Operator):
     bl_label = "Export Current Scene"         # Display name in the interface.
     bl_options = {'REGISTER', 'UNDO'}  # Enable undo for the operator.
 
-    def execute(self, context):       
-        settings: SPARROW_PG_Settings  = bpy.context.window_manager.sparrow_settings  
- 
+    def execute(self, context):
+        settings: SPARROW_PG_Settings  = bpy.context.window_manager.sparrow_settings
+
+        if not validate_before_export(self, settings, [bpy.context.window.scene]):
+            return {'CANCELLED'}
+
         # Trigger the save operation
         if settings.save_on_export:
             bpy.ops.wm.save_mainfile()
@@ -147,16 +158,26 @@ class SPARROW_OT_ExportCurrentScene(Operator):
         scene = bpy.context.window.scene
         scene_props: SPARROW_PG_SceneProps = scene.sparrow_scene_props
 
-        if scene_props.scene_export:    
-            if export_scene(settings, area, region, scene):
-                success_scene.append(scene.name)
-            else:
-                failure_scene.append(scene.name)
-        
-        if scene_props.blueprint_export:
-            (s, f) = export_scene_blueprints(settings, area, region, scene)
-            success_blueprints.extend(s)
-            failure_blueprints.extend(f)
+        # images shared by the scene and its blueprints are encoded once
+        with gltf_export_session() as session:
+            if scene_props.scene_export:    
+                if export_scene(settings, area, region, scene):
+                    success_scene.append(scene.name)
+                else:
+                    failure_scene.append(scene.name)
+            
+            if scene_props.blueprint_export:
+                (s, f) = export_scene_blueprints(settings, area, region, scene)
+                success_blueprints.extend(s)
+                failure_blueprints.extend(f)
+        print(f"image encodes: {session.misses}, reused: {session.hits}")
+
+        if settings.write_manifest:
+            try:
+                print(f"manifest: {write_asset_manifest(settings.assets_path)}")
+            except Exception as error:
+                print("failed to write asset manifest !", error)
+                self.report({'WARNING'}, f"Failed to write the asset manifest: {error}")
 
         # reset active scene
         bpy.context.window.scene = active_scene
@@ -183,8 +204,11 @@ class SPARROW_OT_ExportSelectedScenes(Operator):
     bl_options = {'REGISTER', 'UNDO'}  # Enable undo for the operator.
 
     def execute(self, context):       
-        settings: SPARROW_PG_Settings  = bpy.context.window_manager.sparrow_settings  
-        
+        settings: SPARROW_PG_Settings  = bpy.context.window_manager.sparrow_settings
+
+        if not validate_before_export(self, settings, [scene for scene in bpy.data.scenes if scene.sparrow_scene_props.export]):
+            return {'CANCELLED'}
+
         # Trigger the save operation
         if settings.save_on_export:
             bpy.ops.wm.save_mainfile()
@@ -209,21 +233,30 @@ class SPARROW_OT_ExportSelectedScenes(Operator):
         success_blueprints: list[str] = []
         failure_blueprints: list[str] = []
 
-        for scene in bpy.data.scenes:
-            scene_props: SPARROW_PG_SceneProps = scene.sparrow_scene_props
-            if not scene_props.export:
-                continue
-
-            if scene_props.scene_export:    
-                if export_scene(settings, area, region, scene):
-                    success_scene.append(scene.name)
-                else:
-                    failure_scene.append(scene.name)
-            if scene_props.blueprint_export:
-                (s, f) = export_scene_blueprints(settings, area, region, scene)
-                success_blueprints.extend(s)
-                failure_blueprints.extend(f)
+        # images shared across scenes and blueprints are encoded once
+        with gltf_export_session() as session:
+            for scene in bpy.data.scenes:
+                scene_props: SPARROW_PG_SceneProps = scene.sparrow_scene_props
+                if not scene_props.export:
+                    continue
 
+                if scene_props.scene_export:    
+                    if export_scene(settings, area, region, scene):
+                        success_scene.append(scene.name)
+                    else:
+                        failure_scene.append(scene.name)
+                if scene_props.blueprint_export:
+                    (s, f) = export_scene_blueprints(settings, area, region, scene)
+                    success_blueprints.extend(s)
+                    failure_blueprints.extend(f)
+        print(f"image encodes: {session.misses}, reused: {session.hits}")
+
+        if settings.write_manifest:
+            try:
+                print(f"manifest: {write_asset_manifest(settings.assets_path)}")
+            except Exception as error:
+                print("failed to write asset manifest !", error)
+                self.report({'WARNING'}, f"Failed to write the asset manifest: {error}")
 
         # reset active scene
         bpy.context.window.scene = active_scene
@@ -242,6 +275,46 @@ class SPARROW_OT_ExportSelectedScenes(Operator):
 
         return {'FINISHED'} 
 
+# find mesh objects with identical geometry, optionally replace them with instances of one blueprint each
+class SPARROW_OT_DedupGeometry(Operator):
+    """Find mesh objects with identical geometry and optionally turn them into blueprint instances"""
+    bl_idname = "sparrow.dedup_geometry"
+    bl_label = "Deduplicate Geometry"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    tolerance : FloatProperty(options = set(), name='Tolerance', default=0.0001, min=0.0000001, max=0.1, precision=7, description='Vertex positions and UVs closer than this are treated as equal')  # type: ignore
+    selected_only : BoolProperty(options = set(), name='Selected Only', default=False, description='Only compare the selected objects instead of the whole scene')  # type: ignore
+    convert : BoolProperty(options = set(), name='Convert to Blueprints', default=False, description='Move one object of each duplicate group into a new asset collection and replace all of them with instances of it, exported as blueprints')  # type: ignore
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self, width=300)
+
+    def execute(self, context):
+        scene = context.scene
+
+        if context.object is not None and context.object.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        objects = dedup_candidates(scene, context.view_layer, context.selected_objects if self.selected_only else scene.objects)
+        tmp_time = time.time()
+        groups = find_duplicate_meshes(objects, context.evaluated_depsgraph_get(), self.tolerance)
+        duplicates = sum(len(group) for group in groups.values())
+        print(f"found {len(groups)} duplicate meshes in {duplicates} objects: {time.time() - tmp_time:6.2f}s")
+
+        if len(groups) == 0:
+            self.report({'INFO'}, "No duplicate geometry found")
+            return {'FINISHED'}
+
+        if not self.convert:
+            for group in sorted(groups.values(), key=len, reverse=True):
+                print(f"{group[0].name} - {len(group)}")
+            self.report({'INFO'}, f"Found {len(groups)} meshes duplicated over {duplicates} objects, see the console for the list")
+            return {'FINISHED'}
+
+        removed = instance_duplicates(scene, groups)
+        self.report({'INFO'}, f"Replaced {duplicates} objects with instances of {len(groups)} blueprints, {removed} duplicate objects removed")
+        return {'FINISHED'}
+
 class SPARROW_OT_LoadRegistry(Operator):
     """Load the registry file"""
     bl_idname = "sparrow.load_registry"
@@ -253,6 +326,106 @@ class SPARROW_OT_LoadRegistry(Operator):
         settings.load_registry()
         return {'FINISHED'}
 
+class SPARROW_OT_ValidateComponents(Operator):
+    """Validate all components in the file against the registry"""
+    bl_idname = "sparrow.validate_components"
+    bl_label = "Validate Components"
+    bl_options = {"REGISTER"}
+
+    def execute(self, context):
+        settings: SPARROW_PG_Settings = bpy.context.window_manager.sparrow_settings
+        registry: ComponentsRegistry = bpy.context.window_manager.components_registry
+
+        if not registry.has_type_infos():
+            self.report({'ERROR'}, "No registry loaded, please load a registry file")
+            return {'CANCELLED'}
+
+        errors = settings.validate_components()
+        warnings = len(settings.validation_issues) - errors
+        if errors > 0:
+            self.report({'ERROR'}, f"Component validation: {errors} errors, {warnings} warnings")
+        elif warnings > 0:
+            self.report({'WARNING'}, f"Component validation: {warnings} warnings")
+        else:
+            self.report({'INFO'}, "Component validation: no issues found")
+        return {'FINISHED'}
+
+class SPARROW_OT_SelectValidationItem(Operator):
+    """Jump to the item with this component issue"""
+    bl_idname = "sparrow.select_validation_item"
+    bl_label = "Select Item"
+    bl_options = {"REGISTER", "UNDO"}
+
+    item_name: StringProperty(
+        name="item name",
+        description="name of the object/collection/scene to select",
+    ) # type: ignore
+
+    item_type: EnumProperty(
+        name="item type",
+        description="type of the object/collection/scene to select",
+        items=ITEM_TYPES,
+    ) # type: ignore
+
+    def execute(self, context):
+        if self.item_type == 'SCENE':
+            if self.item_name not in bpy.data.scenes:
+                self.report({"WARNING"}, f"Scene {self.item_name} not found")
+                return {"CANCELLED"}
+            bpy.context.window.scene = bpy.data.scenes[self.item_name]
+            return {'FINISHED'}
+
+        if self.item_type == 'COLLECTION':
+            if self.item_name not in bpy.data.collections:
+                self.report({"WARNING"}, f"Collection {self.item_name} not found")
+                return {"CANCELLED"}
+            coll = bpy.data.collections[self.item_name]
+            target_scene = next((scene for scene in bpy.data.scenes if scene.user_of_id(coll)), None)
+            if target_scene is None:
+                self.report({"WARNING"}, f"Can't find scene with collection {coll.name}")
+                return {"CANCELLED"}
+            bpy.context.window.scene = target_scene
+            layer_collection = recurLayerCollection(bpy.context.view_layer.layer_collection, coll.name)
+            if layer_collection is not None:
+                bpy.context.view_layer.active_layer_collection = layer_collection
+            return {'FINISHED'}
+
+        if self.item_name not in bpy.data.objects:
+            self.report({"WARNING"}, f"Object {self.item_name} not found")
+            return {"CANCELLED"}
+        obj = bpy.data.objects[self.item_name]
+        if bpy.context.scene not in obj.users_scene:
+            if len(obj.users_scene) == 0:
+                self.report({"WARNING"}, f"Object {obj.name} is not in any scene")
+                return {"CANCELLED"}
+            bpy.context.window.scene = obj.users_scene[0]
+
+        if bpy.context.active_object is not None and bpy.context.active_object.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+        bpy.ops.object.select_all(action='DESELECT')
+        obj.select_set(True)
+        bpy.context.view_layer.objects.active = obj
+
+        for area in bpy.context.window.screen.areas:
+            if area.type == 'OUTLINER':
+                with context.temp_override(area=area):
+                    bpy.ops.outliner.show_active()
+                break
+
+        return {'FINISHED'}
+
+# runs the component validation before an export, returns False if the export should be cancelled
+def validate_before_export(operator, settings, scenes) -> bool:
+    registry: ComponentsRegistry = bpy.context.window_manager.components_registry
+    if not settings.validate_on_export or not registry.has_type_infos():
+        return True
+
+    errors = settings.validate_components(scenes)
+    if errors > 0:
+        operator.report({'ERROR'}, f"Export cancelled, {errors} component errors found, see the validation report in the Bevy output panel")
+        return False
+    return True
+
 class SPARROW_OT_OpenAssetsFolderBrowser(Operator, ImportHelper):
     """Assets folder's browser"""
     bl_idname = "sparrow.open_folderbrowser" 
@@ -1023,8 +1196,8 @@ class SPARROW_OT_LoadLinked(Operator):
         scene = context.scene
         abp = scene.autobake_properties
 
-    # Collecting Default Node Trees
-        node_trees = []
+    # Collecting Materials
+        materials = []
         
         if abp.ab_load_method == 'Material':
             if abp.ab_load_linked_material is None:
@@ -1032,8 +1205,7 @@ class SPARROW_OT_LoadLinked(Operator):
                 return {'FINISHED'}
             else:
                 if abp.ab_load_linked_material.use_nodes:
-                    if abp.ab_load_linked_material.node_tree not in node_trees:
-                        node_trees.append(abp.ab_load_linked_material.node_tree)
+                    materials.append(abp.ab_load_linked_material)
         
         elif abp.ab_load_method == 'Object':
             if abp.ab_load_linked_object is None:
@@ -1041,69 +1213,31 @@ class SPARROW_OT_LoadLinked(Operator):
                 return {'FINISHED'}
             else:
                 for slot in abp.ab_load_linked_object.material_slots:
-                    if slot.material.use_nodes:
-                        
-                        if slot.material.node_tree not in node_trees:
-                            node_trees.append(slot.material.node_tree)
+                    if slot.material is not None and slot.material.use_nodes and slot.material not in materials:
+                        materials.append(slot.material)
                     
-    # Branching
-        shaders = []
-        
-        for tree in node_trees:
-            branches = []
-            for node in tree.nodes:
-                
-            # Looking for: Branch Start
-                if node.type in ['OUTPUT_MATERIAL', 'GROUP_OUTPUT'] and node.is_active_output:
-                    if node.inputs[0].is_linked:
-                        if node.inputs[0].links[0].from_node.type in ['BSDF_PRINCIPLED', 'EMISSION', 'BSDF_TRANSLUCENT', 'BSDF_TRANSPARENT', 'BSDF_REFRACTION', 'BSDF_DIFFUSE', 'BSDF_GLASS', 'BSDF_SHEEN', 'BSDF_HAIR', 'BSDF_TOON', 'BSDF_GLOSSY', 'VOLUME_ABSORPTION', 'VOLUME_SCATTER', 'SUBSURFACE_SCATTERING', 'PRINCIPLED_VOLUME', 'BSDF_HAIR_PRINCIPLED', 'BSDF_VELVET', 'BSDF_ANISOTROPIC', 'EEVEE_SPECULAR']:
-                            shaders.append(node.inputs[0].links[0].from_node)
-                            
-                        elif node.inputs[0].links[0].from_node.type == 'GROUP':
-                            if node.inputs[0].links[0].from_node.node_tree not in node_trees:
-                                node_trees.append(node.inputs[0].links[0].from_node.node_tree)
-                            
-                            if node.inputs[0].links[0].from_node not in branches:
-                                branches.append(node.inputs[0].links[0].from_node)
-                        else:
-                            if node.inputs[0].links[0].from_node not in branches:
-                                branches.append(node.inputs[0].links[0].from_node)
-                    break
-                
-            # Looking for: New Branches & New Trees & Shader nodes
-            for node in branches:
-                for input in node.inputs:
-                    if input.is_linked:
-                        if input.links[0].from_node.type in ['BSDF_PRINCIPLED', 'EMISSION', 'BSDF_TRANSLUCENT', 'BSDF_TRANSPARENT', 'BSDF_REFRACTION', 'BSDF_DIFFUSE', 'BSDF_GLASS', 'BSDF_SHEEN', 'BSDF_HAIR', 'BSDF_TOON', 'BSDF_GLOSSY', 'VOLUME_ABSORPTION', 'VOLUME_SCATTER', 'SUBSURFACE_SCATTERING', 'PRINCIPLED_VOLUME', 'BSDF_HAIR_PRINCIPLED', 'BSDF_VELVET', 'BSDF_ANISOTROPIC', 'EEVEE_SPECULAR']:
-                            shaders.append(input.links[0].from_node)
-                            
-                        elif input.links[0].from_node.type == 'GROUP':
-                            if input.links[0].from_node.node_tree not in node_trees:
-                                node_trees.append(input.links[0].from_node.node_tree)
-                            if input.links[0].from_node not in branches:
-                                branches.append(input.links[0].from_node)
-                        else:
-                            if input.links[0].from_node not in branches:
-                                branches.append(input.links[0].from_node)
+    # Linked Shader Inputs
+        linked_inputs = set()
+        cache = {}
+        for material in materials:
+            linked_inputs.update(analyze_material(material, cache).linked_inputs)
                            
    # Saved as Linked
         linked_sockets = []
 
-        for shader in shaders:
-            for input in shader.inputs:
-                if input.is_linked:
-                    input_aliases = [input.name,]
-                    
-                    socket_name = [key for key, aliases in type_aliases.items() if input.name in aliases]
-                    
-                    if socket_name != []:
-                        for key in socket_name:
-                            input_aliases.extend(type_aliases[key])
-                            input_aliases.append(key)
-
-                    for type in bake_items:
-                        if type[0] in input_aliases and type[0] not in linked_sockets:
-                            linked_sockets.append(type[0])
+        for input_name in linked_inputs:
+            input_aliases = [input_name,]
+            
+            socket_name = [key for key, aliases in type_aliases.items() if input_name in aliases]
+            
+            if socket_name != []:
+                for key in socket_name:
+                    input_aliases.extend(type_aliases[key])
+                    input_aliases.append(key)
+
+            for type in bake_items:
+                if type[0] in input_aliases and type[0] not in linked_sockets:
+                    linked_sockets.append(type[0])
                     
         list = scene.autobake_udimlist if abp.ab_udim_bake else scene.autobake_bakelist
         item = None
@@ -2331,6 +2465,96 @@ class SPARROW_OT_LoadFromSelected(Operator):
         return {'FINISHED'}
     
     
+ATLAS_SETTINGS = ['ab_shared_textures', 'ab_final_material', 'ab_prefix', 'ab_uv_target']
+
+def restore_atlas_settings(abp):
+    for prop, value in atlas_stored_settings.items():
+        setattr(abp, prop, value)
+    atlas_stored_settings.clear()
+
+
+class SPARROW_OT_AtlasCollection(Operator):
+    bl_idname = "sparrow.atlas_collection"
+    bl_label = "Atlas Collection"
+    bl_description = "Pack the UV islands of all mesh objects in the active collection into one shared atlas UV map, then bake them onto shared textures with a single final material"
+    bl_options = {'INTERNAL', 'UNDO'}
+
+    uv_name : StringProperty(options = set(), name='UV Map', default='Atlas', description='Name of the atlas UV map added to each mesh') # type: ignore
+    margin : FloatProperty(options = set(), name='Margin', default=0.005, min=0, max=0.1, precision=4, description='Space between the packed islands') # type: ignore
+    rotate : BoolProperty(options = set(), name='Rotate', default=True, description='Rotate islands for a tighter packing') # type: ignore
+    start_bake : BoolProperty(options = set(), name='Start Bake', default=True, description='Start Auto Bake on the atlas right after packing, otherwise the next bake session uses the atlas') # type: ignore
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self, width=300)
+
+    def execute(self, context):
+        scene = context.scene
+        abp = scene.autobake_properties
+        collection = context.collection
+
+        if bpy.context.object is not None and bpy.context.object.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+    # Meshes, instances sharing a mesh are packed once
+        objects = []
+        meshes = set()
+        for obj in collection.all_objects:
+            if obj.type == 'MESH' and obj.data not in meshes and len(obj.data.polygons) > 0:
+                meshes.add(obj.data)
+                objects.append(obj)
+
+        if len(objects) == 0:
+            self.report({'ERROR'}, f"Auto Bake: Collection '{collection.name}' has no mesh objects to atlas.")
+            return {'CANCELLED'}
+
+    # Atlas UV Map, copied from the render uv map so islands keep their shape
+        for obj in objects:
+            uv_layers = obj.data.uv_layers
+            if len(uv_layers) == 0:
+                self.report({'ERROR'}, f"Auto Bake: '{obj.name}' has no UV map to pack.")
+                return {'CANCELLED'}
+            if self.uv_name not in uv_layers:
+                source = next((uv for uv in uv_layers if uv.active_render), uv_layers[0])
+                uv_layers.active = source
+                atlas = uv_layers.new(name=self.uv_name, do_init=True)
+            else:
+                atlas = uv_layers[self.uv_name]
+            uv_layers.active = atlas
+            atlas.active_render = True
+
+    # Pack, multi object edit mode packs all islands into one layout
+        bpy.ops.object.select_all(action='DESELECT')
+        for obj in objects:
+            obj.select_set(True)
+        context.view_layer.objects.active = objects[0]
+
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.select_all(action='SELECT')
+        bpy.ops.uv.select_all(action='SELECT')
+        bpy.ops.uv.pack_islands(rotate=self.rotate, margin=self.margin)
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    # Efficiency
+        used_area = sum(uv_area(obj.data, self.uv_name) for obj in objects)
+        self.report({'INFO'}, f"Auto Bake: Packed {len(objects)} meshes of '{collection.name}' into '{self.uv_name}', {used_area * 100:.1f}% of the atlas is used.")
+
+    # Shared Bake, only for the next bake session, the previous settings come back when it ends
+        if len(atlas_stored_settings) == 0:
+            atlas_stored_settings.update({prop: getattr(abp, prop) for prop in ATLAS_SETTINGS})
+        abp.ab_shared_textures = True
+        abp.ab_final_material = True
+        abp.ab_prefix = collection.name
+        # auto size measures texel density on this map, the bake itself renders to the active render map set above
+        abp.ab_uv_target = self.uv_name
+
+        if self.start_bake:
+            result = bpy.ops.sparrow.start_bake('EXEC_DEFAULT')
+            if 'RUNNING_MODAL' not in result:
+                restore_atlas_settings(abp)
+            return result
+        return {'FINISHED'}
+    
+    
 class SPARROW_OT_ToggleQueueItem(Operator):
     bl_idname = "sparrow.toggle_queued"
     bl_label = "Enable / Disable"
@@ -2459,6 +2683,9 @@ class SPARROW_OT_ExportTextures(Operator):
             if item.Gate:
                 export_texture(self, context, item.Image, item.Name, item.Type, item.Label, item.Prefix)
         scene.autobake_imageexport.clear()
+        
+        for error in finish_texture_writes():
+            self.report({'ERROR'}, f"Auto Bake: Texture export failed: {error}")
         return {'FINISHED'}
     
     
@@ -2579,6 +2806,17 @@ class SPARROW_OT_CancelBake(Operator):
                 for item_ in scene.autobake_queuelist:
                     results.append({f"{item_.Type} " + (f"{item_.Multiplier:.2f}" if is_udim_bake else f"{item_.Size}"): {'Status': 'Canceled', 'Icon': 'CANCEL', 'Error': '' ,'Cancel': True}})
                 bake_results[item.Object.name] = results
+
+    # Workers: the running bakes are stopped and their objects canceled like the pending ones
+        if len(worker_processes) > 0:
+            stop_bake_workers(worker_processes)
+            worker_processes.clear()
+            for item in scene.autobake_objectqueuelist:
+                if item.Status == 'Baking':
+                    item.Status = 'Canceled'
+                    item.name = f"{item.Object.name} {item.Status} " + ('Enabled' if item.Enabled else 'Disabled')
+                    item.Icon = 'CANCEL'
+                    bake_results[item.Object.name] = [{f"{item_.Type} {item_.Size}": {'Status': 'Canceled', 'Icon': 'CANCEL', 'Error': '' ,'Cancel': True}} for item_ in scene.autobake_queuelist]
         
         global next_object_bake
         next_object_bake = True
@@ -2726,6 +2964,256 @@ class SPARROW_OT_BakeStart(Operator):
     final_material = None
     sampling = []
     margin_original = 8
+    _window = None
+    _wake_timer = None
+    job_dir = ''
+    blend_path = ''
+    worker_count = 0
+    worker_jobs = []
+    workers = {}
+    job_paths = []
+    object_fingerprints = {}
+    cache_dir = ''
+    cache_key = None
+    cache_hit = False
+    baked_pixels = {}
+    material_analysis = {}
+    pack_sources = {}
+    pack_stored_channels = {}
+
+    # size every queued bake for the object from its texel density, keeping the bake order keys in step
+    def apply_auto_size(self, context, target_obj):
+        scene = context.scene
+        abp = scene.autobake_properties
+        global bake_order
+        
+        size = texel_density_size(target_obj, context.evaluated_depsgraph_get(), abp.ab_uv_target, abp.ab_texel_density, abp.ab_auto_size_min, abp.ab_auto_size_max)
+        for item in scene.autobake_queuelist:
+            if item.Size != size:
+                old_key = f"{item.Type} {item.Size}"
+                if old_key in bake_order:
+                    bake_order[bake_order.index(old_key)] = f"{item.Type} {size}"
+                item.Size = size
+            item.AutoSize = True
+            item.name = f"{item.Type} {item.Size} {item.Status}" + (' Enabled' if item.Enabled else ' Disabled')
+            
+        if abp.ab_report_object_start:
+            self.report({'INFO'}, f"Auto Bake: Object '{target_obj.name}' is baked at {size}x{size} for {abp.ab_texel_density:g} px/m.")
+
+    # put the channels skipped by a partial channel packing bake back
+    def restore_pack_channels(self, abp):
+        for prop, channel in self.pack_stored_channels.items():
+            setattr(abp, prop, channel)
+        self.pack_stored_channels = {}
+
+    def image_colorspace(self, abp, bake_type):
+        if bake_type in ["Metallic", "Roughness", "IOR", "Alpha", "Subsurface Weight", "Subsurface Scale", "Subsurface IOR", "Subsurface Anisotropy", "Specular IOR Level", "Anisotropic", "Anisotropic Rotation", "Transmission Weight", "Coat Weight", "Coat Roughness", "Coat IOR", "Sheen Weight", "Sheen Roughness", "Emission Strength", "Displacement", "Roughness ", "Glossy", "Shadow", "Ambient Occlusion", "Subsurface", "Specular", "Sheen", "Clearcoat", "Clearcoat Roughness", "Transmission Roughness", "Channel Packing"]:
+            return abp.ab_color_space_float
+        elif bake_type in ["Base Color", "Specular Tint", "Coat Tint", "Sheen Tint", "Emission Color", "Color Attribute", "Combined", "Diffuse", "Transmission", "Environment", "Emit", "Subsurface Color", "Emission"]:
+            return abp.ab_color_space_color
+        elif bake_type in ["Normal", "Subsurface Radius", "Tangent", "Coat Normal", "Normals", "Normal ", "Position", "UV", "Displacement ", "Clearcoat Normal"]:
+            return abp.ab_color_space_vector
+        return None
+
+    def type_names(self, abp):
+        type_names = {}
+        for item_ in abp.ab_baketype_name_all.split(', '):
+            type_names[item_.split(':')[0]] = item_.split(':')[1]
+        return type_names
+
+    # Distributed: bake the object queue in background blender processes, see bake_workers.py
+    def start_workers(self, context):
+        scene = context.scene
+        abp = scene.autobake_properties
+        bake = scene.render.bake
+        cycles = scene.cycles
+
+        if self.selected_to_active or abp.ab_udim_bake or abp.ab_shared_textures:
+            return "Worker bakes do not support 'Selected to Active', UDIM or shared textures"
+
+        bakes = []
+        for item in scene.autobake_queuelist:
+            baketype, label = self.bake_type_info[item.Type]
+            if label not in WORKER_LABELS:
+                return f"'{item.Type}' can't be baked by workers, only render pass bakes are supported"
+
+            if abp.ab_sampling_use_render:
+                samples, denoise = cycles.samples, cycles.use_denoising
+            else:
+                pick_low_sample = not (abp.ab_auto_pick_sampling and item.Type in ['Combined', 'Ambient Occlusion ', 'Glossy', 'Diffuse', 'Transmission', 'Shadow', 'Environment'])
+                samples = abp.ab_sampling_low_max if pick_low_sample else abp.ab_sampling_high_max
+                denoise = abp.ab_sampling_low_denoise if pick_low_sample else abp.ab_sampling_high_denoise
+
+            name_structure = {"prefix": "{prefix}", "bridge": abp.ab_bridge, "suffix": abp.ab_suffix, "type": self.type_names(abp)[item.Type], "size": f"{item.Size}", "udim": '<UDIM>', "uvtile": '<UVTILE>'}
+            bakes.append({
+                "type": item.Type,
+                "pass": baketype,
+                "size": item.Size,
+                "name": abp.ab_name_structure.lower().format(**name_structure),
+                "colorspace": self.image_colorspace(abp, item.Type) or abp.ab_color_space_color,
+                "samples": samples,
+                "denoise": denoise,
+            })
+
+        settings = {
+            "pass_filter": [flag for flag, used in [('EMIT', bake.use_pass_emit), ('DIRECT', bake.use_pass_direct), ('INDIRECT', bake.use_pass_indirect), ('COLOR', bake.use_pass_color), ('DIFFUSE', bake.use_pass_diffuse), ('GLOSSY', bake.use_pass_glossy), ('TRANSMISSION', bake.use_pass_transmission)] if used],
+            "margin": bake.margin,
+            "margin_type": bake.margin_type,
+            "normal_space": bake.normal_space,
+            "normal_r": bake.normal_r,
+            "normal_g": bake.normal_g,
+            "normal_b": bake.normal_b,
+            "float_buffer": abp.ab_floatbuffer,
+            "file_format": abp.ab_fileformat,
+            "device": cycles.device,
+        }
+
+        objects = [item.Object.name for item in scene.autobake_objectqueuelist if item.Object is not None]
+        self.job_dir = default_job_dir()
+        self.worker_jobs = list(zip(objects, write_bake_jobs(self.job_dir, objects, bakes, settings)))
+        self.blend_path = save_bake_source(self.job_dir)
+        self.worker_count = abp.ab_bake_workers
+        self.workers = {}
+        self.job_paths = []
+        self.launch_workers(context)
+
+        if abp.ab_report_requests:
+            self.report({'INFO'}, f"Auto Bake: Baking {len(objects)} objects with {min(self.worker_count, len(objects))} bake workers.")
+        return None
+
+    # start the next jobs while workers are free, objects stay pending until their job starts so they can be canceled
+    def launch_workers(self, context):
+        scene = context.scene
+        items = {item.Object.name: item for item in scene.autobake_objectqueuelist if item.Object is not None}
+        while bake_status != 'PAUSED' and len(self.worker_jobs) > 0 and len(self.workers) < self.worker_count:
+            object_name, job_path = self.worker_jobs.pop(0)
+            item = items.get(object_name)
+            if item is None or item.Status == 'Canceled':
+                continue
+            process = start_bake_worker(self.blend_path, job_path, worker_threads(self.worker_count))
+            self.workers[job_path] = process
+            worker_processes.append(process)
+
+            item.Enabled = False
+            item.Status = 'Baking'
+            item.Icon = 'RENDER_STILL'
+            item.name = f"{item.Object.name} {item.Status} " + ('Enabled' if item.Enabled else 'Disabled')
+
+    def advance_workers(self, context, event):
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        for job_path, process in list(self.workers.items()):
+            if process.poll() is not None:
+                del self.workers[job_path]
+                if process in worker_processes:
+                    worker_processes.remove(process)
+                self.job_paths.append(job_path)
+        self.launch_workers(context)
+
+        scene = context.scene
+        pending = any(item.Status == 'Pending' for item in scene.autobake_objectqueuelist)
+        if len(self.workers) > 0 or (len(self.worker_jobs) > 0 and pending):
+            return {'PASS_THROUGH'}
+
+        abp = scene.autobake_properties
+        type_names = self.type_names(abp)
+
+        global bake_results
+        global bake_status
+
+    # Merge Results, canceled objects already have their results from SPARROW_OT_CancelBake
+        canceled = {item.Object.name for item in scene.autobake_objectqueuelist if item.Status == 'Canceled'}
+        final_materials = {}
+        for result in read_bake_results(self.job_paths):
+            if result["object"] in canceled:
+                continue
+            status, icon = 'Failed', 'ERROR'
+            if result["error"] == "":
+                img = bpy.data.images.load(result["path"])
+                img.name = os.path.splitext(os.path.basename(result["path"]))[0]
+                img.colorspace_settings.name = self.image_colorspace(abp, result["type"]) or abp.ab_color_space_color
+                img.pack()
+
+                type_name = type_names[result["type"]]
+                label = self.bake_type_info[result["type"]][1]
+                if abp.ab_texture_export:
+                    export_texture(self, context, img, img.name, type_name, label, result["object"])
+                    status, icon = 'Exported', 'EXPORT'
+                else:
+                    export_img = scene.autobake_imageexport.add()
+                    export_img.name = img.name
+                    export_img.Name = img.name
+                    export_img.Image = img
+                    export_img.Type = type_name
+                    export_img.Label = label
+                    export_img.Prefix = result["object"]
+                    status, icon = 'Baked', 'CHECKMARK'
+
+            # Final Material
+                if abp.ab_final_material:
+                    if result["object"] not in final_materials:
+                        final_materials[result["object"]] = bpy.data.materials.new(name=result["object"])
+                        final_materials[result["object"]].use_nodes = True
+                    node_tree = final_materials[result["object"]].node_tree
+                    img_node = node_tree.nodes.new('ShaderNodeTexImage')
+                    img_node.image = img
+                    for node in node_tree.nodes:
+                        if node.type == 'BSDF_PRINCIPLED':
+                            aliases = [result["type"].strip()] + type_aliases.get(result["type"].strip(), [])
+                            for input in node.inputs:
+                                if input.name in aliases and not input.is_linked:
+                                    node_tree.links.new(img_node.outputs[0], input)
+                                    break
+
+            bake_results.setdefault(result["object"], []).append({f"{result['type']} {result['size']}": {'Status': status, 'Icon': icon, 'Error': result["error"], 'Cancel': False}})
+
+    # Object Status
+        for item in scene.autobake_objectqueuelist:
+            if item.Status == 'Canceled':
+                continue
+            statuses = [bake[key]['Status'] for bake in bake_results.get(item.Object.name, []) for key in bake]
+            item.Status = 'Failed' if all(status == 'Failed' for status in statuses) else 'Mixed' if 'Failed' in statuses else 'Exported' if abp.ab_texture_export else 'Baked'
+            item.Icon = {'Failed': 'ERROR', 'Mixed': 'ERROR', 'Exported': 'EXPORT', 'Baked': 'CHECKMARK'}[item.Status]
+            item.name = f"{item.Object.name} {item.Status} " + ('Enabled' if item.Enabled else 'Disabled')
+
+        for item in scene.autobake_queuelist:
+            item.Enabled = False
+            item.Status = 'Exported' if abp.ab_texture_export else 'Baked'
+            item.Icon = 'EXPORT' if abp.ab_texture_export else 'CHECKMARK'
+            item.name = f"{item.Type} {item.Size} {item.Status} " + ('Enabled' if item.Enabled else 'Disabled')
+
+        if abp.ab_report_bake_summary:
+            failed = sum(1 for item in scene.autobake_objectqueuelist if item.Status in ['Mixed', 'Failed'])
+            self.report({'INFO'} if failed == 0 else {'WARNING'}, f"Auto Bake: Workers finished {len(scene.autobake_objectqueuelist)} objects, {failed} with failed bakes.")
+
+        for error in finish_texture_writes():
+            self.report({'ERROR'}, f"Auto Bake: Texture export failed: {error}")
+
+    # Close Session
+        remove_job_dir(self.job_dir)
+        self.job_dir = ''
+        context.window_manager.event_timer_remove(self._timer)
+        bake_status = 'IDLE'
+        restore_atlas_settings(abp)
+        return {'FINISHED'}
+
+    def wake(self, context):
+        # the 0.5s timer is only a watchdog, bake handlers wake the modal right away so the next phase has no idle gap
+        if self._wake_timer is None and self._window is not None:
+            self._wake_timer = context.window_manager.event_timer_add(0.0, window=self._window)
+
+    def sleep(self, context):
+        if self._wake_timer is not None:
+            context.window_manager.event_timer_remove(self._wake_timer)
+            self._wake_timer = None
+
+    def phase_ready(self):
+        if bpy.app.is_job_running('OBJECT_BAKE'):
+            return False
+        if not self.phase_export_locked or not self.phase_finished_locked:
+            return True
+        return not self.phase_bake_locked and bake_status != 'PAUSED' and next_object_bake
 
     def ab_bake_complete_multires(self):
         if not self.img.is_dirty:
@@ -2746,6 +3234,7 @@ class SPARROW_OT_BakeStart(Operator):
         restore_nodes()
         
         self.phase_export_locked = False
+        self.wake(context)
 
     def ab_bake_cancel(self, object, empty):
         self.bake_canceled = True
@@ -2757,11 +3246,14 @@ class SPARROW_OT_BakeStart(Operator):
             self.report({'ERROR'}, f"Auto Bake: '{self.img.name}' was forced to stop baking...")
             
         self.update_queue_item(context, 'Baking', False, 'Failed', 'ERROR', fail_msg = 'Bake was forced to stop!')
+        self.restore_pack_channels(abp)
+        self.pack_sources = {}
         
         remove_handlers_timers()
         restore_nodes()
         
         self.phase_finished_locked = False
+        self.wake(context)
         
     def update_queue_item(self, context, edit_status, set_enabled, set_status, set_icon, fail_msg=''):
         scene = context.scene
@@ -2992,6 +3484,11 @@ class SPARROW_OT_BakeStart(Operator):
                     item_new.Size = item.Size
                     item_new.name = f"{item_new.Type} {item_new.Size} {item_new.Status} Enabled"
                
+    # Channel Packing Last, so it can be packed from the maps baked before it
+        packing = [index for index, item in enumerate(scene.autobake_queuelist) if item.Type == 'Channel Packing']
+        for moved, index in enumerate(packing):
+            scene.autobake_queuelist.move(index - moved, len(scene.autobake_queuelist)-1)
+            
     # Bake Requests Report
         if len(scene.autobake_queuelist) > 0:
             if abp.ab_report_requests:
@@ -2999,6 +3496,14 @@ class SPARROW_OT_BakeStart(Operator):
         else:
             self.report({'ERROR'}, f"Auto Bake: Could not collect any bake request...")
             return {'CANCELLED'}
+            
+    # Auto Size gives every item of a type the same size, several sizes of one type would bake onto the same image
+        if abp.ab_auto_size and not abp.ab_udim_bake and not abp.ab_shared_textures:
+            types = [item.Type for item in scene.autobake_queuelist]
+            repeated = sorted({bake_type for bake_type in types if types.count(bake_type) > 1})
+            if len(repeated) > 0:
+                self.report({'ERROR'}, f"Auto Bake: Auto Size needs one size per type, the queue has several sizes of: {', '.join(repeated)}")
+                return {'CANCELLED'}
         
     # Variable Set
         self.img_start_loc = {}
@@ -3022,7 +3527,38 @@ class SPARROW_OT_BakeStart(Operator):
         for item in scene.autobake_queuelist:
             bake_order.append(f"{item.Type} " + (f"{item.Multiplier:.2f}" if is_udim_bake else f"{item.Size}"))
         
+        self.baked_pixels = {}
+        self.material_analysis = {}
+        self.pack_sources = {}
+        self.pack_stored_channels = {}
+        
+    # Bake Cache
+        self.object_fingerprints = {}
+        self.scene_fingerprint = None
+        self.cache_key = None
+        self.cache_hit = False
+        if abp.ab_bake_cache and not self.selected_to_active and not is_udim_bake and not abp.ab_shared_textures:
+            self.cache_dir = bake_cache_dir(abp.ab_bake_cache_path)
+            depsgraph = context.evaluated_depsgraph_get()
+            for item in scene.autobake_objectqueuelist:
+                self.object_fingerprints[item.Object.name] = object_fingerprint(item.Object, depsgraph)
+            # lights, world and the other objects only matter to light transport bakes, hash them once if any is queued
+            if any(is_light_transport_bake(*self.bake_type_info[item.Type]) for item in scene.autobake_queuelist if item.Type in self.bake_type_info):
+                self.scene_fingerprint = scene_fingerprint(scene, depsgraph)
+        
+    # Distributed
+        self.job_dir = ''
+        if abp.ab_bake_workers > 1:
+            error = self.start_workers(context)
+            if error is not None:
+                bake_status = 'IDLE'
+                restore_atlas_settings(abp)
+                self.report({'ERROR'}, f"Auto Bake: {error}.")
+                return {'CANCELLED'}
+        
     # Modal
+        self._window = context.window
+        self._wake_timer = None
         self._timer = bpy.context.window_manager.event_timer_add(.5, window=context.window)
         bpy.context.window_manager.modal_handler_add(self)
         
@@ -3030,6 +3566,25 @@ class SPARROW_OT_BakeStart(Operator):
     
 
     def modal(self, context, event):
+        if self.job_dir:
+            return self.advance_workers(context, event)
+        
+        result = self.advance(context, event)
+        
+        if event.type == 'TIMER':
+        # Chain Phases: export, finish and the next bake run in the same tick when nothing is baking
+            for _ in range(2):
+                if result != {'PASS_THROUGH'} or not self.phase_ready():
+                    break
+                result = self.advance(context, event)
+            
+        # Idle until the bake handlers or the watchdog wake us
+            if result != {'PASS_THROUGH'} or not self.phase_ready():
+                self.sleep(context)
+            
+        return result
+
+    def advance(self, context, event):
         if event.type == 'TIMER':
             scene = context.scene
             bake = scene.render.bake
@@ -3075,6 +3630,10 @@ class SPARROW_OT_BakeStart(Operator):
                                 if abp.ab_report_object_start:
                                     self.report({'INFO'}, f"Auto Bake: Object '{item.Object.name}' has been started baking.")
 
+                            # Auto Size
+                                if abp.ab_auto_size and not is_udim_bake and not abp.ab_shared_textures:
+                                    self.apply_auto_size(context, target_obj)
+
                             # Final Material
                                 if abp.ab_final_material:
                                     if not abp.ab_shared_textures or all(item.Status in ['Baking', 'Pending'] for item in scene.autobake_objectqueuelist):
@@ -3261,10 +3820,7 @@ class SPARROW_OT_BakeStart(Operator):
                     self.prefix = str(target_obj.name) if abp.ab_prefix == '' or (len(scene.autobake_objectqueuelist) > 1 and not abp.ab_shared_textures) else str(abp.ab_prefix) if abp.ab_prefix not in ['""', "''"] else ''
                 
                 # Type Name
-                    type_names = {}
-                    for item_ in abp.ab_baketype_name_all.split(', '):
-                        type_names[item_.split(':')[0]] = item_.split(':')[1]
-                    self.type_name = type_names[item.Type]
+                    self.type_name = self.type_names(abp)[item.Type]
                 
                 # Image Name
                     name_structure = {"prefix": self.prefix, "bridge": abp.ab_bridge, "suffix": abp.ab_suffix, "type": self.type_name, "size": self.image_scale_name, "udim": '<UDIM>', "uvtile": '<UVTILE>'}
@@ -3321,12 +3877,9 @@ class SPARROW_OT_BakeStart(Operator):
                                             img_tile.label = tile[2]
                                             
                 # Color Space
-                    if item.Type in ["Metallic", "Roughness", "IOR", "Alpha", "Subsurface Weight", "Subsurface Scale", "Subsurface IOR", "Subsurface Anisotropy", "Specular IOR Level", "Anisotropic", "Anisotropic Rotation", "Transmission Weight", "Coat Weight", "Coat Roughness", "Coat IOR", "Sheen Weight", "Sheen Roughness", "Emission Strength", "Displacement", "Roughness ", "Glossy", "Shadow", "Ambient Occlusion", "Subsurface", "Specular", "Sheen", "Clearcoat", "Clearcoat Roughness", "Transmission Roughness", "Channel Packing"]:
-                        img.colorspace_settings.name = abp.ab_color_space_float
-                    elif item.Type in ["Base Color", "Specular Tint", "Coat Tint", "Sheen Tint", "Emission Color", "Color Attribute", "Combined", "Diffuse", "Transmission", "Environment", "Emit", "Subsurface Color", "Emission"]:
-                        img.colorspace_settings.name = abp.ab_color_space_color
-                    elif item.Type in ["Normal", "Subsurface Radius", "Tangent", "Coat Normal", "Normals", "Normal ", "Position", "UV", "Displacement ", "Clearcoat Normal"]:
-                        img.colorspace_settings.name = abp.ab_color_space_vector
+                    colorspace = self.image_colorspace(abp, item.Type)
+                    if colorspace is not None:
+                        img.colorspace_settings.name = colorspace
 
                 # Force Name
                     if img.name != texture_name:
@@ -3353,6 +3906,53 @@ class SPARROW_OT_BakeStart(Operator):
                     self.prefix = item.Prefix
                     self.type_name = item.Type_Name
 
+        # Constant Maps: sockets that are unlinked or fed by Value/RGB nodes are filled without baking
+                self.cache_key = None
+                self.cache_hit = False
+                if abp.ab_constant_maps != 'OFF' and label in ['Float', 'Color'] and not is_udim_bake and not abp.ab_shared_textures:
+                    aliases = [item.Type,]
+                    if item.Type in type_aliases:
+                        aliases.extend(type_aliases[item.Type])
+                    materials = [slot.material for obj in self.source_objects for slot in obj.material_slots]
+                    
+                    constant = constant_bake_value(materials, aliases, self.material_analysis) if materials else None
+                    # the image is only shrunk once the constant can be stored in it, otherwise it is baked at full size
+                    if constant is not None and can_fill_constant(self.img):
+                        if abp.ab_constant_maps == 'PIXEL':
+                            self.img.scale(1, 1)
+                        
+                        if fill_constant(self.img, constant):
+                            if abp.ab_constant_maps == 'PIXEL':
+                                self.scale_reset[self.img] = [1]
+                            self.antialiasing_method = ''
+                            self.phase_export_locked = False
+                            
+                            if abp.ab_report_bake_end:
+                                self.report({'INFO'}, f"Auto Bake: Texture '{self.img.name}' is filled with the constant {tuple(round(channel, 4) for channel in constant)}.")
+                            return {'PASS_THROUGH'}
+
+        # Channel Packing From Baked Maps
+                self.pack_sources = {}
+                if label == "Channel Packing" and not is_udim_bake:
+                    for index, prop in enumerate(CHANNEL_PACK_PROPS):
+                        source = self.baked_pixels.get((target_obj.name, getattr(abp, prop)))
+                        if source is not None and len(source) == len(self.img.pixels):
+                            self.pack_sources[index] = source
+                            
+                    if len(self.pack_sources) == sum(1 for prop in CHANNEL_PACK_PROPS if getattr(abp, prop) != 'None'):
+                        pack_channels(self.img, self.pack_sources)
+                        self.pack_sources = {}
+                        self.phase_export_locked = False
+                        
+                        if abp.ab_report_bake_end:
+                            self.report({'INFO'}, f"Auto Bake: Texture '{self.img.name}' is packed from already baked maps.")
+                        return {'PASS_THROUGH'}
+                    
+                # Only bake the missing channels, the others are packed in after the bake
+                    for index in self.pack_sources:
+                        self.pack_stored_channels[CHANNEL_PACK_PROPS[index]] = getattr(abp, CHANNEL_PACK_PROPS[index])
+                        setattr(abp, CHANNEL_PACK_PROPS[index], 'None')
+
         # Shader Alerts
                 frames = {}
 
@@ -3364,64 +3964,14 @@ class SPARROW_OT_BakeStart(Operator):
                     for obj in self.source_objects:
                         for slot in obj.material_slots:
                             if slot.material is not None and slot.material.use_nodes:
-                                shader_nodes = []
+                                analysis = analyze_material(slot.material, self.material_analysis)
+                                shader_nodes = analysis.shader_nodes
                                 
-                                node_trees = []
-                                node_trees.append(slot.material.node_tree)
-
-                            # Searching: Node Trees
-                                for tree in node_trees:
-                                    branches = []
-                                    
-                                # Searching: Branch Start
-                                    for node in tree.nodes:
-                                        if node.type in ['OUTPUT_MATERIAL', 'GROUP_OUTPUT'] and node.is_active_output:
-                                        # Material Output
-                                            if node.type == 'OUTPUT_MATERIAL':
-                                                
-                                            # Material Output: Detach Displacement (Material Output)
-                                                if node.inputs[2].is_linked:
-                                                    reconnect_nodes.append((tree, node.inputs[2].links[0].from_socket, node.inputs[2]))
-                                                    tree.links.remove(node.inputs[2].links[0])
-                                            
-                                            # Material Output: Add Branch
-                                                if node.inputs[0].is_linked:
-                                                    if node.inputs[0].links[0].from_node not in branches:
-                                                        branches.append(node.inputs[0].links[0].from_node)
-                                                    
-                                        # Group Output
-                                            elif node.type == 'GROUP_OUTPUT':
-                                                
-                                            # Group Output: Add Branch
-                                                for input in node.inputs:
-                                                    if input.is_linked:
-                                                        if input.links[0].from_node not in branches:
-                                                            branches.append(input.links[0].from_node)
-                                            break
-                                        
-                                # Branching
-                                    for branch in branches:
-                                        
-                                    # Shader Found
-                                        if branch.type in ['BSDF_PRINCIPLED', 'EMISSION', 'BSDF_TRANSLUCENT', 'BSDF_TRANSPARENT', 'BSDF_REFRACTION', 'BSDF_DIFFUSE', 'BSDF_GLASS', 'BSDF_SHEEN', 'BSDF_HAIR', 'BSDF_TOON', 'BSDF_GLOSSY', 'VOLUME_ABSORPTION', 'VOLUME_SCATTER', 'SUBSURFACE_SCATTERING', 'PRINCIPLED_VOLUME', 'BSDF_HAIR_PRINCIPLED', 'BSDF_VELVET', 'BSDF_ANISOTROPIC', 'EEVEE_SPECULAR']:
-                                            shader_nodes.append((branch, tree))
-                                            
-                                    # New Tree & Branch
-                                        elif branch.type == 'GROUP':
-                                            for input in branch.inputs:
-                                                if input.is_linked:
-                                                    if input.links[0].from_node not in branches:
-                                                        branches.append(input.links[0].from_node)
-                                                        
-                                            if branch.node_tree not in node_trees:
-                                                node_trees.append(branch.node_tree)
-                                                    
-                                     # New Branch   
-                                        else:
-                                            for input in branch.inputs:
-                                                if input.is_linked:
-                                                    if input.links[0].from_node not in branches:
-                                                        branches.append(input.links[0].from_node)
+                            # Material Output: Detach Displacement
+                                output_node = analysis.output_node
+                                if output_node is not None and output_node.inputs[2].is_linked:
+                                    reconnect_nodes.append((slot.material.node_tree, output_node.inputs[2].links[0].from_socket, output_node.inputs[2]))
+                                    slot.material.node_tree.links.remove(output_node.inputs[2].links[0])
                                 
                             # Source BSDF
                                 for shader_node_ in shader_nodes:
@@ -3579,64 +4129,18 @@ class SPARROW_OT_BakeStart(Operator):
                                     
                             # Source Only
                                 else:
-                                    displacements = []
-                                    node_trees = []
-                                    node_trees.append(slot.material.node_tree)
-
-                                # Searching: Node Trees
-                                    for tree in node_trees:
-                                        branches = []
-                                        
-                                    # Searching: Branch Start
-                                        for node in tree.nodes:
-                                            if node.type in ['OUTPUT_MATERIAL', 'GROUP_OUTPUT'] and node.is_active_output:
-                                                
-                                            # Material Output
-                                                if node.type == 'OUTPUT_MATERIAL':
-                                                    
-                                                # Material Output: Detach Surface (Material Output)
-                                                    if node.inputs[0].is_linked:
-                                                        reconnect_nodes.append((tree, node.inputs[0].links[0].from_socket, node.inputs[0]))
-                                                        tree.links.remove(node.inputs[0].links[0])
-                                                
-                                                # Material Output: Add Branch
-                                                    if node.inputs[2].is_linked:
-                                                        if node.inputs[2].links[0].from_node not in branches:
-                                                            branches.append(node.inputs[2].links[0].from_node)
-                                                        tree.links.new(node.inputs[2].links[0].from_socket, node.inputs[0])
-                                                        
-                                            # Group Output
-                                                elif node.type == 'GROUP_OUTPUT':
-                                                    
-                                                # Group Output: Add Branch
-                                                    for input in node.inputs:
-                                                        if input.is_linked:
-                                                            if input.links[0].from_node not in branches:
-                                                                branches.append(input.links[0].from_node)
-                                                break
-                                            
-                                    # Branching
-                                        for branch in branches:
-                                            
-                                        # Match
-                                            if branch.type in ['DISPLACEMENT', 'VECTOR_DISPLACEMENT']:
-                                                displacements.append((branch, tree))
-                                                
-                                        # New Tree & Branch
-                                            elif branch.type == 'GROUP':
-                                                for input in branch.inputs:
-                                                    if input.is_linked:
-                                                        if input.from_node not in branches:
-                                                            branches.append(input.from_node)
-                                                if branch.node_tree not in node_trees:
-                                                    node_trees.append(branch.node_tree)
-                                                        
-                                         # New Branch   
-                                            else:
-                                                for input in branch.inputs:
-                                                    if input.is_linked:
-                                                        if input.links[0].from_node not in branches:
-                                                            branches.append(input.links[0].from_node)
+                                    analysis = analyze_material(slot.material, self.material_analysis)
+                                    displacements = analysis.displacement_nodes
+                                    
+                                # Material Output: Detach Surface, Displacement to Surface
+                                    output_node = analysis.output_node
+                                    if output_node is not None:
+                                        tree = slot.material.node_tree
+                                        if output_node.inputs[0].is_linked:
+                                            reconnect_nodes.append((tree, output_node.inputs[0].links[0].from_socket, output_node.inputs[0]))
+                                            tree.links.remove(output_node.inputs[0].links[0])
+                                        if output_node.inputs[2].is_linked:
+                                            tree.links.new(output_node.inputs[2].links[0].from_socket, output_node.inputs[0])
                                             
                                 # Source Displacement
                                     for displacement in displacements:
@@ -3868,7 +4372,17 @@ class SPARROW_OT_BakeStart(Operator):
                 cycles = scene.cycles
                 self.sampling = [cycles.use_adaptive_sampling, cycles.adaptive_threshold, cycles.samples, cycles.adaptive_min_samples, cycles.time_limit, cycles.use_denoising, cycles.denoiser, cycles.denoising_input_passes, cycles.denoising_prefilter]
      
-                if not abp.ab_sampling_use_render:
+                if not abp.ab_sampling_use_render and abp.ab_sampling_planner:
+                    node_types = set()
+                    for obj in self.source_objects:
+                        for slot in obj.material_slots:
+                            if slot.material is not None and slot.material.use_nodes:
+                                node_types |= analyze_material(slot.material, self.material_analysis).node_types
+                                
+                    for attribute, value in plan_bake_sampling(item.Type, label, node_types, abp).items():
+                        setattr(cycles, attribute, value)
+                        
+                elif not abp.ab_sampling_use_render:
                     pick_low_sample = True
                     
                     if abp.ab_auto_pick_sampling and (item.Type in ['Combined', 'Ambient Occlusion ', 'Glossy', 'Diffuse', 'Transmission', 'Shadow', 'Environment'] or (item.Type == 'Ambient Occlusion' and not abp.ab_ao_sample_use)):
@@ -3885,6 +4399,20 @@ class SPARROW_OT_BakeStart(Operator):
                     cycles.denoising_input_passes = abp.ab_sampling_low_passes if pick_low_sample else abp.ab_sampling_high_passes
                     cycles.denoising_prefilter = abp.ab_sampling_low_prefilter if pick_low_sample else abp.ab_sampling_high_prefilter
 
+            # Bake Cache
+                self.cache_key = None
+                self.cache_hit = False
+                if target_obj.name in self.object_fingerprints:
+                    self.cache_key = bake_fingerprint(self.object_fingerprints[target_obj.name], item.Type, self.img, scene, self.scene_fingerprint if is_light_transport_bake(baketype, label) else None)
+                    if load_cached_bake(self.cache_dir, self.cache_key, self.img):
+                        self.cache_hit = True
+                        restore_nodes()
+                        self.phase_export_locked = False
+                        
+                        if abp.ab_report_bake_end:
+                            self.report({'INFO'}, f"Auto Bake: Texture '{self.img.name}' is loaded from the bake cache.")
+                        return {'PASS_THROUGH'}
+
             # Multires Bake 
                 if label == "Multires":
                     
@@ -3969,6 +4497,24 @@ class SPARROW_OT_BakeStart(Operator):
             # Successful Bake
                 if not self.bake_canceled:
                     
+                # Channel Packing: fill in the channels that were already baked
+                    if self.pack_sources:
+                        self.restore_pack_channels(abp)
+                        pack_channels(self.img, self.pack_sources)
+                        self.pack_sources = {}
+                    
+                # Store in Bake Cache, before anti-aliasing so a cache hit goes through the same steps
+                    if self.cache_key is not None and not self.cache_hit:
+                        store_cached_bake(self.cache_dir, self.cache_key, self.img)
+                    
+                # Keep Channel Packing Sources, before anti-aliasing like the packed bake itself
+                    if not is_udim_bake and item.Type in [getattr(abp, prop) for prop in CHANNEL_PACK_PROPS] and any(item_.Type == 'Channel Packing' and item_.Status == 'Pending' for item_ in scene.autobake_queuelist):
+                        for item_ in scene.autobake_objectqueuelist:
+                            if item_.Status == 'Baking':
+                                self.baked_pixels = {key: pixels for key, pixels in self.baked_pixels.items() if key[0] == item_.Object.name}
+                                self.baked_pixels[(item_.Object.name, item.Type)] = snapshot_pixels(self.img)
+                                break
+                    
                 # Anti Aliasing
                     if not abp.ab_shared_textures or not any(item.Status == 'Pending' for item in scene.autobake_objectqueuelist):
                         if self.antialiasing_method == 'UPSCALED':
@@ -4527,9 +5073,14 @@ class SPARROW_OT_BakeStart(Operator):
                             scene.autobake_queuelist.clear()
                             scene.autobake_objectqueuelist.clear()
                             
+                    # Texture Writes
+                        for error in finish_texture_writes():
+                            self.report({'ERROR'}, f"Auto Bake: Texture export failed: {error}")
+                            
                     # Close Session
                         context.window_manager.event_timer_remove(self._timer)
                         bake_status = 'IDLE'
+                        restore_atlas_settings(abp)
                         
                         return {'FINISHED'}
                     
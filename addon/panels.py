@@ -351,6 +351,7 @@ class SPARROW_PT_OutputPanel(SPARROW_PT_Output, bpy.types.Panel):
                 
         col = layout.column_flow(columns=1)
         col.operator(SPARROW_OT_ExportSelectedScenes.bl_idname, icon="RENDER_STILL", text="Export Scenes")                
+        col.operator(SPARROW_OT_DedupGeometry.bl_idname, icon="DUPLICATE", text="Deduplicate Geometry")
         
         row = col.row()
         row.label(text="Selected")
@@ -392,10 +393,59 @@ class SPARROW_PT_OutputPanel(SPARROW_PT_Output, bpy.types.Panel):
 
         row = box.row()
         row.prop(settings, "save_on_export")          
+        row.prop(settings, "write_manifest")
+
+        row = box.row()
+        row.prop(settings, "bound_actions_only")
+        sub = row.row()
+        sub.enabled = settings.gltf_format == 'GLB'
+        sub.prop(settings, "animation_tolerance")
+
+        row = box.row()
+        row.prop(settings, "gn_instance_lists")
+
+        row = box.row()
+        row.prop(settings, "precompute_colliders")
+        sub = row.row()
+        sub.enabled = settings.precompute_colliders in ('CONVEX', 'TRIMESH')
+        sub.prop(settings, "collider_detail", text="Detail")
+
+        if settings.gltf_format == 'GLB':
+            row = box.row()
+            row.prop(settings, "optimize_glb")
+            sub = row.row()
+            sub.enabled = settings.optimize_glb
+            sub.prop(settings, "glb_quantization", text="")
+
+            row = box.row()
+            row.prop(settings, "ktx2_textures")
+            sub = row.row()
+            sub.enabled = settings.ktx2_textures
+            sub.prop(settings, "texture_max_size", text="Color")
+            sub.prop(settings, "data_texture_max_size", text="Data")
 
         row = box.row()
         row.operator(SPARROW_OT_LoadRegistry.bl_idname, text="Reload Registry")
 
+        registry = bpy.context.window_manager.components_registry # type: ComponentsRegistry
+        if registry.has_type_infos():
+            stats = registry.registry_stats()
+            row = box.row()
+            row.label(text=f"Registry #{stats['generation']}: {stats['types']} types, {stats['classes']} classes, {stats['attached']} attached, {stats['schema_bytes'] / (1024 * 1024):.2f}MB")
+
+        col = layout.column()
+        col.label(text="Component Validation")
+        box = layout.box()
+
+        row = box.row()
+        row.operator(SPARROW_OT_ValidateComponents.bl_idname, icon="CHECKMARK", text="Validate Components")
+        row.prop(settings, "validate_on_export")
+
+        if len(settings.validation_issues):
+            box.template_list("SPARROW_UL_ValidationIssues", "", settings, "validation_issues", settings, "validation_issues_index", rows=4)
+        elif settings.validation_done:
+            box.label(text="No component issues found", icon="CHECKMARK")
+
 class SPARROW_PT_Scene:
     bl_space_type = 'PROPERTIES'
     bl_region_type = 'WINDOW'
@@ -417,6 +467,12 @@ class SPARROW_PT_ScenePanel(SPARROW_PT_Scene, bpy.types.Panel):
         col.prop(scene_props, "scene_export", text="Scene Export")
         col.prop(scene_props, "blueprint_export", text="Blueprint Export")
 
+        row = layout.row()
+        row.prop(scene_props, "partition_export")
+        sub = row.row()
+        sub.enabled = scene_props.partition_export
+        sub.prop(scene_props, "partition_cell_size")
+
         draw_components(item, layout, settings, registry)
 
 class SPARROW_PT_Main:
@@ -438,6 +494,7 @@ class SPARROW_PT_Bake(SPARROW_PT_Main, Panel):
         if bake_status == 'IDLE':
             col.alert = (not bool(os.path.exists(abp.ab_filepath)) and abp.ab_texture_export) or (abp.ab_bake_list_item_count < 1 if not abp.ab_udim_bake else (abp.ab_udim_list_item_count < 1 or abp.ab_udimtype_list_item_count < 1))
             col.operator("sparrow.start_bake", icon="RENDER_STILL", text="Auto Bake       ")
+            col.operator("sparrow.atlas_collection", icon="UV", text="Atlas Collection       ")
             
             row = col.row(align=True)
             col1 = row.column()
@@ -978,6 +1035,21 @@ class SPARROW_PT_Format(SPARROW_PT_Main, Panel):
         split = col.split(factor=.4)
         split.label(text="Use Float")
         split.prop(abp, "ab_floatbuffer", text=str(abp.ab_floatbuffer), toggle=True, expand=True)           
+        
+        split = col.split(factor=.4)
+        split.label(text="Auto Size")
+        split.prop(abp, "ab_auto_size", text=str(abp.ab_auto_size), toggle=True)
+        
+        if abp.ab_auto_size:
+            split = col.split(factor=.4)
+            split.label(text="Texel Density")
+            split.prop(abp, "ab_texel_density", text="px/m")
+            
+            split = col.split(factor=.4)
+            split.label(text="Size Range")
+            row = split.row(align=True)
+            row.prop(abp, "ab_auto_size_min", text="Min")
+            row.prop(abp, "ab_auto_size_max", text="Max")
             
         if abp.ab_fileformat in ["PNG", "OPEN_EXR_MULTILAYER", "OPEN_EXR", "TIFF", "JPEG2000", "DPX"]:
             split = col.split(factor=.4)
@@ -1263,6 +1335,20 @@ class SPARROW_PT_Sampling(SPARROW_PT_Main, Panel):
 
         col = layout.column()
         
+        split = col.split(factor=.4)
+        split.alignment = 'RIGHT'
+        split.label(text="Workers")
+        split.prop(abp, "ab_bake_workers", text="")
+        
+        split = col.split(factor=.4)
+        split.alignment = 'RIGHT'
+        split.label(text="Bake Cache")
+        row = split.row(align=True)
+        row.prop(abp, "ab_bake_cache", text="")
+        row_path = row.row(align=True)
+        row_path.active = abp.ab_bake_cache
+        row_path.prop(abp, "ab_bake_cache_path", text="")
+        
         split = col.split(factor=.4)
         split.alignment = 'RIGHT'
         split.label(text="Render Sampling")
@@ -1270,7 +1356,22 @@ class SPARROW_PT_Sampling(SPARROW_PT_Main, Panel):
         
         if not abp.ab_sampling_use_render:
             split = col.split(factor=.4)
-            split.active = not abp.ab_sampling_use_render
+            split.alignment = 'RIGHT'
+            split.label(text="Constant Maps")
+            split.row().prop(abp, "ab_constant_maps", expand=True)
+            
+            split = col.split(factor=.4)
+            split.label(text="")
+            split.prop(abp, "ab_sampling_planner")
+            
+            if abp.ab_sampling_planner:
+                split = col.split(factor=.4)
+                split.alignment = 'RIGHT'
+                split.label(text="Target Noise")
+                split.prop(abp, "ab_sampling_target_noise", text="")
+            
+            split = col.split(factor=.4)
+            split.active = not abp.ab_sampling_use_render and not abp.ab_sampling_planner
             split.label(text="")
             split.prop(abp, "ab_auto_pick_sampling")
         
@@ -5,9 +5,11 @@ import os
 import platform
 import re
 import json
+import sys
 
 from .regsitry import *
 from .utils import *
+from .validation import collect_component_items, validate_components
 from .hashing.tiger import hash as tiger_hash
 
 from bpy.props import (StringProperty, BoolProperty, IntProperty, FloatProperty, EnumProperty, PointerProperty, CollectionProperty)
@@ -53,6 +55,15 @@ class SPARROW_PG_Component(PropertyGroup):
     short_name: StringProperty() # type: ignore
     long_name: StringProperty() # type: ignore
 
+# one entry of the component validation report
+class SPARROW_PG_ValidationIssue(PropertyGroup):
+    item_name: StringProperty() # type: ignore
+    item_type: EnumProperty(items=ITEM_TYPES) # type: ignore
+    long_name: StringProperty() # type: ignore
+    path: StringProperty() # type: ignore
+    severity: EnumProperty(items=(('ERROR', "Error", ""), ('WARNING', "Warning", ""))) # type: ignore
+    message: StringProperty() # type: ignore
+
 SETTING_NAME = ".sparrow_settings"
 class SPARROW_PG_Settings(PropertyGroup):
 
@@ -87,6 +98,26 @@ class SPARROW_PG_Settings(PropertyGroup):
                 return os.path.join(self.scene_folder(), f"{scene.name}.gltf")
             else:
                 return os.path.join(self.scene_folder(), f"{scene.name}")            
+
+    # world partition cells of a scene go in a folder named after the scene
+    def scene_cell_folder(self, scene: bpy.types.Scene)->str:
+        return os.path.join(self.scene_folder(), scene.name)
+
+    def scene_cell_path(self, scene: bpy.types.Scene, cell: str, include_gltf: bool = False)->str:
+        if self.gltf_format == 'GLB':
+            return os.path.join(self.scene_cell_folder(scene), f"{cell}.glb")
+        else:
+            if include_gltf:
+                return os.path.join(self.scene_cell_folder(scene), f"{cell}.gltf")
+            else:
+                return os.path.join(self.scene_cell_folder(scene), f"{cell}")
+
+    # bevy asset path to the cell
+    def scene_cell_asset_path(self, scene: bpy.types.Scene, cell: str)->str:
+        return os.path.join(SCENE_FOLDER, scene.name, f"{cell}.glb" if self.gltf_format == 'GLB' else f"{cell}.gltf")
+
+    def scene_cell_index_path(self, scene: bpy.types.Scene)->str:
+        return os.path.join(self.scene_folder(), f"{scene.name}.cells.json")
             
     # save the settings to a text datablock    
     def save_settings(self, context):
@@ -94,7 +125,19 @@ class SPARROW_PG_Settings(PropertyGroup):
             'registry_file': self.registry_file,
             'assets_path': self.assets_path,
             'gltf_format': self.gltf_format,
-            'save_on_export': self.save_on_export
+            'save_on_export': self.save_on_export,
+            'validate_on_export': self.validate_on_export,
+            'optimize_glb': self.optimize_glb,
+            'glb_quantization': self.glb_quantization,
+            'write_manifest': self.write_manifest,
+            'bound_actions_only': self.bound_actions_only,
+            'animation_tolerance': self.animation_tolerance,
+            'gn_instance_lists': self.gn_instance_lists,
+            'precompute_colliders': self.precompute_colliders,
+            'collider_detail': self.collider_detail,
+            'ktx2_textures': self.ktx2_textures,
+            'texture_max_size': self.texture_max_size,
+            'data_texture_max_size': self.data_texture_max_size
         })
         # update or create the text datablock
         if SETTING_NAME in bpy.data.texts:
@@ -109,7 +152,10 @@ class SPARROW_PG_Settings(PropertyGroup):
         stored_settings = bpy.data.texts[SETTING_NAME] if SETTING_NAME in bpy.data.texts else None
         if stored_settings != None:
             settings =  json.loads(stored_settings.as_string())
-            for prop in ['assets_path', 'registry_file', 'gltf_format']:
+            # the KHR_mesh_quantization mode was removed, bevy can not load its normals
+            if settings.get('glb_quantization') == 'KHR':
+                settings['glb_quantization'] = 'CORE'
+            for prop in ['assets_path', 'registry_file', 'gltf_format', 'validate_on_export', 'optimize_glb', 'glb_quantization', 'write_manifest', 'bound_actions_only', 'animation_tolerance', 'gn_instance_lists', 'precompute_colliders', 'collider_detail', 'ktx2_textures', 'texture_max_size', 'data_texture_max_size']:
                 if prop in settings:
                     setattr(self, prop, settings[prop])
 
@@ -120,8 +166,7 @@ class SPARROW_PG_Settings(PropertyGroup):
         if os.path.exists(self.registry_file):            
             try:
                 with open(self.registry_file) as f:
-                    data = json.load(f)
-                    defs = data.get("$defs", {})                    
+                    defs = json.load(f).get("$defs", {})
             except (IOError, json.JSONDecodeError) as e:
                 print(f"ERROR: An error occurred while reading the file: {e}")
 
@@ -135,8 +180,10 @@ class SPARROW_PG_Settings(PropertyGroup):
              bpy.app.timers.register(watch_registry)
 
         registry.load_schema(defs)
+        total_types = len(defs)
+        defs = None # unreachable types are released here
 
-        print(f"INFO: registry:  {len(registry.type_infos)} type_infos from : {self.registry_file}")
+        print(f"INFO: registry:  {len(registry.type_infos)} of {total_types} type_infos from : {self.registry_file}")
         
         # build component_list, from new registry data
         self.component_list.clear()
@@ -160,6 +207,26 @@ class SPARROW_PG_Settings(PropertyGroup):
 
         bpy.ops.object.refresh_custom_properties_all()
 
+    # check components of the given scenes (whole file if None) against the registry, fills validation_issues
+    def validate_components(self, scenes=None) -> int:
+        registry: ComponentsRegistry = bpy.context.window_manager.components_registry
+        issues = validate_components(registry.type_infos, collect_component_items(scenes), registry.blender_property_mapping.keys(), registry.registered_types)
+
+        self.validation_issues.clear()
+        for issue in issues:
+            added = self.validation_issues.add()
+            added.name = f"{issue.item_name} {issue.long_name}"
+            added.item_name = issue.item_name
+            added.item_type = issue.item_type
+            added.long_name = issue.long_name
+            added.path = issue.path
+            added.severity = issue.severity
+            added.message = issue.message
+        self.validation_issues_index = 0
+        self.validation_done = True
+
+        return sum(1 for issue in issues if issue.severity == 'ERROR')
+
     # Saved settings
     # Path to the assets folder
     assets_path: StringProperty(
@@ -192,6 +259,104 @@ class SPARROW_PG_Settings(PropertyGroup):
         update= save_settings,
         default=True
     )# type: ignore
+    validate_on_export: BoolProperty(
+        options = set(), 
+        name="Validate on Export",
+        description="Validate components against the registry before exporting, and cancel the export on errors",
+        update= save_settings,
+        default=True
+    )# type: ignore
+    optimize_glb: BoolProperty(
+        options = set(), 
+        name="Optimize GLB",
+        description="Rewrite each exported glb: drop uv and color sets bevy does not read, reorder triangles for the vertex cache and quantize attributes",
+        update= save_settings,
+        default=False
+    )# type: ignore
+    glb_quantization: EnumProperty(
+        options = set(), 
+        name="Quantization",
+        description="Vertex attributes stored as integers by Optimize GLB",
+        items=GLB_QUANTIZATION,
+        update= save_settings,
+        default='CORE'
+    )# type: ignore
+    write_manifest: BoolProperty(
+        options = set(), 
+        name="Write Manifest",
+        description="After each export write manifest.json to the assets folder, listing every scene and blueprint with its hash, size and blueprint dependencies",
+        update= save_settings,
+        default=True
+    )# type: ignore
+    bound_actions_only: BoolProperty(
+        options = set(), 
+        name="Bound Actions Only",
+        description="Only export the actions bound to the exported objects, as active action or on NLA tracks, instead of every action an armature could play. Actions only played by name at runtime are left out",
+        update= save_settings,
+        default=False
+    )# type: ignore
+    animation_tolerance: FloatProperty(
+        options = set(), 
+        name="Key Tolerance",
+        description="Drop animation keys that linear interpolation reproduces within this error, and constant tracks at the rest value. 0 keeps every sampled key, glb only",
+        update= save_settings,
+        default=0.0,
+        min=0.0,
+        max=0.1,
+        precision=4,
+        step=0.01
+    )# type: ignore
+    gn_instance_lists: BoolProperty(
+        options = set(), 
+        name="GN Instance Lists",
+        description="Export geometry nodes instances of blueprint objects as one transform list per blueprint, instead of one gltf node per instance. Instances of objects outside a blueprint are left out",
+        update= save_settings,
+        default=False
+    )# type: ignore
+    precompute_colliders: EnumProperty(
+        options = set(), 
+        name="Colliders",
+        description="Precompute local bounds for every mesh object at export, and a collider shape for objects with a collider component",
+        items=PRECOMPUTE_COLLIDERS,
+        update= save_settings,
+        default='OFF'
+    )# type: ignore
+    collider_detail: FloatProperty(
+        options = set(), 
+        name="Collider Detail",
+        description="Vertices of collider shapes closer than this fraction of the object size are merged. 0 keeps every vertex",
+        update= save_settings,
+        default=0.02,
+        min=0.0,
+        max=0.25,
+        precision=3,
+        step=0.1
+    )# type: ignore
+    ktx2_textures: BoolProperty(
+        options = set(), 
+        name="KTX2 Textures",
+        description="Store glb textures as KTX2 with precomputed mipmaps, so bevy does not decode them or generate mips at load. Bevy needs its ktx2 and zlib features",
+        update= save_settings,
+        default=False
+    )# type: ignore
+    texture_max_size: IntProperty(
+        options = set(), 
+        name="Color Max Size",
+        description="Largest size of base color and emissive textures in KTX2, larger ones start at a smaller mip. 0 keeps the source size",
+        update= save_settings,
+        default=2048,
+        min=0,
+        max=16384
+    )# type: ignore
+    data_texture_max_size: IntProperty(
+        options = set(), 
+        name="Data Max Size",
+        description="Largest size of normal, metallic roughness, occlusion and other data textures in KTX2. 0 keeps the source size",
+        update= save_settings,
+        default=1024,
+        min=0,
+        max=16384
+    )# type: ignore
      
     ## not saved
     # Last scene for collection instance edit
@@ -217,6 +382,10 @@ class SPARROW_PG_Settings(PropertyGroup):
     copied_source_component_name: StringProperty(default="")
     copied_source_item_name: StringProperty(default="")
     copied_source_item_type: StringProperty(default="")
+    # component validation report
+    validation_issues: CollectionProperty(name="validation issues", type=SPARROW_PG_ValidationIssue) # type: ignore
+    validation_issues_index: IntProperty(name="Index for validation issues", default=0) # type: ignore
+    validation_done: BoolProperty(default=False) # type: ignore
 
 #ComponentMetadata = SPARROW_PG_ComponentInstance
 class ComponentMetadata(PropertyGroup):
@@ -296,7 +465,22 @@ class SPARROW_PG_SceneProps(PropertyGroup):
     scene_export: BoolProperty(name="Export Scene", description="Automatically export scene as level", default = True, options = set()) # type: ignore
     # export bluepritns
     blueprint_export: BoolProperty(name="Export Blueprints", description="Automatically export anything marked as asset as blueprint", default = False, options = set()) # type: ignore
-
+    # split the scene into grid cells, each exported to its own file
+    partition_export: BoolProperty(name="World Partition", description="Export the scene objects as a grid of cells, each cell to its own file with an index file listing the cell bounds and blueprints. Suns, cameras and scene components stay in the scene file", default = False, options = set()) # type: ignore
+    partition_cell_size: FloatProperty(name="Cell Size", description="Size of a world partition cell along X and Y", default = 64.0, min = 1.0, subtype = 'DISTANCE', options = set()) # type: ignore
+
+
+# size of a value and everything it holds, shared objects counted once
+def deep_sizeof(value, seen: set) -> int:
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(deep_sizeof(v, seen) for v in value)
+    return size
 
 # this is where we store the information for all available components
 class ComponentsRegistry(PropertyGroup):
@@ -368,6 +552,14 @@ class ComponentsRegistry(PropertyGroup):
     long_names_to_propgroup_names = {}
     custom_types_to_add = {}
     invalid_components = []
+    # propertyGroup pointers injected into ComponentMetadata, see upsert_component_in_item
+    attached_propertyGroup_names = set()
+    # incremented on every load_schema, old generated classes are released before a new generation is built
+    generation = 0
+    # memory held by type_infos, measured once per load_schema for registry_stats
+    schema_bytes = 0
+    # every type name of the schema, type_infos only keeps the types reachable from components
+    registered_types = set()
 
     def generate_wrapper_propertyGroup(self, wrapped_type_long_name, item_long_name, definition_link, update, nesting_long_names=[]):
         blender_property_mapping = self.blender_property_mapping
@@ -430,25 +622,30 @@ class ComponentsRegistry(PropertyGroup):
         }
         property_group_class = type(property_group_name, (PropertyGroup,), property_group_params)
         bpy.utils.register_class(property_group_class)
+        self.component_property_group_classes.append(property_group_class)
 
         return property_group_class
 
     def load_schema(self, defs: Dict[str, Any]):
 
+        # release the previous generation of generated classes, otherwise every reload leaks a full set of RNA types
+        self.release_propertyGroups()
+        ComponentsRegistry.generation += 1
+
         # clear all existing data
         self.long_names_to_propgroup_names.clear()
         self.missing_types_list.clear()
         self.type_infos.clear()
         self.type_infos_missing.clear()
 
-        self.component_propertyGroups.clear()
-        self.component_property_group_classes.clear()
-
         self.custom_types_to_add.clear()
         self.invalid_components.clear()
      
-        for key in defs.keys():
-            self.type_infos[key] = defs[key]        
+        ComponentsRegistry.registered_types = set(defs.keys())
+        # only keep the types reachable from components, the rest of bevy's reflected types are never used
+        for key in self.reachable_type_names(defs):
+            if key in defs:
+                self.type_infos[key] = defs[key]
 
         # generate_propertyGroups_for_components
         for component_name in self.type_infos.keys(): 
@@ -460,7 +657,23 @@ class ComponentsRegistry(PropertyGroup):
         for long_name in self.custom_types_to_add:
             self.type_infos[long_name] = self.custom_types_to_add[long_name]
         self.custom_types_to_add.clear()
+
+        ComponentsRegistry.schema_bytes = deep_sizeof(self.type_infos, set())
     
+    # closure of all type references, starting from the components
+    def reachable_type_names(self, defs: Dict[str, Any]) -> set[str]:
+        pending = [long_name for long_name, definition in defs.items() if definition.get("is_component", False)]
+        reachable = set()
+        while len(pending) > 0:
+            long_name = pending.pop()
+            if long_name in reachable:
+                continue
+            reachable.add(long_name)
+            definition = defs.get(long_name, None)
+            if definition is not None: # missing types are reported while processing
+                pending.extend(type_refs(definition))
+        return reachable
+
     def has_type_infos(self):
         return len(self.type_infos.keys()) != 0
 
@@ -582,6 +795,7 @@ class ComponentsRegistry(PropertyGroup):
                 # we have found a matching property_group, so try to inject it
                 # now inject property group
                 setattr(ComponentMetadata, property_group_name, self.component_propertyGroups[property_group_name]) # FIXME: not ideal as ALL instances of ComponentMetadata get the propGroup, but have not found a way to assign it per instance
+                self.attached_propertyGroup_names.add(property_group_name)
                 propertyGroup = getattr(component_meta, property_group_name, None)
         
         # now deal with property groups details
@@ -1334,28 +1548,44 @@ class ComponentsRegistry(PropertyGroup):
                 pass
 
 
+    # detach the pointers injected into ComponentMetadata and unregister all generated classes
+    # the component values stay in the item's id properties and are picked up again by the next generation
     @classmethod
-    def register(cls):
-        bpy.types.WindowManager.components_registry = PointerProperty(type=ComponentsRegistry)
-
-    @classmethod
-    def unregister(cls):
-        # remove all the property groups that have been registered
-        for propgroup_name in cls.component_propertyGroups.keys():
+    def release_propertyGroups(cls):
+        for propgroup_name in cls.attached_propertyGroup_names:
             try:
                 delattr(ComponentMetadata, propgroup_name)
-                #print("sucess REMOVAL from Metadata")
             except Exception as error:
-                pass
-                #print("failed to unregister")
+                print(f"WARNING: failed to detach {propgroup_name} from ComponentMetadata: {error}")
+        cls.attached_propertyGroup_names.clear()
 
-        for propgroup_class in cls.component_property_group_classes:
+        # nested classes are registered before the classes using them, so unregister in reverse
+        for propgroup_class in reversed(cls.component_property_group_classes):
             try:
                 bpy.utils.unregister_class(propgroup_class)
-                #print("sucess UNREGISTER")
             except Exception as error:
-                pass
-                #print("NEW failed to unregister")
+                print(f"WARNING: failed to unregister {propgroup_class.__name__}: {error}")
+        cls.component_property_group_classes.clear()
+        cls.component_propertyGroups.clear()
+
+    # counts for the current registry generation, to check reloads do not grow memory
+    def registry_stats(self) -> Dict[str, int]:
+        return {
+            "generation": self.generation,
+            "types": len(self.type_infos),
+            "classes": len(self.component_property_group_classes),
+            "attached": len(self.attached_propertyGroup_names),
+            "schema_bytes": self.schema_bytes,
+        }
+
+    @classmethod
+    def register(cls):
+        bpy.types.WindowManager.components_registry = PointerProperty(type=ComponentsRegistry)
+
+    @classmethod
+    def unregister(cls):
+        # remove all the property groups that have been registered
+        cls.release_propertyGroups()
         
         del bpy.types.WindowManager.components_registry
 
@@ -1488,6 +1718,10 @@ class SPARROW_PG_Autobake(PropertyGroup):
 
 # Format
 
+    ab_auto_size : BoolProperty(name="Auto Size", description="Pick each object's texture size from its surface area and UV coverage to hit the texel density, instead of the bake list sizes. Not used for UDIM bakes or shared textures", default = False, options = set())  # type: ignore
+    ab_texel_density : FloatProperty(name="Texel Density", description="Target pixels per meter for Auto Size", default = 512, min = 1, max = 65536, options = set())  # type: ignore
+    ab_auto_size_min : IntProperty(name="Min Size", description="Smallest texture size Auto Size picks", default = 64, min = 1, max = 65536, options = set())  # type: ignore
+    ab_auto_size_max : IntProperty(name="Max Size", description="Largest texture size Auto Size picks", default = 4096, min = 1, max = 65536, options = set())  # type: ignore
     ab_floatbuffer: BoolProperty(name="Use Float", description="Create image with 32-bit floating-point bit depth", default = False, options = set())  # type: ignore
     
 # Export
@@ -1535,7 +1769,16 @@ class SPARROW_PG_Autobake(PropertyGroup):
 
 # Sampling
 
+    ab_bake_cache : BoolProperty(name='Bake Cache', default=False, description='Reuse baked images from disk when the mesh, UVs, materials and bake settings of an object did not change since they were baked. Not used with Selected to Active, UDIM or shared textures', options = set())  # type: ignore
+    ab_bake_cache_path : StringProperty(name='Bake Cache Path', default='', subtype='DIR_PATH', description='Folder holding the bake cache, the system temp folder is used when empty', options = set())  # type: ignore
+    ab_bake_workers : IntProperty(name='Workers', default=1, min=1, max=64, description='Number of background Blender processes baking the object queue in parallel, the CPU threads are split between them. Only render pass bakes without Selected to Active, UDIM or shared textures can use more than one worker', options = set())  # type: ignore
     ab_sampling_use_render : BoolProperty(name='Use Render Settings', default=False, description='Use the same sampling settings as for rendering images', options = set())  # type: ignore
+    ab_constant_maps : EnumProperty(name='Constant Maps', default='OFF', options = set(), description='Skip the bake for socket maps that are the same constant over the whole object, like an unlinked Roughness of 0.5', items=[
+        ('OFF', 'Bake', 'Bake constant maps like any other map'),
+        ('FILL', 'Fill', 'Fill the texture with the constant at the full bake size'),
+        ('PIXEL', '1x1 Pixel', 'Write a single pixel texture holding the constant')])  # type: ignore
+    ab_sampling_planner : BoolProperty(name='Plan Sampling', default=False, options = set(), description="Pick the sampling per bake: maps read from plain sockets bake with a single sample, light transport bakes and sockets fed by Ambient Occlusion or Bevel nodes sample adaptively up to the high settings until the target noise is reached")  # type: ignore
+    ab_sampling_target_noise : FloatProperty(name='Target Noise', default=0.01, precision=4, min=0.0001, max=1, options = set(), description='Noise threshold the planned adaptive bakes stop at, lower values reduce noise at the cost of bake time')  # type: ignore
     ab_auto_pick_sampling : BoolProperty(name='Auto Select', default=True, options = set(), description="Automatically choose which sampling settings to use, with this you can optimize to only bake textures with high sampling settings that needs to be baked with. High sampling settings will be picked for: \n\u2022 Combined \n\u2022 Ambient Occlusion (Standard) \n\u2022 Glossy \n\u2022 Diffuse \n\u2022 Transmission \n\u2022 Shadow \n\u2022 Environment")  # type: ignore
 
     ab_sampling_low_adaptive : BoolProperty(name='Adaptive Sampling', default=False, description='Automatically reduce the number of samples per pixel based on estimated noise level', options = set())  # type: ignore
@@ -1921,6 +2164,7 @@ class SPARROW_PG_Autobake(PropertyGroup):
 class SPARROW_PG_BakeQueue(PropertyGroup):
     Type : StringProperty(options = set(), name="", default="Unknown")
     Size : IntProperty(options = set(), name="", default=0)
+    AutoSize : BoolProperty(options = set(), name='', default=False)
     Multiplier : FloatProperty(options = set(), name='', default=1)
     Status : StringProperty(options = set(), name="", default="Pending")
     Cancel : BoolProperty(options = set(), name='', default=False)
@@ -22,6 +22,19 @@ class TypeInfo:
     type_info: str | None# "List"
     one_of: List[Any]
 
+# long names of all types directly referenced by a type definition, including enum variant fields
+def type_refs(definition) -> List[str]:
+    refs = list(definition.get("properties", {}).values()) + list(definition.get("prefix_items", []))
+    for key in ["items", "key_type", "value_type"]:
+        if isinstance(definition.get(key, None), dict):
+            refs.append(definition[key])
+
+    names = [ref["type"]["$ref"].replace("#/$defs/", "") for ref in refs if "$ref" in ref.get("type", {})]
+    for variant in definition.get("one_of", []):
+        if isinstance(variant, dict):
+            names.extend(type_refs(variant))
+    return names
+
 # helper function that returns a lambda, used for the PropertyGroups update function below        
 def update_calback_helper(definition: TypeInfo, update, component_name_override):
     return lambda self, context: update(self, context, definition, component_name_override)
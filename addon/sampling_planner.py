@@ -0,0 +1,39 @@
+from typing import Any, Dict, Set
+
+# Bake type aware sampling: data maps read straight from sockets need a single sample,
+# light transport maps and anything using ray traced shader nodes sample adaptively until a target noise level.
+
+# bake types that integrate light, see SPARROW_OT_BakeStart.bake_type_info
+PATH_TRACED_TYPES = ['Combined', 'Ambient Occlusion ', 'Glossy', 'Diffuse', 'Transmission', 'Shadow', 'Environment']
+
+# shader nodes whose output depends on tracing rays, a socket fed by them is noisy
+RAY_NODE_TYPES = frozenset(['AMBIENT_OCCLUSION', 'BEVEL'])
+
+
+def is_path_traced(bake_type: str, label: str, node_types: Set[str]) -> bool:
+    if bake_type in PATH_TRACED_TYPES or label == 'Ambient Occlusion':
+        return True
+    return not RAY_NODE_TYPES.isdisjoint(node_types)
+
+
+# cycles settings for one bake, keys are scene.cycles attributes
+def plan_bake_sampling(bake_type: str, label: str, node_types: Set[str], abp) -> Dict[str, Any]:
+    if not is_path_traced(bake_type, label, node_types):
+        return {
+            "use_adaptive_sampling": False,
+            "samples": 1,
+            "time_limit": 0,
+            "use_denoising": False,
+        }
+
+    return {
+        "use_adaptive_sampling": True,
+        "adaptive_threshold": abp.ab_sampling_target_noise,
+        "samples": abp.ab_sampling_high_max,
+        "adaptive_min_samples": abp.ab_sampling_high_min,
+        "time_limit": abp.ab_sampling_high_time_limit,
+        "use_denoising": abp.ab_sampling_high_denoise,
+        "denoiser": abp.ab_sampling_high_denoiser,
+        "denoising_input_passes": abp.ab_sampling_high_passes,
+        "denoising_prefilter": abp.ab_sampling_high_prefilter,
+    }
@@ -0,0 +1,88 @@
+import os
+import struct
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List
+
+import numpy as np
+
+# Background texture writer: the pixels of a baked image are copied on the main thread,
+# quantizing and PNG encoding (zlib releases the GIL) run in a thread pool so the next bake can start right away.
+
+# Rec. 709 luma, what blender uses when saving an image as BW
+LUMA_WEIGHTS = np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+
+writer_pool = None
+pending_writes = []
+
+
+# only byte images saved with the built in raw override are written here, those are written as stored,
+# float buffers and custom color management need blender's color transforms and go through save_render
+def can_write_async(img, abp, image_settings) -> bool:
+    return abp.ab_fileformat == 'PNG' and not abp.ab_custom_color_management and not img.is_float and img.source == 'GENERATED' and len(img.tiles) <= 1
+
+
+def png_chunk(chunk_type: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + chunk_type + data + struct.pack(">I", zlib.crc32(chunk_type + data) & 0xffffffff)
+
+
+def encode_png(pixels: np.ndarray, width: int, height: int, color_mode: str, color_depth: str, compression: int) -> bytes:
+    pixels = pixels.reshape(height, width, 4)[::-1]
+    if color_mode == 'BW':
+        channels = (pixels[..., :3] @ LUMA_WEIGHTS)[..., None]
+        png_color_type = 0
+    elif color_mode == 'RGBA':
+        channels = pixels
+        png_color_type = 6
+    else:
+        channels = pixels[..., :3]
+        png_color_type = 2
+
+    if color_depth == '16':
+        data = (np.clip(channels, 0, 1) * 65535 + 0.5).astype('>u2')
+        bit_depth = 16
+    else:
+        data = (np.clip(channels, 0, 1) * 255 + 0.5).astype(np.uint8)
+        bit_depth = 8
+
+    # filter type 0 in front of each row
+    rows = data.reshape(height, -1).view(np.uint8)
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), rows]).tobytes()
+
+    header = struct.pack(">IIBBBBB", width, height, bit_depth, png_color_type, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + png_chunk(b"IHDR", header) + png_chunk(b"IDAT", zlib.compress(raw, min(9, max(0, round(compression / 10))))) + png_chunk(b"IEND", b"")
+
+
+def write_png(filepath: str, pixels: np.ndarray, width: int, height: int, color_mode: str, color_depth: str, compression: int) -> str:
+    encoded = encode_png(pixels, width, height, color_mode, color_depth, compression)
+    # write then rename, readers never see a half written texture
+    with open(f"{filepath}.tmp", "wb") as f:
+        f.write(encoded)
+    os.replace(f"{filepath}.tmp", filepath)
+    return filepath
+
+
+def queue_texture_write(img, filepath: str, color_mode: str, color_depth: str, compression: int) -> Future:
+    global writer_pool
+    if writer_pool is None:
+        writer_pool = ThreadPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) // 2), thread_name_prefix="sparrow_texture_writer")
+
+    width, height = img.size
+    pixels = np.empty(width * height * 4, dtype=np.float32)
+    img.pixels.foreach_get(pixels)
+
+    future = writer_pool.submit(write_png, filepath, pixels, width, height, color_mode, color_depth, compression)
+    pending_writes.append(future)
+    return future
+
+
+# wait for all queued writes, returns the errors
+def finish_texture_writes() -> List[str]:
+    errors = []
+    for future in pending_writes:
+        try:
+            future.result()
+        except Exception as error:
+            errors.append(str(error))
+    pending_writes.clear()
+    return errors
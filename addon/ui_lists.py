@@ -58,7 +58,7 @@ class SPARROW_UL_BakeQueue(UIList):
         
         row = row_main.row()
         row.operator("sparrow.toggle_queued", text="", icon= 'CHECKBOX_DEHLT' if item.Cancel else 'CHECKBOX_HLT', emboss=False).index = index
-        row.label(text= f"{item.Type}  -  " + (f"{item.Multiplier:.2f}" if is_udim_bake else f"{item.Size}"))
+        row.label(text= f"{item.Type}  -  " + (f"{item.Multiplier:.2f}" if is_udim_bake else f"{item.Size}" + (" (Auto)" if item.AutoSize else "")))
 
         row_status = row_main.row()
         row_status.alignment = "RIGHT"
@@ -189,4 +189,24 @@ class SPARROW_UL_ObjectQueue(UIList):
         if scene.autobake_properties.ab_bake_error_msg and item.Status in ['Failed', 'Mixed']: 
             row_alert = col.row()
             row_alert.alert = True
-            row_alert.label(text=f"{item.Error}")
\ No newline at end of file
+            row_alert.label(text=f"{item.Error}")
+
+class SPARROW_UL_ValidationIssues(UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        layout.alert = item.severity == 'ERROR'
+        col = layout.column(align=True)
+        row_main = col.row()
+
+        row = row_main.row()
+        item_icon = {'OBJECT': 'OBJECT_DATAMODE', 'COLLECTION': 'OUTLINER_COLLECTION', 'SCENE': 'SCENE_DATA'}[item.item_type]
+        op = row.operator("sparrow.select_validation_item", text="", icon=item_icon, emboss=False)
+        op.item_name = item.item_name
+        op.item_type = item.item_type
+        row.label(text=f"{item.item_name}: {item.long_name}" + (f" / {item.path}" if item.path != '' else ''))
+
+        row_status = row_main.row()
+        row_status.alignment = "RIGHT"
+        row_status.label(text="", icon='ERROR' if item.severity == 'ERROR' else 'INFO')
+
+        row_message = col.row()
+        row_message.label(text=item.message)
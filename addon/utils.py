@@ -1,12 +1,15 @@
 import json
+import math
 import os
 import re
 from typing import Any
 import bpy
+import numpy as np
 import uuid
 import sys
 import inspect
 
+from .texture_writer import can_write_async, queue_texture_write, finish_texture_writes
 from bpy.props import (BoolProperty, StringProperty, CollectionProperty, IntProperty, PointerProperty, EnumProperty, FloatProperty,FloatVectorProperty )
 
 INTERNAL_COMPONENTS = ['BlueprintInfos', 'blenvy::blueprints::materials::MaterialInfos']
@@ -26,6 +29,18 @@ GLTF_FORMATS = (
     ('GLTF_EMBEDDED', 'glTF Embedded (.gltf + .bin)', 'Exports with all data packed in JSON. Less efficient, but easier to edit later'),
 )
 
+GLB_QUANTIZATION = (
+    ('NONE', 'None', 'Keep all vertex attributes as floats'),
+    ('CORE', 'UVs & Colors', 'Store UVs in the 0-1 range and vertex colors as normalized 16 bit integers, supported by every glTF loader'),
+)
+
+PRECOMPUTE_COLLIDERS = (
+    ('OFF', 'Off', 'Bounds and colliders are computed by the runtime'),
+    ('BOUNDS', 'Bounds', 'Local bounding box and sphere of every mesh object'),
+    ('CONVEX', 'Convex Hulls', 'Bounds, and a convex hull for objects with a collider component'),
+    ('TRIMESH', 'Simplified Meshes', 'Bounds, and a simplified triangle mesh for objects with a collider component'),
+)
+
 VALUE_TYPE_DEFAULTS = {
     "string":" ",
     "boolean": False,
@@ -159,7 +174,7 @@ CONVERSION_TABLES = {
     "glam::Quat":  lambda value: "Quat(x:"+str(value[0])+ ", y:"+str(value[1])+ ", z:"+str(value[2])+ ", w:"+str(value[3])+")",
 
     "bevy_render::color::Color": lambda value: "Rgba(red:"+str(value[0])+ ", green:"+str(value[1])+ ", blue:"+str(value[2])+ ", alpha:"+str(value[3])+   ")",
-    "bevy_ecs::entity::Entity": lambda value: 'Entity(name: ' + (('Some("' + str(value.name) + '")') if value is not None else "None") + ')',
+    "bevy_ecs::entity::Entity": lambda value: 'Entity(name: ' + (('Some("' + str(value.name) + '"), id: Some("' + ensure_entity_id(value) + '")') if value is not None else "None") + ')',
 }
 
 def recurLayerCollection(layerColl, collName):
@@ -177,6 +192,11 @@ def set_active_collection(scene, collection_name):
     # set active collection to the collection
     bpy.context.view_layer.active_layer_collection = layerColl
 
+# evaluated depsgraph of a scene that is not the context scene
+def scene_depsgraph(scene):
+    with bpy.context.temp_override(scene=scene, view_layer=scene.view_layers[0]):
+        return bpy.context.evaluated_depsgraph_get()
+
 def full_stack_lines(tb=None):
     text = []
     try:
@@ -336,18 +356,83 @@ def parse_color(value, caster, typeName):
     return [caster(parsed['red']), caster(parsed['green']), caster(parsed['blue']), caster(parsed['alpha'])]
 
 def parse_entity(value):
-    # strip 'Entity(name: <VAL>)' to just '<VAL>'
-    value = value[13:-1]
-    if value.startswith("Some"):
-        # strip 'Some("<VAL>")' to just '<VAL>'
-        value = value[6:-2]
-        return bpy.context.scene.objects[value]
-    else:
-        return None
+    # 'Entity(name: Some("<NAME>"), id: Some("<ID>"))', parens may already have been stripped
+    # the id survives renames, the name is kept as a fallback for references saved before ids existed
+    match = re.search(r'id:\s*Some\(?"([^"]*)"', value)
+    if match is not None:
+        obj = find_object_by_entity_id(match.group(1))
+        if obj is not None:
+            return obj
+    match = re.search(r'name:\s*Some\(?"([^"]*)"', value)
+    if match is not None and match.group(1) in bpy.context.scene.objects:
+        return bpy.context.scene.objects[match.group(1)]
+    return None
 
 def to_int(input):
     return int(float(input))
 
+#------------------------------------------------------------------------------------
+#   Entity Ids
+
+# stable id used as the target of entity references, exported as the SparrowId component
+ENTITY_ID = 'SparrowId'
+# id -> object name, only a lookup hint, always checked against the object
+entity_ids = {}
+# id -> session uid of the object owning it, duplicates copy the id property but not the uid, so names never decide
+entity_owners = {}
+
+def get_entity_id(obj) -> str | None:
+    value = obj.get(ENTITY_ID, None)
+    if value is None:
+        return None
+    # strip '("<ID>")' to just '<ID>'
+    return str(value)[2:-2]
+
+# claims an unowned id, or one whose owner was deleted, for the object
+def owns_entity_id(obj, entity_id: str) -> bool:
+    owner = entity_owners.get(entity_id, None)
+    if owner is not None and owner != obj.session_uid and any(other.session_uid == owner for other in bpy.data.objects):
+        return False
+    entity_owners[entity_id] = obj.session_uid
+    return True
+
+def ensure_entity_id(obj) -> str:
+    entity_id = get_entity_id(obj)
+    if entity_id is None or not owns_entity_id(obj, entity_id):
+        entity_id = uuid.uuid4().hex[:16]
+        obj[ENTITY_ID] = '("' + entity_id + '")'
+        entity_owners[entity_id] = obj.session_uid
+    entity_ids[entity_id] = obj.name
+    return entity_id
+
+def find_object_by_entity_id(entity_id: str):
+    name = entity_ids.get(entity_id, None)
+    if name is not None and name in bpy.data.objects and get_entity_id(bpy.data.objects[name]) == entity_id:
+        return bpy.data.objects[name]
+    for obj in bpy.data.objects:
+        if get_entity_id(obj) == entity_id:
+            entity_ids[entity_id] = obj.name
+            return obj
+    return None
+
+# record the owners of the ids in a loaded file, before anything in it can be duplicated
+# session uids are not saved, a file saved with copies sharing an id gives it to the shortest name, "<name>.001" is a copy
+def claim_entity_ids(objects):
+    entity_owners.clear()
+    for obj in sorted(objects, key=lambda obj: (len(obj.name), obj.name)):
+        entity_id = get_entity_id(obj)
+        if entity_id is not None:
+            entity_owners.setdefault(entity_id, obj.session_uid)
+
+# duplicated objects copy the id custom property, give every copy a new id so ids stay unique per exported file
+# the owner recorded when the id was assigned or loaded keeps it, whatever the objects are renamed to
+def dedupe_entity_ids(objects):
+    for obj in sorted(objects, key=lambda obj: (len(obj.name), obj.name)):
+        entity_id = get_entity_id(obj)
+        if entity_id is not None and not owns_entity_id(obj, entity_id):
+            del obj[ENTITY_ID]
+            ensure_entity_id(obj)
+
 #------------------------------------------------------------------------------------
 #   Bevy Component Functions
 
@@ -370,6 +455,19 @@ def upsert_bevy_component(item, long_name: str, value):
     bevy_components[long_name] = value
     item['bevy_components'] = json.dumps(bevy_components)
 
+# components only added for an export, the first upsert of an item keeps its original value in `stored`
+def upsert_export_component(item, long_name: str, value, stored: dict):
+    if item not in stored:
+        stored[item] = item['bevy_components'] if 'bevy_components' in item else None
+    upsert_bevy_component(item, long_name, value)
+
+def restore_export_components(stored: dict):
+    for item, bevy_components in stored.items():
+        if bevy_components is None:
+            del item['bevy_components']
+        else:
+            item['bevy_components'] = bevy_components
+
 def remove_bevy_component(item, long_name):
     if 'bevy_components' in item:
         bevy_components = json.loads(item['bevy_components'])
@@ -584,7 +682,10 @@ def export_texture(self, context, img, export_name, type, label, prefix):
 
 # Export
     img.filepath_raw = os.path.join(ab_filepath, f"{export_name}.{file_extension}")
-    img.save_render(filepath = img.filepath_raw)
+    if can_write_async(img, abp, image_settings):
+        queue_texture_write(img, img.filepath_raw, image_settings.color_mode, image_settings.color_depth, image_settings.compression)
+    else:
+        img.save_render(filepath = img.filepath_raw)
 
 # Info
     if abp.ab_report_texture_export:
@@ -602,6 +703,61 @@ def export_texture(self, context, img, export_name, type, label, prefix):
 
 
 
+# area covered by the faces of a mesh in a uv map, uv space is the unit square so this is the used fraction
+def uv_area(mesh, uv_name) -> float:
+    uvs = mesh.uv_layers[uv_name].data
+    coords = np.empty(len(uvs) * 2, dtype=np.float64)
+    uvs.foreach_get('uv', coords)
+    coords = coords.reshape(-1, 2)
+
+    mesh.calc_loop_triangles()
+    loops = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get('loops', loops)
+
+    a, b, c = (coords[loops[corner::3]] for corner in range(3))
+    return float(np.abs((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (c[:, 0] - a[:, 0]) * (b[:, 1] - a[:, 1])).sum() / 2)
+
+
+# world space surface area of a mesh placed with `matrix`
+def world_surface_area(mesh, matrix) -> float:
+    coords = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get('co', coords)
+    matrix = np.array(matrix, dtype=np.float64)
+    coords = coords.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+
+    mesh.calc_loop_triangles()
+    vertices = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get('vertices', vertices)
+
+    a, b, c = (coords[vertices[corner::3]] for corner in range(3))
+    return float(np.linalg.norm(np.cross(b - a, c - a), axis=1).sum() / 2)
+
+
+# power of two texture size giving `density` pixels per meter on the object's surface, clamped to [min_size, max_size]
+# uv and surface area both come from the evaluated mesh, modifiers change both
+def texel_density_size(obj, depsgraph, uv_name, density: float, min_size: int, max_size: int) -> int:
+    obj_eval = obj.evaluated_get(depsgraph)
+    mesh = obj_eval.to_mesh()
+    try:
+        uv_layers = mesh.uv_layers
+        if len(uv_layers) == 0:
+            return max_size
+        if uv_name not in uv_layers:
+            uv_name = next((uv.name for uv in uv_layers if uv.active_render), uv_layers[0].name)
+
+        covered = uv_area(mesh, uv_name)
+        if covered <= 0:
+            return max_size
+        surface = world_surface_area(mesh, obj.matrix_world)
+    finally:
+        obj_eval.to_mesh_clear()
+
+    # size² * uv area pixels have to cover surface area * density² 
+    size = density * math.sqrt(surface / covered)
+    size = 2 ** max(0, math.ceil(math.log2(max(size, 1))))
+    return int(min(max(size, min_size), max_size))
+
+
 SCENE_FOLDER = 'scenes'
 BLUEPRINT_FOLDER = 'blueprints'
 
@@ -609,10 +765,14 @@ bake_status = "IDLE"
 is_udim_bake = False
 next_object_bake = False
 finished_bake_count = 0
+# settings changed by the atlas operator for one bake session, put back when it ends
+atlas_stored_settings = {}
 reconnect_nodes = []
 delete_nodes = []
 bake_results = {}
 bake_order = []
+# running bake worker processes, stopped by cancel and on unregister
+worker_processes = []
 
 bake_items = [
     ('', "Shader", "", -1),
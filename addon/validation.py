@@ -0,0 +1,393 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+import bpy
+
+from .utils import *
+
+#------------------------------------------------------------------------------------
+#   Component validation
+#
+#   Checks every item's 'bevy_components' against the registry type infos in one pass,
+#   instead of discovering problems one panel at a time in upsert_component_in_item
+
+@dataclass
+class ValidationIssue:
+    item_type: str # 'OBJECT', 'COLLECTION', 'SCENE'
+    item_name: str
+    long_name: str # component long name
+    path: str # field path inside the component, "" for the root
+    severity: str # 'ERROR' or 'WARNING'
+    message: str
+
+class RonParseError(Exception):
+    pass
+
+@dataclass
+class RonValue:
+    kind: str # 'struct', 'tuple', 'unit', 'list', 'map', 'string', 'number', 'bool', 'ident'
+    name: str | None = None # type or variant name in front of (...), or the identifier itself
+    items: List[Any] = field(default_factory=list) # tuple/list entries, map (key, value) pairs
+    fields: Dict[str, Any] = field(default_factory=dict) # struct fields
+    value: Any = None # raw scalar text
+
+# minimal RON reader, only builds enough of a tree to compare against the schema
+class RonReader:
+    PUNCTUATION = "()[]{}:,"
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def parse(self) -> RonValue:
+        value = self.parse_value()
+        self.skip_whitespace()
+        if self.pos != len(self.text):
+            raise RonParseError(f"unexpected '{self.text[self.pos]}' at {self.pos}")
+        return value
+
+    def skip_whitespace(self):
+        text = self.text
+        while self.pos < len(text):
+            if text[self.pos].isspace():
+                self.pos += 1
+            elif text.startswith("//", self.pos):
+                end = text.find("\n", self.pos)
+                self.pos = len(text) if end == -1 else end + 1
+            elif text.startswith("/*", self.pos):
+                end = text.find("*/", self.pos)
+                if end == -1:
+                    raise RonParseError("unterminated block comment")
+                self.pos = end + 2
+            else:
+                break
+
+    def peek(self) -> str:
+        self.skip_whitespace()
+        return self.text[self.pos] if self.pos < len(self.text) else ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            found = self.peek() or "end of input"
+            raise RonParseError(f"expected '{char}' at {self.pos}, found '{found}'")
+        self.pos += 1
+
+    def parse_value(self) -> RonValue:
+        char = self.peek()
+        if char == "":
+            raise RonParseError("unexpected end of input")
+        if char == '"':
+            return RonValue('string', value=self.parse_quoted('"'))
+        if char == "'":
+            return RonValue('string', value=self.parse_quoted("'"))
+        if char == "[":
+            return self.parse_list()
+        if char == "{":
+            return self.parse_map()
+        if char == "(":
+            return self.parse_parens(None)
+        if char.isdigit() or char in "+-.":
+            return RonValue('number', value=self.parse_word())
+        if char.isalpha() or char == "_":
+            name = self.parse_word()
+            if name in ("true", "false"):
+                return RonValue('bool', value=name)
+            if name in ("inf", "NaN"):
+                return RonValue('number', value=name)
+            if self.peek() == "(":
+                return self.parse_parens(name)
+            return RonValue('ident', name=name)
+        raise RonParseError(f"unexpected '{char}' at {self.pos}")
+
+    def parse_quoted(self, quote: str) -> str:
+        start = self.pos
+        self.pos += 1
+        text = self.text
+        while self.pos < len(text):
+            if text[self.pos] == "\\":
+                self.pos += 2
+                continue
+            if text[self.pos] == quote:
+                self.pos += 1
+                return text[start + 1:self.pos - 1]
+            self.pos += 1
+        raise RonParseError(f"unterminated string starting at {start}")
+
+    def parse_word(self) -> str:
+        start = self.pos
+        text = self.text
+        # raw identifiers: r#name
+        if text.startswith("r#", self.pos):
+            self.pos += 2
+        while self.pos < len(text) and not text[self.pos].isspace() and text[self.pos] not in self.PUNCTUATION:
+            self.pos += 1
+        return text[start:self.pos]
+
+    def parse_list(self) -> RonValue:
+        self.expect("[")
+        items = []
+        while self.peek() != "]":
+            items.append(self.parse_value())
+            if self.peek() == ",":
+                self.pos += 1
+            elif self.peek() != "]":
+                raise RonParseError(f"expected ',' or ']' at {self.pos}")
+        self.pos += 1
+        return RonValue('list', items=items)
+
+    def parse_map(self) -> RonValue:
+        self.expect("{")
+        items = []
+        while self.peek() != "}":
+            key = self.parse_value()
+            self.expect(":")
+            items.append((key, self.parse_value()))
+            if self.peek() == ",":
+                self.pos += 1
+            elif self.peek() != "}":
+                raise RonParseError(f"expected ',' or '}}' at {self.pos}")
+        self.pos += 1
+        return RonValue('map', items=items)
+
+    def parse_parens(self, name: str | None) -> RonValue:
+        self.expect("(")
+        if self.peek() == ")":
+            self.pos += 1
+            return RonValue('unit', name=name)
+
+        # struct if the first entry is "ident:"
+        start = self.pos
+        is_struct = False
+        if self.peek().isalpha() or self.peek() == "_":
+            self.parse_word()
+            is_struct = self.peek() == ":"
+        self.pos = start
+
+        if is_struct:
+            fields = {}
+            while self.peek() != ")":
+                field_name = self.parse_word()
+                self.expect(":")
+                fields[field_name] = self.parse_value()
+                if self.peek() == ",":
+                    self.pos += 1
+                elif self.peek() != ")":
+                    raise RonParseError(f"expected ',' or ')' at {self.pos}")
+            self.pos += 1
+            return RonValue('struct', name=name, fields=fields)
+
+        items = []
+        while self.peek() != ")":
+            items.append(self.parse_value())
+            if self.peek() == ",":
+                self.pos += 1
+            elif self.peek() != ")":
+                raise RonParseError(f"expected ',' or ')' at {self.pos}")
+        self.pos += 1
+        return RonValue('tuple', name=name, items=items)
+
+def parse_ron(text: str) -> RonValue:
+    return RonReader(text).parse()
+
+INTEGER_TYPES = ["u8", "u16", "u32", "u64", "u128", "usize", "i8", "i16", "i32", "i64", "i128", "isize"]
+FLOAT_TYPES = ["f32", "f64"]
+STRING_TYPES = ["char", "str", "alloc::string::String", "alloc::borrow::Cow<str>"]
+
+def ref_long_name(type_ref) -> str:
+    return type_ref["type"]["$ref"].replace("#/$defs/", "")
+
+class ComponentValidator:
+    def __init__(self, type_infos: Dict[str, Any], value_types=(), registered_types=()):
+        self.type_infos = type_infos
+        # every registered type name, type_infos may only hold the types reachable from components
+        self.registered_types = set(registered_types)
+        # types edited as a single blender property (vectors, colors, entities...), see blender_property_mapping
+        self.value_types = set(value_types)
+        self.issues: List[ValidationIssue] = []
+        self.item_type = ""
+        self.item_name = ""
+        self.long_name = ""
+
+    def error(self, path: str, message: str, severity='ERROR'):
+        self.issues.append(ValidationIssue(self.item_type, self.item_name, self.long_name, path, severity, message))
+
+    def validate_item(self, item):
+        self.item_type = get_selection_type(item)
+        self.item_name = item.name
+        self.long_name = ""
+
+        try:
+            bevy_components = get_bevy_components(item)
+        except Exception as error:
+            self.error("", f"bevy_components is not valid json: {error}")
+            return
+
+        for long_name, value in bevy_components.items():
+            self.long_name = long_name
+            definition = self.type_infos.get(long_name, None)
+            if definition is None and long_name in self.registered_types:
+                # not reachable from any component, so its definition was not kept and the value can't be checked
+                self.error("", "type is registered but is not a component", 'WARNING')
+                continue
+            if definition is None:
+                self.error("", "component not present in the registry, possibly renamed?")
+                continue
+            if not definition.get("is_component", False):
+                self.error("", "type is registered but is not a component", 'WARNING')
+
+            if not isinstance(value, str):
+                value = str(value)
+            try:
+                parsed = parse_ron(value)
+            except RonParseError as error:
+                self.error("", f"unparseable value: {error}")
+                continue
+            self.validate_value(parsed, definition, "")
+
+    def validate_value(self, value: RonValue, definition, path: str):
+        long_name = definition["long_name"]
+        type_info = definition.get("type_info", None)
+
+        # value types have their own custom formats (see CONVERSION_TABLES), only check the primitives
+        if long_name in INTEGER_TYPES or long_name in FLOAT_TYPES:
+            if value.kind != 'number':
+                self.error(path, f"expected a number for {long_name}")
+            elif long_name in INTEGER_TYPES and any(c in value.value for c in ".eE") and not value.value.startswith("0x"):
+                self.error(path, f"expected an integer for {long_name}, got {value.value}")
+            return
+        if long_name == "bool":
+            if value.kind != 'bool':
+                self.error(path, "expected true or false")
+            return
+        if long_name in STRING_TYPES:
+            if value.kind != 'string':
+                self.error(path, f"expected a string for {long_name}")
+            return
+        if long_name in CONVERSION_TABLES or long_name in VALUE_TYPE_DEFAULTS or long_name in self.value_types:
+            return
+
+        if type_info == "Struct":
+            self.validate_struct(value, definition, path)
+        elif type_info in ("TupleStruct", "Tuple"):
+            self.validate_tuple(value, definition, path)
+        elif type_info == "Enum":
+            self.validate_enum(value, definition, path)
+        elif type_info in ("List", "Array"):
+            if value.kind != 'list':
+                self.error(path, f"expected a list [...] for {definition['short_name']}")
+                return
+            item_definition = self.resolve(definition["items"], path)
+            if item_definition is not None:
+                for index, entry in enumerate(value.items):
+                    self.validate_value(entry, item_definition, f"{path}[{index}]")
+        elif type_info == "Map":
+            if value.kind != 'map':
+                self.error(path, f"expected a map {{...}} for {definition['short_name']}")
+                return
+            key_definition = self.resolve(definition["key_type"], path)
+            value_definition = self.resolve(definition["value_type"], path)
+            for index, (key, entry) in enumerate(value.items):
+                if key_definition is not None:
+                    self.validate_value(key, key_definition, f"{path}{{{index}}}.key")
+                if value_definition is not None:
+                    self.validate_value(entry, value_definition, f"{path}{{{index}}}")
+
+    def resolve(self, type_ref, path: str):
+        long_name = ref_long_name(type_ref)
+        definition = self.type_infos.get(long_name, None)
+        if definition is None:
+            self.error(path, f"type {long_name} is missing from the registry")
+        return definition
+
+    def validate_struct(self, value: RonValue, definition, path: str):
+        properties = definition.get("properties", {})
+        if len(properties) == 0:
+            if value.kind not in ('unit', 'ident'):
+                self.error(path, f"expected unit struct () for {definition['short_name']}")
+            return
+        if value.kind != 'struct':
+            self.error(path, f"expected a struct (field: value, ...) for {definition['short_name']}")
+            return
+
+        unknown = [name for name in value.fields if name not in properties]
+        if len(unknown) > 0:
+            self.error(path, f"fields not in the schema: {', '.join(unknown)}")
+        missing = [name for name in definition.get("required", []) if name not in value.fields]
+        if len(missing) > 0:
+            self.error(path, f"missing required fields: {', '.join(missing)}")
+
+        for field_name, field_value in value.fields.items():
+            if field_name not in properties:
+                continue
+            field_path = f"{path}.{field_name}" if path else field_name
+            field_definition = self.resolve(properties[field_name], field_path)
+            if field_definition is not None:
+                self.validate_value(field_value, field_definition, field_path)
+
+    def validate_tuple(self, value: RonValue, definition, path: str):
+        prefix_items = definition.get("prefix_items", [])
+        # single field tuple structs are written with or without the wrapping parens
+        if value.kind in ('tuple', 'unit'):
+            entries = value.items
+        elif len(prefix_items) == 1:
+            entries = [value]
+        else:
+            self.error(path, f"expected a tuple (...) for {definition['short_name']}")
+            return
+
+        if len(entries) != len(prefix_items):
+            self.error(path, f"expected {len(prefix_items)} fields for {definition['short_name']}, got {len(entries)}")
+            return
+
+        for index, (entry, type_ref) in enumerate(zip(entries, prefix_items)):
+            entry_path = f"{path}.{index}" if path else str(index)
+            entry_definition = self.resolve(type_ref, entry_path)
+            if entry_definition is not None:
+                self.validate_value(entry, entry_definition, entry_path)
+
+    def validate_enum(self, value: RonValue, definition, path: str):
+        variants = definition.get("one_of", [])
+        if definition.get("type", None) != "object":
+            # simple enum, only unit variants
+            if value.kind != 'ident':
+                self.error(path, f"expected one of {', '.join(variants)}")
+            elif value.name not in variants:
+                self.error(path, f"unknown variant {value.name}, expected one of {', '.join(variants)}")
+            return
+
+        variant_name = value.name
+        variant = next(filter(lambda variant: variant["long_name"] == variant_name, variants), None)
+        if variant_name is None or variant is None:
+            names = ', '.join(variant["long_name"] for variant in variants)
+            self.error(path, f"unknown variant {variant_name}, expected one of {names}")
+            return
+
+        variant_path = f"{path}::{variant_name}" if path else variant_name
+        if "properties" in variant:
+            self.validate_struct(value, variant, variant_path)
+        elif "prefix_items" in variant:
+            self.validate_tuple(value, variant, variant_path)
+        elif value.kind != 'ident':
+            self.error(variant_path, f"variant {variant_name} does not take any values")
+
+# all items that can carry components, either for a set of scenes or the whole file
+def collect_component_items(scenes=None):
+    if scenes is None:
+        return list(bpy.data.scenes) + list(bpy.data.collections) + list(bpy.data.objects)
+
+    items = []
+    seen = set()
+    for scene in scenes:
+        for item in [scene] + list(scene.collection.children_recursive) + list(scene.objects):
+            key = (get_selection_type(item), item.name)
+            if key not in seen:
+                seen.add(key)
+                items.append(item)
+    return items
+
+def validate_components(type_infos: Dict[str, Any], items, value_types=(), registered_types=()) -> List[ValidationIssue]:
+    validator = ComponentValidator(type_infos, value_types, registered_types)
+    for item in items:
+        if 'bevy_components' in item:
+            validator.validate_item(item)
+    return validator.issues
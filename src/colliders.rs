@@ -0,0 +1,91 @@
+use bevy::{
+    prelude::*,
+    render::{primitives::Aabb, view::VisibilitySystems},
+};
+use serde::{Deserialize, Serialize};
+
+use crate::SparrowSet;
+
+pub(super) fn plugin(app: &mut App) {
+    app.register_type::<ExportedBounds>()
+        .register_type::<ExportedCollider>()
+        // before bevy computes missing bounds from the mesh, the commands are applied in between
+        .add_systems(
+            PostUpdate,
+            insert_exported_aabbs
+                .in_set(SparrowSet::Post)
+                .before(VisibilitySystems::CalculateBounds),
+        );
+}
+
+/// Local bounds of an object's mesh, computed by the blender addon at export
+#[derive(Component, Debug, Clone, Default, Reflect, Serialize, Deserialize)]
+#[reflect(Component)]
+pub struct ExportedBounds {
+    pub min: Vec3,
+    pub max: Vec3,
+    pub sphere_center: Vec3,
+    pub sphere_radius: f32,
+}
+
+impl ExportedBounds {
+    pub fn aabb(&self) -> Aabb {
+        Aabb::from_min_max(self.min, self.max)
+    }
+}
+
+/// Collider shape of an object's mesh, computed by the blender addon at export for objects with a collider component,
+/// in local space, ready to build a physics collider from without reading the mesh
+#[derive(Component, Debug, Clone, Reflect, Serialize, Deserialize)]
+#[reflect(Component)]
+pub enum ExportedCollider {
+    ConvexHull {
+        points: Vec<f32>,
+    },
+    TriMesh {
+        vertices: Vec<f32>,
+        indices: Vec<u32>,
+    },
+}
+
+impl ExportedCollider {
+    /// Hull points or mesh vertices
+    pub fn points(&self) -> Vec<Vec3> {
+        let values = match self {
+            ExportedCollider::ConvexHull { points } => points,
+            ExportedCollider::TriMesh { vertices, .. } => vertices,
+        };
+        values
+            .chunks_exact(3)
+            .map(|v| Vec3::new(v[0], v[1], v[2]))
+            .collect()
+    }
+
+    /// Triangles of a mesh collider, empty for a convex hull
+    pub fn triangles(&self) -> Vec<[u32; 3]> {
+        match self {
+            ExportedCollider::ConvexHull { .. } => Vec::new(),
+            ExportedCollider::TriMesh { indices, .. } => indices
+                .chunks_exact(3)
+                .map(|i| [i[0], i[1], i[2]])
+                .collect(),
+        }
+    }
+}
+
+/// The gltf loader spawns mesh primitives as children of the object, give them the exported bounds
+/// so they are not computed from the mesh, the object bounds contain every primitive
+fn insert_exported_aabbs(
+    mut commands: Commands,
+    query: Query<(&ExportedBounds, &Children), Or<(Added<ExportedBounds>, Changed<Children>)>>,
+    meshes: Query<(), With<Mesh3d>>,
+) {
+    for (bounds, children) in query.iter() {
+        let aabb = bounds.aabb();
+        for child in children.iter() {
+            if meshes.contains(*child) {
+                commands.entity(*child).insert(aabb);
+            }
+        }
+    }
+}
@@ -2,10 +2,16 @@ use bevy::prelude::*;
 use serde::{Deserialize, Serialize};
 
 pub(super) fn plugin(app: &mut App) {
-    app.register_type::<SceneGravity>();
+    app.register_type::<SceneGravity>()
+        .register_type::<SparrowId>();
 }
 
 /// Added as GltfSceneExtras based on blender scene gravity settings
 #[derive(Component, Deref, DerefMut, Debug, Clone, Default, Reflect, Serialize, Deserialize)]
 #[reflect(Component)]
-pub struct SceneGravity(pub Vec3);
\ No newline at end of file
+pub struct SceneGravity(pub Vec3);
+
+/// Stable id assigned by the blender addon, entity references in components are resolved against it
+#[derive(Component, Deref, DerefMut, Debug, Clone, Default, Reflect, Serialize, Deserialize)]
+#[reflect(Component)]
+pub struct SparrowId(pub String);
\ No newline at end of file
@@ -1,7 +1,7 @@
 // Based on https://github.com/kaosat-dev/Blenvy/pull/236 
 
 
-use std::{alloc::Layout, cell::Cell, num::NonZeroU32};
+use std::{alloc::Layout, cell::{Cell, RefCell}, num::NonZeroU32};
 use bevy::{
     core::Name,
     ecs::system::SystemParam,
@@ -10,6 +10,7 @@ use bevy::{
     prelude::{HierarchyQueryExt, Parent, Query, With},
     reflect::ReflectDeserialize,
     scene::{InstanceId, SceneInstance},
+    utils::HashMap,
 };
 use serde::Deserialize;
 
@@ -23,6 +24,23 @@ pub(crate) struct BadWorldAccess<'w, 's> {
 thread_local! {
     pub(crate) static BAD_WORLD_ACCESS: Cell<Option<BadWorldAccess<'static, 'static>>> = Cell::new(None);
     pub(crate) static INSTANCE_ID: Cell<Option<InstanceId>> = Cell::new(None);
+    /// scene instance -> `SparrowId` -> entity, built once per extras pass so references resolve without scanning names
+    pub(crate) static ENTITY_IDS: RefCell<HashMap<InstanceId, HashMap<String, bevy::ecs::entity::Entity>>> = RefCell::new(HashMap::default());
+}
+
+/// Reads only the `SparrowId` extra, the rest of the json is skipped without building values
+pub(crate) fn sparrow_id_from_extras(extras: &str) -> Option<String> {
+    #[derive(Deserialize)]
+    struct SparrowIdExtra {
+        #[serde(rename = "SparrowId")]
+        sparrow_id: Option<String>,
+    }
+
+    let extra: SparrowIdExtra = serde_json::from_str(extras).ok()?;
+    // strip '("<ID>")' to just '<ID>'
+    extra
+        .sparrow_id
+        .map(|id| id.trim_start_matches("(\"").trim_end_matches("\")").to_string())
 }
 
 const _: () = {
@@ -52,11 +70,24 @@ impl<'de> Deserialize<'de> for Entity {
         #[serde(rename = "Entity")]
         struct EntityData {
             name: Option<String>,
+            // stable id from the blender addon, missing in files exported before ids existed
+            id: Option<String>,
         }
 
         let entity_data = EntityData::deserialize(deserializer)?;
 
-        let entity = if let Some(name) = entity_data.name {
+        let by_id = match (&entity_data.id, INSTANCE_ID.get()) {
+            (Some(id), Some(instance)) => ENTITY_IDS.with_borrow(|ids| {
+                ids.get(&instance)
+                    .and_then(|ids| ids.get(id.as_str()))
+                    .copied()
+            }),
+            _ => None,
+        };
+
+        let entity = if let Some(entity) = by_id {
+            entity
+        } else if let Some(name) = entity_data.name {
             // info!("Found name {name}");
             let BadWorldAccess {
                 names,
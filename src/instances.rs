@@ -0,0 +1,58 @@
+use bevy::prelude::*;
+use serde::{Deserialize, Serialize};
+
+use crate::{spawn_blueprints, Blueprint, SparrowSet};
+
+pub(super) fn plugin(app: &mut App) {
+    app.register_type::<GnInstances>()
+        .register_type::<GnInstanceList>()
+        .add_systems(
+            PostUpdate,
+            spawn_gn_instances
+                .before(spawn_blueprints)
+                .in_set(SparrowSet::Post),
+        );
+}
+
+/// Floats per instance in [`GnInstanceList::transforms`]: translation xyz, rotation xyzw, scale xyz
+pub const GN_INSTANCE_STRIDE: usize = 10;
+
+/// Geometry nodes instances exported by the blender addon, one list per blueprint,
+/// each instance is spawned as a child [`Blueprint`] so all instances share the same loaded meshes
+#[derive(Component, Deref, DerefMut, Debug, Clone, Default, Reflect, Serialize, Deserialize)]
+#[reflect(Component)]
+pub struct GnInstances(pub Vec<GnInstanceList>);
+
+#[derive(Debug, Clone, Default, Reflect, Serialize, Deserialize)]
+pub struct GnInstanceList {
+    pub blueprint: String,
+    /// Transforms relative to the instancing entity, [`GN_INSTANCE_STRIDE`] floats each
+    pub transforms: Vec<f32>,
+}
+
+impl GnInstanceList {
+    pub fn iter_transforms(&self) -> impl Iterator<Item = Transform> + '_ {
+        self.transforms
+            .chunks_exact(GN_INSTANCE_STRIDE)
+            .map(|t| Transform {
+                translation: Vec3::new(t[0], t[1], t[2]),
+                rotation: Quat::from_xyzw(t[3], t[4], t[5], t[6]),
+                scale: Vec3::new(t[7], t[8], t[9]),
+            })
+    }
+}
+
+fn spawn_gn_instances(
+    mut commands: Commands,
+    query: Query<(Entity, &GnInstances), Added<GnInstances>>,
+) {
+    for (e, instances) in query.iter() {
+        commands.entity(e).with_children(|parent| {
+            for list in instances.iter() {
+                for transform in list.iter_transforms() {
+                    parent.spawn((Blueprint(list.blueprint.clone()), transform));
+                }
+            }
+        });
+    }
+}
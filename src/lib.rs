@@ -11,6 +11,12 @@ use process_gltfs::*;
 mod extras;
 pub use extras::*;
 
+mod instances;
+pub use instances::*;
+
+mod colliders;
+pub use colliders::*;
+
 #[cfg(feature = "animation")]
 mod animations;
 
@@ -21,7 +27,8 @@ pub mod prelude {
     #[cfg(feature = "animation")]
     pub use crate::animations::*;
     pub use crate::{
-        extras::*, SceneLoaded, SceneLoading, SparrowConfig, SparrowPlugin, SparrowSet,
+        colliders::*, extras::*, instances::*, SceneLoaded, SceneLoading, SparrowConfig, SparrowPlugin,
+        SparrowSet,
     };
 }
 
@@ -64,6 +71,8 @@ impl Plugin for SparrowPlugin {
     fn build(&self, app: &mut App) {
         app.add_plugins((
             extras::plugin,
+            instances::plugin,
+            colliders::plugin,
             #[cfg(feature = "animation")]
             animations::plugin,
         ))
@@ -14,7 +14,7 @@ use bevy::{
     log::{debug, warn},
     prelude::{Component, HierarchyQueryExt, Local, Query, Res},
     reflect::{PartialReflect, Reflect, TypeRegistration},
-    scene::SceneInstance,
+    scene::{InstanceId, SceneInstance},
     utils::HashMap,
 };
 
@@ -132,6 +132,24 @@ pub fn add_components_from_gltf_extras(
         fake_entity::BAD_WORLD_ACCESS.set(Some(core::mem::transmute(bad_world_access)));
     }
 
+    // index the stable ids written by the addon, entity references are resolved against this table
+    let mut entity_ids: HashMap<InstanceId, HashMap<String, Entity>> = HashMap::default();
+    for (entity, _, extra) in extras.iter() {
+        let Some(id) = fake_entity::sparrow_id_from_extras(&extra.value) else {
+            continue;
+        };
+        if let Some(instance) = hierarchy
+            .iter_ancestors(entity)
+            .find_map(|p| scene_instances.get(p).ok())
+        {
+            entity_ids
+                .entry(*instance.deref())
+                .or_default()
+                .insert(id, entity);
+        }
+    }
+    fake_entity::ENTITY_IDS.set(entity_ids);
+
     for (entity, name, extra) in extras.iter() {
         let parent = hierarchy.get(entity).ok();
         debug!(
@@ -237,6 +255,7 @@ pub fn add_components_from_gltf_extras(
     
     fake_entity::BAD_WORLD_ACCESS.set(None);
     fake_entity::INSTANCE_ID.set(None);
+    fake_entity::ENTITY_IDS.take();
 
     // add the components to the entities 
     for (entity, components) in entity_components {
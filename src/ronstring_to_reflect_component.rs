@@ -2,7 +2,7 @@ use std::any::TypeId;
 
 use bevy::core::Name;
 use bevy::log::warn;
-use bevy::reflect::serde::ReflectDeserializer;
+use bevy::reflect::serde::{ReflectDeserializer, TypedReflectDeserializer};
 use bevy::reflect::{GetTypeRegistration, PartialReflect, TypeRegistration, TypeRegistry};
 use bevy::utils::HashMap;
 use ron::Value;
@@ -22,6 +22,13 @@ pub(crate) fn ronstring_to_reflect_component(
 
     for (component, value) in lookup.into_iter() {
         //info!("{:?} - {:?}: {:?}", &name, &component, &value);
+
+        // already split per component by the exporter, each value is deserialized once
+        if component.as_str() == "sparrow_components" {
+            sparrow_components_to_components(value, type_registry, &mut components, name);
+            continue;
+        }
+
         let parsed_value: String = match value.clone() {
             Value::String(str) => str,
             _ => ron::to_string(&value).unwrap().to_string(),
@@ -102,10 +109,7 @@ fn bevy_components_string_to_components(
         return;
     };
 
-    let recovery_entity_type = type_registry
-        .get(TypeId::of::<bevy::ecs::entity::Entity>())
-        .cloned();
-    type_registry.overwrite_registration(fake_entity::Entity::get_type_registration());
+    let recovery_entity_type = overwrite_entity_registration(type_registry);
 
     for (key, value) in lookup.into_iter() {
         let parsed_value = match value.clone() {
@@ -137,6 +141,76 @@ fn bevy_components_string_to_components(
         }
     }
 
+    restore_entity_registration(type_registry, recovery_entity_type);
+}
+
+/// Handles the `sparrow_components` extra written by the blender exporter:
+/// a list of `{"type": <type path>, "value": <ron string>}` entries, one per component
+fn sparrow_components_to_components(
+    value: Value,
+    type_registry: &mut TypeRegistry,
+    components: &mut Vec<(Box<dyn PartialReflect>, TypeRegistration)>,
+    name: &Option<&Name>, // For better error messages
+) {
+    let Value::Seq(entries) = value else {
+        warn!("failed to parse sparrow_components on {:?}", name);
+        return;
+    };
+
+    let recovery_entity_type = overwrite_entity_registration(type_registry);
+
+    for entry in entries.iter() {
+        let Value::Map(entry) = entry else {
+            warn!("invalid sparrow_components entry on {:?}", name);
+            continue;
+        };
+
+        let mut type_path = None;
+        let mut ron_string = None;
+        for (key, value) in entry.iter() {
+            match (key, value) {
+                (Value::String(key), Value::String(value)) if key == "type" => type_path = Some(value),
+                (Value::String(key), Value::String(value)) if key == "value" => ron_string = Some(value),
+                _ => {}
+            }
+        }
+        let (Some(type_path), Some(ron_string)) = (type_path, ron_string) else {
+            warn!("invalid sparrow_components entry on {:?}", name);
+            continue;
+        };
+
+        let Some(type_registration) = type_registry.get_with_type_path(type_path) else {
+            warn!("no type registration on {:?} for {}", name, type_path);
+            continue;
+        };
+
+        let mut deserializer = ron::Deserializer::from_str(ron_string.as_str())
+            .expect("deserialzer should have been generated from string");
+        let reflect_deserializer = TypedReflectDeserializer::new(type_registration, type_registry);
+        let component = reflect_deserializer
+            .deserialize(&mut deserializer)
+            .unwrap_or_else(|e| {
+                panic!(
+                    "failed to deserialize {:?} component '{}'\n{}\n{:?}",
+                    name, type_path, ron_string, e
+                )
+            });
+        components.push((component, type_registration.clone()));
+    }
+
+    restore_entity_registration(type_registry, recovery_entity_type);
+}
+
+/// Swaps in the fake entity registration, so entity references can be resolved by name, returns the original registration
+fn overwrite_entity_registration(type_registry: &mut TypeRegistry) -> Option<TypeRegistration> {
+    let recovery_entity_type = type_registry
+        .get(TypeId::of::<bevy::ecs::entity::Entity>())
+        .cloned();
+    type_registry.overwrite_registration(fake_entity::Entity::get_type_registration());
+    recovery_entity_type
+}
+
+fn restore_entity_registration(type_registry: &mut TypeRegistry, recovery_entity_type: Option<TypeRegistration>) {
     if let Some(original_entity) = recovery_entity_type {
         type_registry.overwrite_registration(original_entity);
     } else {